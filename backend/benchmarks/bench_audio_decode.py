@@ -0,0 +1,103 @@
+"""
+Compares the old upload decode path with the streaming `StreamingPCMDecoder` used by the
+transcription endpoints, fed in upload-sized chunks.
+
+The old path mirrors what `transcribe_file` used to do: convert the upload to WAV with
+pydub, decode the original bytes a second time with pydub for the duration, then parse the
+re-encoded WAV for the model. CPU time includes ffmpeg child processes.
+
+Usage:
+    python benchmarks/bench_audio_decode.py --seconds 10 --iterations 50
+    python benchmarks/bench_audio_decode.py --mp3   # also compares MP3 uploads (needs ffmpeg)
+"""
+
+import argparse
+import io
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pydub
+
+# Add src to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils.audio import create_wav_header
+from src.utils.audio_utils import FFMPEG_BINARY, STT_SAMPLE_RATE, StreamingPCMDecoder, load_pcm16k
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024  # As read by the upload endpoints
+
+
+def make_wav(seconds: float, sample_rate: int = STT_SAMPLE_RATE) -> bytes:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16).tobytes()
+    return create_wav_header(sample_rate, data_size=len(pcm)) + pcm
+
+
+def make_mp3(wav_bytes: bytes) -> bytes:
+    command = [FFMPEG_BINARY, "-nostdin", "-loglevel", "error", "-f", "wav", "-i", "pipe:0", "-f", "mp3", "pipe:1"]
+    return subprocess.run(command, input=wav_bytes, capture_output=True, check=True).stdout
+
+
+def legacy_decode(data: bytes, audio_format: str):
+    segment = pydub.AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+    segment = segment.set_frame_rate(STT_SAMPLE_RATE).set_channels(1).set_sample_width(2)
+    buffer = io.BytesIO()
+    segment.export(buffer, format="wav")
+    duration = len(pydub.AudioSegment.from_file(io.BytesIO(data), format=audio_format)) / 1000.0
+    return load_pcm16k(buffer.getvalue()), duration
+
+
+def streaming_decode(data: bytes):
+    decoder = StreamingPCMDecoder()
+    chunks = []
+    for offset in range(0, len(data), UPLOAD_CHUNK_BYTES):
+        chunks += decoder.feed(data[offset : offset + UPLOAD_CHUNK_BYTES])
+    chunks += decoder.finish()
+    return np.concatenate(chunks), decoder.duration
+
+
+def cpu_seconds() -> float:
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def measure(fn, iterations: int):
+    fn()  # warm-up
+    wall, cpu = [], []
+    for _ in range(iterations):
+        start_wall, start_cpu = time.perf_counter(), cpu_seconds()
+        fn()
+        wall.append(time.perf_counter() - start_wall)
+        cpu.append(cpu_seconds() - start_cpu)
+    return statistics.median(wall), statistics.median(cpu)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload decode benchmark")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Upload length")
+    parser.add_argument("--iterations", type=int, default=50, help="Decodes per path")
+    parser.add_argument("--mp3", action="store_true", help="Also benchmark MP3 uploads")
+    args = parser.parse_args()
+
+    inputs = [("wav 16k mono", make_wav(args.seconds), "wav")]
+    if args.mp3:
+        inputs.append(("mp3", make_mp3(inputs[0][1]), "mp3"))
+
+    print(f"Upload: {args.seconds:.1f}s\n")
+    print(f"{'input':<14}{'path':<10}{'wall ms':>10}{'cpu ms':>10}")
+    for label, data, audio_format in inputs:
+        legacy = measure(lambda: legacy_decode(data, audio_format), args.iterations)
+        streaming = measure(lambda: streaming_decode(data), args.iterations)
+        for name, (wall, cpu) in (("legacy", legacy), ("stream", streaming)):
+            print(f"{label:<14}{name:<10}{wall * 1000:>10.2f}{cpu * 1000:>10.2f}")
+        saved_wall, saved_cpu = legacy[0] - streaming[0], legacy[1] - streaming[1]
+        print(f"{'':<14}{'saved':<10}{saved_wall * 1000:>10.2f}{saved_cpu * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
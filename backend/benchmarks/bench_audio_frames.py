@@ -0,0 +1,115 @@
+"""
+Memory and time of moving audio between stages as `bytes` versus `AudioFrame`.
+
+Each stage is run the former way (temporaries plus `bytes` copies) and through `AudioFrame`:
+
+- tts segment: float model output -> 16-bit PCM chunk handed to the transport. Formerly clip,
+  scale and `astype` temporaries followed by `.tobytes()`; now one in-place conversion into an
+  int16 buffer, sent as a memoryview.
+- tts wav: a complete clip as a WAV file. Formerly `create_wav_header(...) + pcm`; now header and
+  samples are written into one preallocated buffer (`write_wav`).
+- vad utterance: the end of an utterance handed to STT. Formerly `bytes(buffer[:end])` (two
+  copies); now the buffer is trimmed in place and viewed.
+
+Peak is the largest amount of memory traced during one call, above what was live before it.
+
+Usage:
+    python benchmarks/bench_audio_frames.py --seconds 5 --iterations 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.utils.audio import AudioFrame, create_wav_header, write_wav
+from backend.src.utils.codecs import create_encoder
+
+SAMPLE_RATE = 44100
+
+
+def legacy_segment(audio: np.ndarray) -> bytes:
+    audio = np.clip(audio, -1.0, 1.0)
+    audio = (audio * 32767).astype(np.int16)
+    return audio.tobytes()
+
+
+def frame_segment(audio: np.ndarray) -> memoryview:
+    encoder = create_encoder("pcm")
+    encoder.start(SAMPLE_RATE)
+    return encoder.encode(Synthesizer._to_frame(SAMPLE_RATE, audio))
+
+
+def legacy_wav(pcm: np.ndarray) -> bytes:
+    data = pcm.tobytes()
+    return create_wav_header(SAMPLE_RATE, data_size=len(data)) + data
+
+
+def frame_wav(pcm: np.ndarray) -> bytearray:
+    return write_wav(AudioFrame(pcm, SAMPLE_RATE))
+
+
+def legacy_utterance(buffer: bytearray) -> bytes:
+    return bytes(buffer[: len(buffer) - 640])
+
+
+def frame_utterance(buffer: bytearray) -> AudioFrame:
+    del buffer[len(buffer) - 640 :]
+    return AudioFrame.from_buffer(buffer, 16000)
+
+
+def measure(fn, make_input, iterations: int):
+    fn(make_input())  # warm-up
+    timings = []
+    for _ in range(iterations):
+        data = make_input()
+        start = time.perf_counter()
+        fn(data)
+        timings.append(time.perf_counter() - start)
+
+    data = make_input()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(timings), peak - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AudioFrame allocation benchmark")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Audio length per call")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per path")
+    args = parser.parse_args()
+
+    n = int(args.seconds * SAMPLE_RATE)
+    rng = np.random.default_rng(0)
+    model_output = (rng.standard_normal(n) * 0.3).astype(np.float32)
+    pcm = (model_output * 32767).astype(np.int16)
+    utterance = np.zeros(int(args.seconds * 16000), dtype=np.int16).tobytes()
+
+    stages = (
+        ("tts segment", lambda: model_output.copy(), legacy_segment, frame_segment),
+        ("tts wav", lambda: pcm, legacy_wav, frame_wav),
+        ("vad utterance", lambda: bytearray(utterance), legacy_utterance, frame_utterance),
+    )
+
+    print(f"{args.seconds:.1f}s of audio per call ({n * 2 / 1024:.0f} KiB of 16-bit PCM at {SAMPLE_RATE} Hz)\n")
+    print(f"{'stage':<16}{'path':<8}{'median ms':>12}{'peak KiB':>12}")
+    for name, make_input, legacy, frame in stages:
+        for path, fn in (("bytes", legacy), ("frame", frame)):
+            median, peak = measure(fn, make_input, args.iterations)
+            print(f"{name:<16}{path:<8}{median * 1000:>12.3f}{peak / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
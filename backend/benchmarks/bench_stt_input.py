@@ -0,0 +1,104 @@
+"""
+Compares the old tempfile-based STT input path with the in-memory path.
+
+The tempfile path mirrors what `STTProcessor.transcribe` used to do: write the WAV
+to a NamedTemporaryFile and let the loader decode it again from disk. The in-memory
+path parses the WAV buffer with `load_pcm16k`.
+
+Usage:
+    python benchmarks/bench_stt_input.py --seconds 5 --iterations 200
+    python benchmarks/bench_stt_input.py --model   # also runs the NeMo model end to end
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+# Add src to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils.audio import create_wav_header
+from src.utils.audio_utils import STT_SAMPLE_RATE, load_pcm16k
+
+
+def make_wav(seconds: float) -> bytes:
+    t = np.arange(int(seconds * STT_SAMPLE_RATE)) / STT_SAMPLE_RATE
+    pcm = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16).tobytes()
+    return create_wav_header(STT_SAMPLE_RATE, data_size=len(pcm)) + pcm
+
+
+def tempfile_input(wav_bytes: bytes) -> np.ndarray:
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as f:
+        f.write(wav_bytes)
+        f.flush()
+        samples, _ = sf.read(f.name, dtype="float32")
+    return samples
+
+
+def measure(fn, wav_bytes: bytes, iterations: int):
+    fn(wav_bytes)  # warm-up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(wav_bytes)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(wav_bytes)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    return statistics.median(timings), peak, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT input path benchmark")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Utterance length")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per path")
+    parser.add_argument("--model", action="store_true", help="Also benchmark full transcription with NeMo")
+    args = parser.parse_args()
+
+    wav_bytes = make_wav(args.seconds)
+    print(f"Utterance: {args.seconds:.1f}s, {len(wav_bytes) / 1024:.0f} KiB WAV\n")
+    print(f"{'path':<12}{'median ms':>12}{'peak KiB':>12}{'live blocks':>14}")
+    for name, fn in (("tempfile", tempfile_input), ("in-memory", load_pcm16k)):
+        median, peak, blocks = measure(fn, wav_bytes, args.iterations)
+        print(f"{name:<12}{median * 1000:>12.3f}{peak / 1024:>12.1f}{blocks:>14}")
+
+    if args.model:
+        from src.core.stt_processor import stt_processor
+
+        stt_processor._load_model_if_needed()
+        model = stt_processor._model
+
+        def tempfile_transcribe(data: bytes):
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as f:
+                f.write(data)
+                f.flush()
+                return model.transcribe([f.name])
+
+        def in_memory_transcribe(data: bytes):
+            # Bypass the transcript cache, which would answer every repeat of the same utterance
+            return stt_processor.transcribe_uncached([data])[0]
+
+        print(f"\n{'end to end':<12}{'median ms':>12}")
+        for name, fn in (("tempfile", tempfile_transcribe), ("in-memory", in_memory_transcribe)):
+            fn(wav_bytes)
+            timings = []
+            for _ in range(max(1, args.iterations // 20)):
+                start = time.perf_counter()
+                fn(wav_bytes)
+                timings.append(time.perf_counter() - start)
+            print(f"{name:<12}{statistics.median(timings) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Throughput versus latency of cross-request TTS batching at several concurrency levels.
+
+Each simulated client synthesizes short segments back to back with the same voice settings.
+The benchmark runs every concurrency level with batching off (one forward pass per segment)
+and on (`TTSBatcher`), and reports segments per second and per-segment latency.
+
+By default a stand-in model is used. Its forward pass costs `--overhead-ms` plus
+`--ms-per-char` per character of the longest text, with a `--batch-efficiency` fraction of
+that cost added for each extra item in the batch. Pass `--model-id` to use a real voice
+instead.
+
+Usage:
+    python benchmarks/bench_tts_batching.py --concurrency 1 2 4 8 16
+    python benchmarks/bench_tts_batching.py --model-id jvnv-F1-jp --max-batch-size 8
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.batcher import TTSBatcher
+from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.scheduler import InferenceScheduler
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.models.tts import TTSRequest
+
+SEGMENTS = [
+    "かしこまりました。",
+    "ご注文の商品は明日発送されます。",
+    "少々お待ちください。",
+    "ほかにご不明な点はございますか。",
+    "お電話ありがとうございました。",
+]
+
+
+class FakeModel:
+    def __init__(self, overhead_ms: float, ms_per_char: float, batch_efficiency: float):
+        self.overhead = overhead_ms / 1000
+        self.per_char = ms_per_char / 1000
+        self.batch_efficiency = batch_efficiency
+
+    def _cost(self, texts):
+        longest = max(len(text) for text in texts)
+        return (self.overhead + longest * self.per_char) * (1 + self.batch_efficiency * (len(texts) - 1))
+
+    def infer(self, text: str, **kwargs):
+        time.sleep(self._cost([text]))
+        return 44100, np.zeros(len(text) * 2205, dtype=np.int16)
+
+    def infer_batch(self, texts, **kwargs):
+        time.sleep(self._cost(texts))
+        return 44100, [np.zeros(len(text) * 2205, dtype=np.int16) for text in texts]
+
+
+class FakeModelManager:
+    def __init__(self, model: FakeModel):
+        self.model = model
+
+    def load_model(self, model_id: str):
+        return self.model
+
+
+async def client(synth: Synthesizer, model_id: str, client_id: int, count: int, latencies: list):
+    for i in range(count):
+        # Distinct text per client and iteration so every segment is inferred
+        text = f"{SEGMENTS[(client_id + i) % len(SEGMENTS)]}{client_id}-{i}"
+        start = time.perf_counter()
+        await synth._infer_pcm(text, TTSRequest(text=text, model_id=model_id))
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_level(manager, args, concurrency: int, batching: bool):
+    batcher = TTSBatcher(args.max_batch_size, args.max_wait_ms) if batching else None
+    # Few inference slots (default 1), so the comparison is batch size rather than thread parallelism
+    synth = Synthesizer(
+        manager,
+        cache=SegmentCache(max_bytes=0),
+        scheduler=InferenceScheduler(workers=args.workers),
+        batcher=batcher,
+    )
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(synth, args.model_id, c, args.segments, latencies) for c in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (
+        len(latencies) / elapsed,
+        statistics.median(latencies),
+        latencies[int(len(latencies) * 0.95) - 1],
+    )
+
+
+async def run(args):
+    if args.model_id:
+        manager = ModelManager()
+        await asyncio.to_thread(manager.load_model, args.model_id)
+    else:
+        manager = FakeModelManager(FakeModel(args.overhead_ms, args.ms_per_char, args.batch_efficiency))
+
+    print(f"max batch {args.max_batch_size}, max wait {args.max_wait_ms:.0f} ms, {args.workers} worker(s)\n")
+    print(f"{'clients':>8}{'mode':>10}{'seg/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for concurrency in args.concurrency:
+        for batching in (False, True):
+            throughput, p50, p95 = await run_level(manager, args, concurrency, batching)
+            mode = "batched" if batching else "single"
+            print(f"{concurrency:>8}{mode:>10}{throughput:>10.1f}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS cross-request batching benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Client counts")
+    parser.add_argument("--segments", type=int, default=10, help="Segments per client")
+    parser.add_argument("--max-batch-size", type=int, default=8, help="TTSBatcher max batch size")
+    parser.add_argument("--max-wait-ms", type=float, default=10.0, help="TTSBatcher max wait")
+    parser.add_argument("--workers", type=int, default=1, help="Inference slots per model")
+    parser.add_argument("--overhead-ms", type=float, default=30.0, help="Stand-in fixed cost per forward pass")
+    parser.add_argument("--ms-per-char", type=float, default=4.0, help="Stand-in cost per character")
+    parser.add_argument(
+        "--batch-efficiency", type=float, default=0.25, help="Stand-in extra cost per additional batch item"
+    )
+    parser.add_argument("--model-id", default=None, help="Benchmark a real Style-Bert-VITS2 voice")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
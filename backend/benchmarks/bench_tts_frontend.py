@@ -0,0 +1,89 @@
+"""
+Where the time of one TTS segment goes: the text front end (normalisation, G2P, BERT features)
+versus the back end (acoustic model and vocoder), and what the feature cache saves.
+
+For every corpus sentence the benchmark times, `--iterations` times each:
+  front end (miss)  `get_text` with an empty feature cache
+  front end (hit)   the same lookup served from the `FeatureCache`
+  back end          the network's forward pass and the int16 conversion
+A repeated sentence in another style or voice costs "hit + back end" instead of
+"miss + back end".
+
+Usage:
+    python benchmarks/bench_tts_frontend.py --model-id jvnv-F1-jp
+    python benchmarks/bench_tts_frontend.py --model-id jvnv-F1-jp --backend onnx --iterations 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.feature_cache import FeatureCache
+from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.onnx_backend import BACKENDS
+from backend.src.core.tts.sbv2_backend import to_int16
+
+CORPUS = [
+    "かしこまりました。",
+    "ご注文の商品は明日の午前中に発送される予定です。",
+    "恐れ入りますが、本人確認のため、ご登録のお名前と生年月日をお教えいただけますでしょうか。",
+    "少々お待ちください。",
+    "お電話ありがとうございました。またのご利用をお待ちしております。",
+]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS front-end / back-end time breakdown")
+    parser.add_argument("--model-id", required=True, help="Style-Bert-VITS2 voice in the model directory")
+    parser.add_argument("--model-dir", default=None, help="Defaults to TTS_MODEL_DIR")
+    parser.add_argument("--backend", default="torch", choices=BACKENDS)
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per sentence")
+    args = parser.parse_args()
+
+    manager = ModelManager(args.model_dir, default_backend=args.backend)
+    voice = manager.load_model(args.model_id)
+    voice.infer(text="こんにちは。")  # warm up (BERT, the network, allocator)
+    model = voice.model
+    hps = model.hyper_parameters
+    style = next(iter(voice.style2id))
+
+    print(f"{args.model_id} ({args.backend}): ms per segment, median of {args.iterations}\n")
+    print(f"{'chars':>6}{'front miss':>12}{'front hit':>11}{'back end':>10}{'front share':>13}{'saved':>8}")
+    totals = [0.0, 0.0, 0.0]
+    for text in CORPUS:
+        miss, hit, back = [], [], []
+        for _ in range(args.iterations):
+            voice.features = FeatureCache()
+            miss.append(timed(lambda: voice.features.get_text(text, hps, model.device))[0])
+            hit.append(timed(lambda: voice.features.get_text(text, hps, model.device))[0])
+            inputs = voice._batch_inputs([text], style, 1.0)
+            elapsed, (audio, lengths) = timed(lambda: voice._forward(inputs, 1.0))
+            back.append(elapsed + timed(lambda: to_int16(audio[0, : lengths[0]]))[0])
+        row = [statistics.median(values) for values in (miss, hit, back)]
+        totals = [total + value for total, value in zip(totals, row)]
+        front_miss, front_hit, back_end = row
+        print(
+            f"{len(text):>6}{front_miss * 1000:>12.1f}{front_hit * 1000:>11.2f}{back_end * 1000:>10.1f}"
+            f"{front_miss / (front_miss + back_end):>13.0%}"
+            f"{(front_miss - front_hit) / (front_miss + back_end):>8.0%}"
+        )
+    front_miss, front_hit, back_end = totals
+    print(
+        f"\nAll sentences: front end {front_miss * 1000:.0f} ms, back end {back_end * 1000:.0f} ms; "
+        f"a cache hit saves {(front_miss - front_hit) / (front_miss + back_end):.0%} of the segment time"
+    )
+
+
+if __name__ == "__main__":
+    main()
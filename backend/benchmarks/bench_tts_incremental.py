@@ -0,0 +1,98 @@
+"""
+Time to first audio of a long sentence with incremental vocoder streaming
+(`SBV2Voice.infer_stream`) versus synthesizing the sentence whole, and how close the chunked
+vocoder output is to a single pass.
+
+For each corpus sentence the benchmark reports, as medians over `--iterations`:
+  whole ms    time until the whole sentence is synthesized (the first audio without streaming)
+  first ms    time until the first streamed piece
+  stream ms   time until the last streamed piece
+Similarity runs with sampling noise turned off, so both paths decode the same latent, and
+compares the chunked output with the single pass: the SNR, and the largest sample step at a
+chunk boundary relative to the 99th percentile of all sample steps (a click shows up as a
+ratio well above 1).
+
+Usage:
+    python benchmarks/bench_tts_incremental.py --model-id jvnv-F1-jp
+    python benchmarks/bench_tts_incremental.py --model-id jvnv-F1-jp --chunk-frames 24 --overlap-frames 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.model_manager import ModelManager
+
+CORPUS = [
+    "ご注文の商品は明日の午前中に倉庫から発送される予定です。",
+    "恐れ入りますが、本人確認のため、ご登録のお名前と生年月日をお教えいただけますでしょうか。",
+    "お届けまでは通常二日から三日ほどかかりますので、あらかじめご了承ください。",
+]
+
+DETERMINISTIC = {"sdp_ratio": 0.0, "noise_scale": 0.0, "noise_scale_w": 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental vocoder streaming benchmark")
+    parser.add_argument("--model-id", required=True, help="Style-Bert-VITS2 voice in the model directory")
+    parser.add_argument("--model-dir", default=None, help="Defaults to TTS_MODEL_DIR")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per sentence")
+    parser.add_argument("--chunk-frames", type=int, default=None, help="Defaults to TTS_VOCODER_CHUNK_FRAMES")
+    parser.add_argument("--context-frames", type=int, default=None, help="Defaults to TTS_VOCODER_CONTEXT_FRAMES")
+    parser.add_argument("--overlap-frames", type=int, default=None, help="Defaults to TTS_VOCODER_OVERLAP_FRAMES")
+    args = parser.parse_args()
+
+    voice = ModelManager(args.model_dir, default_backend="torch").load_model(args.model_id)
+    for name in ("chunk_frames", "context_frames", "overlap_frames"):
+        if getattr(args, name) is not None:
+            setattr(voice, name, getattr(args, name))
+    voice.infer(text="こんにちは。")  # warm up
+    style = next(iter(voice.style2id))
+
+    print(
+        f"{args.model_id}: chunks of {voice.chunk_frames} frames, {voice.context_frames} context, "
+        f"{voice.overlap_frames} overlap\n"
+    )
+    print(f"{'chars':>6}{'whole ms':>10}{'first ms':>10}{'stream ms':>11}{'SNR dB':>8}{'boundary step':>15}")
+    for text in CORPUS:
+        whole, first, streamed = [], [], []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            voice._synthesize([text], style, 1.0, 1.0, 1.0)
+            whole.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i, _ in enumerate(voice.infer_stream(text, style=style)):
+                if i == 0:
+                    first.append(time.perf_counter() - start)
+            streamed.append(time.perf_counter() - start)
+
+        voice.sampling = DETERMINISTIC
+        reference = voice._synthesize([text], style, 1.0, 1.0, 1.0)[1][0].astype(np.float64)
+        pieces = [audio for _, audio in voice.infer_stream(text, style=style)]
+        voice.sampling = {}
+        chunked = np.concatenate(pieces).astype(np.float64)
+        # Both are 16-bit with different gains; compare at the same peak
+        chunked *= np.abs(reference).max() / max(np.abs(chunked).max(), 1)
+        n = min(reference.size, chunked.size)
+        noise = np.sum((reference[:n] - chunked[:n]) ** 2)
+        snr = float("inf") if noise == 0 else 10 * np.log10(np.sum(reference[:n] ** 2) / noise)
+        steps = np.abs(np.diff(chunked))
+        boundaries = np.cumsum([piece.size for piece in pieces[:-1]]) - 1
+        ratio = steps[boundaries].max() / np.percentile(steps, 99) if boundaries.size else 0.0
+
+        print(
+            f"{len(text):>6}{statistics.median(whole) * 1000:>10.0f}{statistics.median(first) * 1000:>10.0f}"
+            f"{statistics.median(streamed) * 1000:>11.0f}{snr:>8.1f}{ratio:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
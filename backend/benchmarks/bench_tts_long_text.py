@@ -0,0 +1,113 @@
+"""
+Wall-clock time of non-streaming synthesis of a long text: one forward pass over the whole
+text versus `Synthesizer.synthesize`, which splits it into segments, synthesizes them
+concurrently on the voice's inference slots (`--workers`) and joins them with crossfades.
+
+By default a stand-in model is used. Its forward pass costs `--overhead-ms` plus
+`--ms-per-char` per character, plus a quadratic term standing in for attention over the whole
+input (`--quadratic-us` per character squared, off by default). The stand-in sleeps, which
+releases the GIL the way real inference does, so concurrent segments overlap as they would on
+a multi-core host. Pass `--model-id` to use a real voice instead.
+
+Usage:
+    python benchmarks/bench_tts_long_text.py --workers 1 2 4
+    python benchmarks/bench_tts_long_text.py --model-id jvnv-F1-jp --repeat 4 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.scheduler import InferenceScheduler
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.models.tts import TTSRequest
+from backend.src.utils.codecs import create_encoder
+
+PARAGRAPH = (
+    "本日はお問い合わせいただき、誠にありがとうございます。"
+    "ご注文の商品は、明日の午前中に倉庫から発送される予定です。"
+    "お届けまでは通常二日から三日ほどかかりますので、あらかじめご了承ください。"
+    "配送状況は、お送りしたメールに記載の番号からいつでもご確認いただけます。"
+    "ほかにご不明な点がございましたら、お気軽にお申し付けください。"
+)
+
+
+class FakeModel:
+    def __init__(self, overhead_ms: float, ms_per_char: float, quadratic_us: float):
+        self.overhead = overhead_ms / 1000
+        self.per_char = ms_per_char / 1000
+        self.quadratic = quadratic_us / 1_000_000
+
+    def infer(self, text: str, **kwargs):
+        time.sleep(self.overhead + len(text) * self.per_char + len(text) ** 2 * self.quadratic)
+        return 44100, np.zeros(len(text) * 2205, dtype=np.int16)
+
+
+class FakeModelManager:
+    def __init__(self, model: FakeModel):
+        self.model = model
+
+    def load_model(self, model_id: str):
+        return self.model
+
+
+async def single_pass(synth: Synthesizer, request: TTSRequest) -> float:
+    """The former batch path: the whole text in one `infer` call."""
+    start = time.perf_counter()
+    frame = await synth._infer_uncached(request.text, request)
+    await asyncio.to_thread(create_encoder(request.output_format).encode_all, frame)
+    return time.perf_counter() - start
+
+
+async def segmented(synth: Synthesizer, request: TTSRequest) -> float:
+    start = time.perf_counter()
+    await synth.synthesize(request)
+    return time.perf_counter() - start
+
+
+async def run(args):
+    if args.model_id:
+        manager = ModelManager(args.model_dir)
+        model_id = args.model_id
+        await asyncio.to_thread(manager.load_model, model_id)
+    else:
+        manager = FakeModelManager(FakeModel(args.overhead_ms, args.ms_per_char, args.quadratic_us))
+        model_id = "fake"
+    # Numbered copies, so no two sentences are identical (identical segments share one inference)
+    text = "".join(PARAGRAPH.replace("。", f"（{i + 1}）。") for i in range(args.repeat))
+    request = TTSRequest(text=text, model_id=model_id)
+    print(f"{len(request.text)} characters\n")
+    print(f"{'workers':>8}{'single pass s':>15}{'segmented s':>13}{'speedup':>9}")
+
+    for workers in args.workers:
+        # No segment cache, so every run infers every segment
+        synth = Synthesizer(manager, cache=SegmentCache(max_bytes=0), scheduler=InferenceScheduler(workers=workers))
+        whole = await single_pass(synth, request)
+        split = await segmented(synth, request)
+        print(f"{workers:>8}{whole:>15.2f}{split:>13.2f}{whole / split:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-text batch synthesis benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Inference slots per voice")
+    parser.add_argument("--repeat", type=int, default=6, help="Copies of the sample paragraph in the text")
+    parser.add_argument("--model-id", default=None, help="Use a real Style-Bert-VITS2 voice")
+    parser.add_argument("--model-dir", default=None, help="Defaults to TTS_MODEL_DIR")
+    parser.add_argument("--overhead-ms", type=float, default=30.0)
+    parser.add_argument("--ms-per-char", type=float, default=4.0)
+    parser.add_argument("--quadratic-us", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
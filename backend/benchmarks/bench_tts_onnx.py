@@ -0,0 +1,122 @@
+"""
+Latency, real-time factor and output similarity of the TTS inference backends on CPU.
+
+The same voice is loaded with each backend (`torch`, `onnx`, `onnx-int8`; see `ModelManager`)
+and synthesizes every corpus sentence `--iterations` times through `infer`, the call the
+Synthesizer makes. RTF is synthesis time divided by audio duration (below 1 is faster than
+real time).
+
+Similarity compares each backend with PyTorch on the same sentences with sampling noise turned
+off (sdp_ratio, noise_scale and noise_scale_w set to 0), so any difference comes from the graph
+and quantization rather than random sampling. It reports the duration ratio, the cosine
+similarity of log-magnitude spectrograms, and the waveform SNR.
+
+The ONNX graphs are exported (and quantized) next to the weights on first use, which this
+benchmark does not time.
+
+Usage:
+    python benchmarks/bench_tts_onnx.py --model-id jvnv-F1-jp
+    python benchmarks/bench_tts_onnx.py --model-id jvnv-F1-jp --backends torch onnx-int8 --threads 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.onnx_backend import BACKENDS
+
+CORPUS = [
+    "かしこまりました。",
+    "ご注文の商品は明日の午前中に発送される予定です。",
+    "恐れ入りますが、本人確認のため、ご登録のお名前と生年月日をお教えいただけますでしょうか。",
+    "少々お待ちください。",
+    "お電話ありがとうございました。またのご利用をお待ちしております。",
+]
+
+DETERMINISTIC = {"sdp_ratio": 0.0, "noise_scale": 0.0, "noise_scale_w": 0.0}
+
+
+def log_spectrogram(audio: np.ndarray, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    audio = audio.astype(np.float32) / 32768
+    if audio.size < n_fft:
+        audio = np.pad(audio, (0, n_fft - audio.size))
+    frames = np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop] * np.hanning(n_fft)
+    return np.log(np.abs(np.fft.rfft(frames, axis=1)) + 1e-5)
+
+
+def similarity(reference: np.ndarray, audio: np.ndarray):
+    """(duration ratio, log-spectrogram cosine similarity, waveform SNR in dB)."""
+    n = min(reference.size, audio.size)
+    ref, out = reference[:n].astype(np.float64), audio[:n].astype(np.float64)
+    a, b = log_spectrogram(reference[:n]).ravel(), log_spectrogram(audio[:n]).ravel()
+    cosine = float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+    noise = np.sum((ref - out) ** 2)
+    snr = float("inf") if noise == 0 else 10 * np.log10(np.sum(ref**2) / noise)
+    return audio.size / reference.size, cosine, snr
+
+
+def run_backend(args, backend: str):
+    manager = ModelManager(args.model_dir, default_backend=backend)
+    start = time.perf_counter()
+    voice = manager.load_model(args.model_id)
+    load_s = time.perf_counter() - start
+    if args.threads and hasattr(voice, "intra_op_threads"):
+        voice.intra_op_threads = args.threads
+        voice.load()
+    voice.infer(text="こんにちは。")  # warm up
+
+    latencies, rtfs = [], []
+    for text in CORPUS:
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            sr, audio = voice.infer(text=text)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            rtfs.append(elapsed / (audio.size / sr))
+
+    voice.sampling = DETERMINISTIC
+    if backend == "torch":
+        # The batched forward pass honours `sampling`; TTSModel.infer would use its own defaults
+        outputs = [voice._synthesize([text], "Neutral", 1.0, 1.0, 1.0)[1][0] for text in CORPUS]
+    else:
+        outputs = [voice.infer(text=text)[1] for text in CORPUS]
+    return load_s, latencies, rtfs, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS inference backend benchmark")
+    parser.add_argument("--model-id", required=True, help="Style-Bert-VITS2 voice in the model directory")
+    parser.add_argument("--model-dir", default=None, help="Defaults to TTS_MODEL_DIR")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per sentence")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (default: automatic)")
+    args = parser.parse_args()
+
+    results = {backend: run_backend(args, backend) for backend in args.backends}
+    reference = results.get("torch")
+
+    print(f"{args.model_id}: {len(CORPUS)} sentences x {args.iterations}\n")
+    print(f"{'backend':<11}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}{'RTF':>7}{'dur ratio':>11}{'spec cos':>10}{'SNR dB':>8}")
+    for backend, (load_s, latencies, rtfs, outputs) in results.items():
+        latencies.sort()
+        row = (
+            f"{backend:<11}{load_s:>8.1f}{statistics.median(latencies) * 1000:>9.0f}"
+            f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>9.0f}{statistics.median(rtfs):>7.3f}"
+        )
+        if reference is not None:
+            scores = [similarity(ref, out) for ref, out in zip(reference[3], outputs)]
+            ratio, cosine, snr = (statistics.mean(values) for values in zip(*scores))
+            row += f"{ratio:>11.3f}{cosine:>10.4f}{snr:>8.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Time-to-first-audio and segment quality of TTS text segmentation on LLM-style token streams.
+
+Each corpus text is streamed in tokens of 1-3 characters, one every `--token-ms`. Two
+segmenters are compared:
+
+- sentence: the former orchestrator behaviour. A sentence is emitted once the next one has
+  started, and it is split only at `。！？` or a newline.
+- adaptive: `TextSegmenter`, with a short first segment, min/max lengths and clause cuts.
+
+TTFB is the time until the first segment is complete plus its synthesis time. The stand-in
+synthesis cost is `--overhead-ms` + `--ms-per-char` per character, or a real voice with
+`--model-id`. Shorter, more frequent segments give the model less context, so the prosody cost
+is reported through a proxy: where segments were cut, and how many are shorter than
+`--min-chars`. Cuts at sentence ends are best, then clause boundaries (`、`), then word
+boundaries, then hard cuts.
+
+Usage:
+    python benchmarks/bench_tts_segmentation.py
+    python benchmarks/bench_tts_segmentation.py --corpus texts.txt --model-id jvnv-F1-jp
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Callable, Iterable, List, Tuple
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.segmenter import CLAUSE_BREAKS, CLOSERS, SENTENCE_ENDS, TextSegmenter
+
+CORPUS = [
+    "本日はお問い合わせいただきありがとうございます。ご注文の商品は明日の午前中に発送される予定です。",
+    "お客様のご注文について確認いたしましたところ、在庫の都合により一部の商品の発送が遅れておりまして、"
+    "大変ご迷惑をおかけしておりますが、来週の月曜日には全ての商品を発送できる見込みでございます。",
+    "はい、承知いたしました。それでは、ご登録のメールアドレスに確認用のリンクをお送りしますので、"
+    "届きましたらリンクを開いて手続きを完了してください。",
+    "申し訳ございませんが、その日時はすでに予約が埋まっております。別の日時でしたらご案内できますが、いかがでしょうか。",
+    "ご利用いただいているプランは月額料金に通話料が含まれておりますので追加の費用が発生することはございません",
+    "はい。そうですね。おっしゃる通りです。",
+    "配送状況はマイページの注文履歴からいつでも確認できますし、発送時にお送りするメールに記載された"
+    "追跡番号からも確認いただけます。",
+    "恐れ入りますが、本人確認のため、ご登録のお名前と生年月日をお教えいただけますでしょうか。",
+]
+
+
+def tokenize(text: str, rng: random.Random) -> List[str]:
+    tokens, i = [], 0
+    while i < len(text):
+        size = rng.randint(1, 3)
+        tokens.append(text[i : i + size])
+        i += size
+    return tokens
+
+
+def sentence_segments(tokens: Iterable[str]) -> Iterable[Tuple[int, str]]:
+    """Former behaviour; yields (index of the token that completed the segment, segment)."""
+    buffer = ""
+    index = -1
+    for index, token in enumerate(tokens):
+        buffer += token
+        if any(p in token for p in "。！？\n"):
+            sentences = re.findall(r"[^。！？\n]+[。！？\n]*", buffer)
+            for sentence in sentences[:-1]:
+                yield index, sentence
+            buffer = sentences[-1]
+    if buffer.strip():
+        yield index, buffer
+
+
+def adaptive_segments(segmenter: TextSegmenter) -> Callable[[Iterable[str]], Iterable[Tuple[int, str]]]:
+    def run(tokens: Iterable[str]) -> Iterable[Tuple[int, str]]:
+        stream = segmenter.stream()
+        index = -1
+        for index, token in enumerate(tokens):
+            for segment in stream.feed(token):
+                yield index, segment
+        for segment in stream.flush():
+            yield index, segment
+
+    return run
+
+
+def cut_kind(segment: str, is_last: bool) -> str:
+    if is_last:
+        return "end"
+    last = segment.rstrip(CLOSERS)[-1:]
+    if last in SENTENCE_ENDS:
+        return "sentence"
+    if last in CLAUSE_BREAKS:
+        return "clause"
+    return "word"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS segmentation TTFB / quality benchmark")
+    parser.add_argument("--corpus", default=None, help="UTF-8 file with one text per line")
+    parser.add_argument("--token-ms", type=float, default=30.0, help="LLM time per token")
+    parser.add_argument("--overhead-ms", type=float, default=40.0, help="Stand-in fixed synthesis cost")
+    parser.add_argument("--ms-per-char", type=float, default=8.0, help="Stand-in synthesis cost per character")
+    parser.add_argument("--min-chars", type=int, default=None, help="TextSegmenter min_chars")
+    parser.add_argument("--max-chars", type=int, default=None, help="TextSegmenter max_chars")
+    parser.add_argument("--first-max-chars", type=int, default=None, help="TextSegmenter first_max_chars")
+    parser.add_argument("--model-id", default=None, help="Time first segments with a real Style-Bert-VITS2 voice")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = CORPUS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [line.strip() for line in f if line.strip()]
+
+    if args.model_id:
+        from backend.src.core.tts.model_manager import ModelManager
+
+        voice = ModelManager().load_model(args.model_id)
+        voice.infer(text="こんにちは。")  # warm up
+
+        def synth_s(text: str) -> float:
+            start = time.perf_counter()
+            voice.infer(text=text)
+            return time.perf_counter() - start
+    else:
+        def synth_s(text: str) -> float:
+            return (args.overhead_ms + len(text) * args.ms_per_char) / 1000
+
+    segmenter = TextSegmenter(args.min_chars, args.max_chars, args.first_max_chars)
+    paths = (("sentence", sentence_segments), ("adaptive", adaptive_segments(segmenter)))
+
+    print(f"{len(corpus)} texts, {args.token_ms:.0f} ms/token\n")
+    print(f"{'path':<10}{'TTFB p50':>10}{'TTFB max':>10}{'first len':>10}{'segments':>10}{'mean len':>10}"
+          f"{'short':>7}   cuts")
+    for name, segment_fn in paths:
+        rng = random.Random(args.seed)
+        ttfbs, first_lens, lengths, kinds = [], [], [], Counter()
+        for text in corpus:
+            segments = list(segment_fn(tokenize(text, rng)))
+            index, first = segments[0]
+            ttfbs.append((index + 1) * args.token_ms / 1000 + synth_s(first))
+            first_lens.append(len(first))
+            for i, (_, segment) in enumerate(segments):
+                lengths.append(len(segment))
+                kinds[cut_kind(segment, i == len(segments) - 1)] += 1
+        short = sum(1 for n in lengths if n < segmenter.min_chars) / len(lengths)
+        cuts = ", ".join(f"{kind} {count}" for kind, count in sorted(kinds.items()))
+        print(
+            f"{name:<10}{statistics.median(ttfbs) * 1000:>9.0f}ms{max(ttfbs) * 1000:>8.0f}ms"
+            f"{statistics.mean(first_lens):>10.1f}{len(lengths):>10}{statistics.mean(lengths):>10.1f}"
+            f"{short:>7.0%}   {cuts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
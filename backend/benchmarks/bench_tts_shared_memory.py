@@ -0,0 +1,75 @@
+"""
+Memory per worker process when several workers load the same TTS voice.
+
+Each of `--workers` processes creates a `ModelManager`, loads the voice, synthesizes one
+sentence and reports its `memory_report()` for the voice, then waits until every worker has
+loaded it so the figures reflect all of them at once. Run it with and without
+`--no-mmap` to compare mapped (shared) weights with private copies: with mapping, RSS is
+largely shared and PSS, each worker's fair share, drops as workers are added. Without
+mapping the weights are anonymous memory, so the report shows nothing mapped and the process
+RSS grows by the full model size in every worker.
+
+Usage:
+    python benchmarks/bench_tts_shared_memory.py --model-id jvnv-F1-jp --workers 4
+    python benchmarks/bench_tts_shared_memory.py --model-id jvnv-F1-jp --workers 4 --no-mmap
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.model_manager import ModelManager
+
+MIB = 1024 * 1024
+
+
+def process_rss() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def worker(args, loaded, results):
+    manager = ModelManager(args.model_dir, mmap_weights=not args.no_mmap)
+    voice = manager.load_model(args.model_id)
+    voice.infer(text="こんにちは。")
+    loaded.wait()
+    results.put((os.getpid(), manager.memory_report()[args.model_id], process_rss()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS shared model memory benchmark")
+    parser.add_argument("--model-id", required=True, help="Style-Bert-VITS2 voice in the model directory")
+    parser.add_argument("--model-dir", default=None, help="Defaults to TTS_MODEL_DIR")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-mmap", action="store_true", help="Load private copies of the weights")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    loaded = ctx.Barrier(args.workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(args, loaded, results)) for _ in range(args.workers)]
+    for p in processes:
+        p.start()
+    rows = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    print(f"{args.model_id}: {args.workers} workers, {'private copies' if args.no_mmap else 'mapped weights'}\n")
+    print(f"{'pid':>8}{'mapped RSS MiB':>16}{'shared MiB':>12}{'PSS MiB':>10}{'process RSS MiB':>17}")
+    for pid, usage, rss in sorted(rows):
+        print(
+            f"{pid:>8}{usage['rss'] / MIB:>16.1f}{usage['shared'] / MIB:>12.1f}"
+            f"{usage['pss'] / MIB:>10.1f}{rss / MIB:>17.1f}"
+        )
+    print(f"\nModel memory across workers (sum of PSS): {sum(usage['pss'] for _, usage, _ in rows) / MIB:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
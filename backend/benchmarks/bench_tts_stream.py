@@ -0,0 +1,121 @@
+"""
+Compares sequential sentence-by-sentence streaming with the lookahead pipeline in
+`Synthesizer.synthesize_stream`.
+
+The sequential path mirrors the old loop: synthesize sentence N, yield it, and only start
+sentence N+1 when the consumer asks for more. The consumer spends `--send-ms` per segment
+(network send / playback pacing). Reported are the gaps between consecutive segments seen
+by the consumer and the total stream time.
+
+By default a stand-in model sleeps `--ms-per-char` per character, so the benchmark runs
+without Style-Bert-VITS2. Pass `--model-id` to use a real voice instead.
+
+Usage:
+    python benchmarks/bench_tts_stream.py --lookahead 2
+    python benchmarks/bench_tts_stream.py --model-id jvnv-F1-jp
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Add the repository root to sys.path (TTS modules import `backend.src...`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.models.tts import TTSRequest
+
+TEXT = (
+    "本日はお問い合わせいただきありがとうございます。ご注文の商品は明日の午前中に発送される予定です。"
+    "配送状況はマイページからいつでも確認できます。ほかにご不明な点はございますか。"
+    "よろしければ、引き続きご案内いたします。"
+)
+
+
+class FakeModel:
+    def __init__(self, ms_per_char: float):
+        self.ms_per_char = ms_per_char
+
+    def infer(self, text: str, **kwargs):
+        time.sleep(len(text) * self.ms_per_char / 1000)
+        return 44100, np.zeros(len(text) * 2205, dtype=np.int16)
+
+
+class FakeModelManager:
+    def __init__(self, model: FakeModel):
+        self.model = model
+
+    def load_model(self, model_id: str):
+        return self.model
+
+
+async def sequential_stream(synth: Synthesizer, request: TTSRequest):
+    for segment in synth._split_segments(request.text):
+        if segment.strip():
+            frame = await synth._infer_pcm(segment, request)
+            yield frame.view()
+
+
+async def consume(stream, send_s: float):
+    start = time.perf_counter()
+    arrivals = []
+    async for chunk in stream:
+        if len(chunk) <= 44:  # WAV header
+            continue
+        arrivals.append(time.perf_counter() - start)
+        await asyncio.sleep(send_s)
+    total = time.perf_counter() - start
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    return arrivals[0], gaps, total
+
+
+async def run(args):
+    if args.model_id:
+        manager = ModelManager()
+        await asyncio.to_thread(manager.load_model, args.model_id)
+    else:
+        manager = FakeModelManager(FakeModel(args.ms_per_char))
+    request = TTSRequest(text=TEXT, model_id=args.model_id, stream=True)
+    send_s = args.send_ms / 1000
+
+    paths = (
+        ("sequential", lambda synth: sequential_stream(synth, request), 0),
+        ("lookahead", lambda synth: synth.synthesize_stream(request), args.lookahead),
+    )
+    print(f"{len(TEXT)} chars, consumer send {args.send_ms:.0f} ms/segment\n")
+    print(f"{'path':<12}{'first ms':>10}{'mean gap ms':>14}{'max gap ms':>12}{'total ms':>10}")
+    for name, make_stream, lookahead in paths:
+        results = []
+        for _ in range(args.iterations):
+            # Caching disabled so every run measures inference
+            synth = Synthesizer(manager, cache=SegmentCache(max_bytes=0), lookahead=lookahead)
+            results.append(await consume(make_stream(synth), send_s))
+        first = statistics.median(r[0] for r in results)
+        gaps = [gap for r in results for gap in r[1]]
+        total = statistics.median(r[2] for r in results)
+        print(
+            f"{name:<12}{first * 1000:>10.1f}{statistics.mean(gaps) * 1000:>14.1f}"
+            f"{max(gaps) * 1000:>12.1f}{total * 1000:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS streaming pipeline benchmark")
+    parser.add_argument("--lookahead", type=int, default=2, help="Segments synthesized ahead")
+    parser.add_argument("--send-ms", type=float, default=150.0, help="Consumer time per segment")
+    parser.add_argument("--ms-per-char", type=float, default=8.0, help="Stand-in model inference cost")
+    parser.add_argument("--iterations", type=int, default=3, help="Streams per path")
+    parser.add_argument("--model-id", default=None, help="Benchmark a real Style-Bert-VITS2 voice")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
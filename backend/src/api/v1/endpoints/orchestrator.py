@@ -2,13 +2,16 @@ import asyncio
 import json
 import logging
 
+# Same module path as the TTS endpoint, so both share one Synthesizer and its loaded models
+from backend.src.api.v1.tts_dependencies import get_synthesizer
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
-from src.api.v1.tts_dependencies import get_synthesizer
 from src.core.llm.service import llm_service
 from src.core.orchestrator.processor import VoiceOrchestrator
 from src.core.orchestrator.session import SessionContext
-from src.core.stt_processor import stt_processor
+from src.core.stt_batcher import stt_batcher
+from src.core.stt_processor import AudioInput
+from src.core.vad import SPEECH_START
 from src.models.orchestrator import OrchestratorConfig, WebSocketEvent
 
 router = APIRouter()
@@ -17,7 +20,7 @@ logger = logging.getLogger(__name__)
 # Initialize Orchestrator
 # Note: In a production app, these should be managed via dependencies
 orchestrator = VoiceOrchestrator(
-    stt_service=stt_processor,
+    stt_service=stt_batcher,
     llm_service=llm_service,
     tts_service=get_synthesizer()
 )
@@ -38,6 +41,20 @@ async def orchestrator_ws(
     session = SessionContext()
     logger.info(f"New voice session started: {session.session_id}")
 
+    def start_turn(audio: AudioInput):
+        # Create a task for processing the turn to allow cancellation
+        session.cancel_current_task()
+
+        async def run_turn():
+            async for result in orchestrator.process_audio_turn(audio, session):
+                if isinstance(result, dict):
+                    await websocket.send_json(result)
+                else:
+                    # Audio chunks may be memoryviews of the synthesized samples; sent without copying
+                    await websocket.send_bytes(result)
+
+        session.current_task = asyncio.create_task(run_turn())
+
     try:
         while True:
             # Receive message (can be text/json or binary/audio)
@@ -49,7 +66,7 @@ async def orchestrator_ws(
                 event = WebSocketEvent(**data)
                 
                 if event.type == "config":
-                    session.config = OrchestratorConfig(**event.payload)
+                    session.update_config(OrchestratorConfig(**event.payload))
                     logger.info(f"Session {session.session_id} config updated")
                 
                 elif event.type == "speech_start":
@@ -60,18 +77,20 @@ async def orchestrator_ws(
             elif "bytes" in message:
                 # Handle raw audio data
                 audio_bytes = message["bytes"]
-                
-                # Create a task for processing the turn to allow cancellation
-                session.cancel_current_task()
-                
-                async def run_turn():
-                    async for result in orchestrator.process_audio_turn(audio_bytes, session):
-                        if isinstance(result, dict):
-                            await websocket.send_json(result)
-                        elif isinstance(result, bytes):
-                            await websocket.send_bytes(result)
 
-                session.current_task = asyncio.create_task(run_turn())
+                if session.vad is None:
+                    # Client-side endpointing: each binary frame is a complete utterance
+                    start_turn(audio_bytes)
+                    continue
+
+                for vad_event in session.vad.process(audio_bytes):
+                    if vad_event.type == SPEECH_START:
+                        # Server-side barge-in, no client round-trip needed
+                        session.cancel_current_task()
+                        await websocket.send_json({"type": "speech_start", "payload": {}})
+                        logger.info(f"Speech start detected for session {session.session_id}")
+                    else:
+                        start_turn(vad_event.audio)
 
     except WebSocketDisconnect:
         logger.info(f"Voice session disconnected: {session.session_id}")
@@ -1,17 +1,63 @@
-from typing import Annotated
+import functools
+import json
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 
 from src.api.v1.dependencies import get_api_key
+from src.core.stt_batcher import stt_batcher
+from src.core.stt_longform import LongFormTranscriber, decode_windows
 from src.core.stt_processor import stt_processor
 from src.middlewares.rate_limiter import rate_limit_dependency  # Import shared rate limit dependency
-from src.models.stt_models import TranscriptionResult
-from src.utils.audio_utils import convert_audio_to_wav, get_audio_duration  # Import convert_audio_to_wav
+from src.models.stt_models import LongFormTranscriptionResult, TranscriptionResult
+from src.utils.audio_utils import sniff_audio_format
 
 router = APIRouter()
 
 MAX_FILE_SIZE_MB = 50
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File size exceeds {MAX_FILE_SIZE_MB}MB limit.",
+    )
+
+
+async def open_upload(audio_file: UploadFile) -> AsyncIterator[bytes]:
+    """
+    Validates an upload and returns an iterator over its content in fixed-size chunks.
+
+    Oversized files are rejected from the size Starlette recorded while spooling the body,
+    before any of it is read. The size is also enforced while reading, in case it is unknown.
+    The audio format is sniffed from the first chunk; the declared content_type is not trusted.
+    """
+    if audio_file.size is not None and audio_file.size > MAX_FILE_SIZE_BYTES:
+        raise _file_too_large()
+
+    first = await audio_file.read(UPLOAD_CHUNK_BYTES)
+    if sniff_audio_format(first) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Unsupported media type: {audio_file.content_type}. "
+                "Supported formats are WAV, MP3, AAC, M4A, OGG, FLAC and WebM."
+            ),
+        )
+
+    async def chunks():
+        chunk, total = first, len(first)
+        while chunk:
+            yield chunk
+            chunk = await audio_file.read(UPLOAD_CHUNK_BYTES)
+            total += len(chunk)
+            if total > MAX_FILE_SIZE_BYTES:
+                raise _file_too_large()
+
+    return chunks()
 
 
 @router.post(
@@ -24,43 +70,72 @@ async def transcribe_file(
     api_key: Annotated[str, Depends(get_api_key)],
     audio_file: UploadFile = File(...),
 ):
-    # Validate file type
-    if audio_file.content_type not in ["audio/wav", "audio/mpeg"]:  # audio/mpeg for MP3
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported media type: {audio_file.content_type}. Only WAV and MP3 are supported.",
-        )
+    chunks = await open_upload(audio_file)
 
-    # Validate file size
-    file_contents = await audio_file.read()
-    if len(file_contents) > MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File size exceeds {MAX_FILE_SIZE_MB}MB limit.",
-        )
-
-    # Convert audio to WAV format compatible with Nemo
+    # The upload is decoded as it is read and cut into bounded windows, so memory per request
+    # stays constant; a short file is a single window and a single forward pass.
+    transcriber = LongFormTranscriber(stt_batcher.transcribe)
     try:
-        wav_audio_bytes = convert_audio_to_wav(file_contents, audio_file.content_type.split("/")[-1])
-    except Exception as e:
+        texts = [result["text"] async for result in transcriber.run(decode_windows(chunks))]
+    except HTTPException:
+        raise
+    except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Audio conversion failed: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-    try:
-        transcribed_text = stt_processor.transcribe(wav_audio_bytes)
+    # Dummy confidence for now
+    return TranscriptionResult(
+        text="".join(texts),
+        confidence=None,
+        is_final=True,
+        start_timestamp=0.0,
+        end_timestamp=transcriber.duration,
+    )
 
-        # Dummy timestamps and confidence for now
-        duration = get_audio_duration(file_contents, audio_file.content_type.split("/")[-1])
 
-        return TranscriptionResult(
-            text=transcribed_text,
-            confidence=None,
-            is_final=True,
-            start_timestamp=0.0,
-            end_timestamp=duration,
-        )
+@router.post(
+    "/transcribe/file/long",
+    response_model=LongFormTranscriptionResult,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(rate_limit_dependency)],
+)
+async def transcribe_file_long(
+    api_key: Annotated[str, Depends(get_api_key)],
+    audio_file: UploadFile = File(...),
+    stream: bool = Query(False, description="Stream segment results as NDJSON while they finish."),
+):
+    """
+    Long-form transcription: the audio is decoded incrementally, cut at silences into bounded
+    windows and the windows are transcribed in parallel, so memory does not grow with length.
+    """
+    chunks = await open_upload(audio_file)
+    results = LongFormTranscriber(stt_batcher.transcribe).run(decode_windows(chunks))
+
+    if stream:
+
+        async def ndjson():
+            try:
+                async for result in results:
+                    yield TranscriptionResult(**result).model_dump_json() + "\n"
+            except HTTPException as e:
+                yield json.dumps({"error": e.detail}, ensure_ascii=False) + "\n"
+            except Exception as e:
+                yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    try:
+        segments = [TranscriptionResult(**result) async for result in results]
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Audio conversion failed: {e}")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+    return LongFormTranscriptionResult(text="".join(segment.text for segment in segments), segments=segments)
+
 
 @router.websocket("/transcribe/stream")
 async def transcribe_stream(
@@ -73,13 +148,23 @@ async def transcribe_stream(
 
         async def audio_generator():
             while True:
-                data = await websocket.receive_bytes()
-                yield data
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("bytes") is not None:
+                    yield message["bytes"]
+                elif message.get("text") is not None:
+                    # A text frame marks the end of the audio stream; pending speech is finalized
+                    return
 
-        async for result in stt_processor.transcribe_stream(audio_generator()):
+        # Partial windows grow with every step and never recur, so they bypass the transcript cache
+        results = stt_processor.transcribe_stream(
+            audio_generator(),
+            decode=stt_batcher.transcribe,
+            decode_partial=functools.partial(stt_batcher.transcribe, cache=False),
+        )
+        async for result in results:
             await websocket.send_json(result)
-            if result.get("is_final"):
-                break
     except WebSocketDisconnect:
         pass
     except Exception as e:
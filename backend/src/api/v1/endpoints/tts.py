@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import List
 
@@ -6,6 +7,7 @@ from backend.src.api.v1.tts_dependencies import get_model_manager, get_synthesiz
 from backend.src.core.tts.model_manager import ModelManager
 from backend.src.core.tts.synthesizer import Synthesizer
 from backend.src.models.tts import TTSRequest, VoiceModel
+from backend.src.utils.codecs import MEDIA_TYPES, check_output_format
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import Response, StreamingResponse
 
@@ -19,17 +21,20 @@ async def synthesize(
 ):
     """
     Synthesize Japanese text to speech.
-    Supports both batch (wait for full audio) and streaming modes.
+    Supports both batch (wait for full audio) and streaming modes, in the requested output format.
     """
     try:
+        # Fail before the streaming response has started
+        check_output_format(request.output_format, request.sample_rate)
+        media_type = MEDIA_TYPES[request.output_format]
         if request.stream:
             return StreamingResponse(
                 synthesizer.synthesize_stream(request),
-                media_type="audio/wav"
+                media_type=media_type
             )
         else:
             audio_data = await synthesizer.synthesize(request)
-            return Response(content=audio_data, media_type="audio/wav")
+            return Response(content=audio_data, media_type=media_type)
     except ValueError as e:
         logger.warning(f"TTS Bad Request: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -42,4 +47,12 @@ async def list_models(
     model_manager: ModelManager = Depends(get_model_manager)
 ):
     """List available voice models and their styles."""
-    return model_manager.list_models()
\ No newline at end of file
+    return model_manager.list_models()
+
+
+@router.get("/models/memory", dependencies=[Depends(get_api_key)])
+async def model_memory(
+    model_manager: ModelManager = Depends(get_model_manager)
+):
+    """Resident and shared memory of each loaded voice's mapped weights in this worker, in bytes."""
+    return await asyncio.to_thread(model_manager.memory_report)
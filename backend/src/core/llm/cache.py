@@ -0,0 +1,132 @@
+"""Exact-match cache of LLM responses."""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from src.models.llm import LLMRequest
+from src.utils.cache import LRUCache
+
+LLM_CACHE_HITS = Counter("llm_cache_hits_total", "Chat completions served from the response cache", ["mode"])
+LLM_CACHE_MISSES = Counter("llm_cache_misses_total", "Cacheable chat completions not found in the response cache")
+LLM_CACHE_HIT_RATIO = Gauge("llm_cache_hit_ratio", "Fraction of cacheable chat completions served from the cache")
+LLM_CACHE_TOKENS_SAVED = Counter(
+    "llm_cache_tokens_saved_total", "Tokens not requested from the LLM thanks to the response cache", ["type"]
+)
+LLM_CACHE_BYTES = Gauge("llm_cache_bytes", "Bytes held by the LLM response cache")
+
+# Rough per-entry and per-chunk overhead of the key, the strings and bookkeeping
+ENTRY_OVERHEAD_BYTES = 200
+CHUNK_OVERHEAD_BYTES = 50
+
+
+@dataclass
+class CachedCompletion:
+    """A finished completion: the content as it was streamed (one chunk when it was not) and its usage."""
+
+    chunks: List[str]
+    finish_reason: Optional[str]
+    prompt_tokens: int
+    completion_tokens: int
+    expires_at: float
+
+    @property
+    def content(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def nbytes(self) -> int:
+        return ENTRY_OVERHEAD_BYTES + sum(len(chunk.encode()) + CHUNK_OVERHEAD_BYTES for chunk in self.chunks)
+
+
+class ResponseCache:
+    """
+    Exact-match cache of chat completions for deterministic requests.
+
+    Keys are the SHA-256 of a canonical JSON encoding of the model, messages, temperature and
+    max_tokens, plus whether the response was streamed: a streamed entry keeps the token chunks
+    for replay, a non-streamed one the usage reported by the API. Only requests with a
+    temperature up to `max_temperature` are cached. Entries expire after `ttl` seconds and live
+    in a byte-budgeted LRU; a budget of 0 (the default) disables the cache.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_temperature: Optional[float] = None,
+    ):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("LLM_CACHE_MAX_MB", "0")) * 1024 * 1024)
+        if ttl is None:
+            ttl = float(os.getenv("LLM_CACHE_TTL_S", "300"))
+        if max_temperature is None:
+            max_temperature = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.0"))
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.memory = LRUCache(max_bytes, sizeof=lambda entry: entry.nbytes)
+        self.hits = 0
+        self.lookups = 0
+
+    def cacheable(self, request: LLMRequest) -> bool:
+        return self.memory.max_bytes > 0 and self.ttl > 0 and request.temperature <= self.max_temperature
+
+    @staticmethod
+    def key(model: str, request: LLMRequest, stream: bool) -> str:
+        params = {
+            "model": model,
+            "messages": [m.model_dump() for m in request.messages],
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens,
+            "stream": stream,
+        }
+        canonical = json.dumps(params, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str, mode: str) -> Optional[CachedCompletion]:
+        self.lookups += 1
+        entry = self.memory.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self.memory.pop(key)
+            entry = None
+
+        if entry is None:
+            LLM_CACHE_MISSES.inc()
+        else:
+            self.hits += 1
+            LLM_CACHE_HITS.labels(mode=mode).inc()
+            LLM_CACHE_TOKENS_SAVED.labels(type="prompt").inc(entry.prompt_tokens)
+            LLM_CACHE_TOKENS_SAVED.labels(type="completion").inc(entry.completion_tokens)
+        self._update_gauges()
+        return entry
+
+    def put(
+        self,
+        key: str,
+        chunks: List[str],
+        finish_reason: Optional[str],
+        prompt_tokens: int,
+        completion_tokens: int,
+    ):
+        entry = CachedCompletion(
+            chunks=chunks,
+            finish_reason=finish_reason,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self.memory.put(key, entry)
+        self._update_gauges()
+
+    def clear(self):
+        self.memory.clear()
+        self._update_gauges()
+
+    def _update_gauges(self):
+        LLM_CACHE_HIT_RATIO.set(self.hits / self.lookups if self.lookups else 0.0)
+        LLM_CACHE_BYTES.set(self.memory.nbytes)
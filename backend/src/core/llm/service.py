@@ -1,10 +1,12 @@
 """LLM service logic."""
 
 import json
+from typing import Optional
 
 import openai
 from fastapi import HTTPException
 
+from src.core.llm.cache import ResponseCache
 from src.core.llm.client import openai_client
 from src.models.llm import LLMRequest, LLMResponse, LLMResponseUsage
 from src.utils.logging import log_llm_usage
@@ -13,8 +15,28 @@ from src.utils.logging import log_llm_usage
 class LLMService:
     """Service for handling LLM requests."""
 
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        self.cache = cache if cache is not None else ResponseCache()
+
+    def _cache_key(self, request: LLMRequest, stream: bool) -> Optional[str]:
+        """Key of a cacheable request, or None when the response must not be cached."""
+        if not self.cache.cacheable(request):
+            return None
+        return self.cache.key(openai_client.model, request, stream)
+
     async def get_chat_completion(self, request: LLMRequest) -> LLMResponse:
         """Get a non-streaming chat completion."""
+        key = self._cache_key(request, stream=False)
+        if key is not None:
+            cached = self.cache.get(key, mode="batch")
+            if cached is not None:
+                usage = LLMResponseUsage(
+                    prompt_tokens=cached.prompt_tokens,
+                    completion_tokens=cached.completion_tokens,
+                    total_tokens=cached.prompt_tokens + cached.completion_tokens,
+                )
+                return LLMResponse(content=cached.content, usage=usage, finish_reason=cached.finish_reason)
+
         try:
             messages = [m.model_dump() for m in request.messages]
             response = await openai_client.create_chat_completion(
@@ -38,6 +60,8 @@ class LLMService:
                 total_tokens=usage.total_tokens,
             )
 
+            if key is not None:
+                self.cache.put(key, [content], finish_reason, usage.prompt_tokens, usage.completion_tokens)
             return LLMResponse(content=content, usage=usage, finish_reason=finish_reason)
         except openai.AuthenticationError:
             raise HTTPException(status_code=401, detail="OpenAI Authentication failed")
@@ -49,24 +73,47 @@ class LLMService:
             raise HTTPException(status_code=500, detail=f"LLM Service internal error: {str(e)}")
 
     async def stream_chat_completion(self, request: LLMRequest):
-        """Stream chat completion tokens."""
+        """Stream chat completion tokens. A cache hit replays the stored chunks without delay."""
+        key = self._cache_key(request, stream=True)
+        if key is not None:
+            cached = self.cache.get(key, mode="stream")
+            if cached is not None:
+                for content in cached.chunks:
+                    yield content
+                return
+
         try:
             messages = [m.model_dump() for m in request.messages]
             stream = await openai_client.create_chat_completion(
                 messages=messages, temperature=request.temperature, max_tokens=request.max_tokens, stream=True
             )
 
+            chunks = []
+            finish_reason = None
+            prompt_tokens = completion_tokens = None
             async for chunk in stream:
                 if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
                     yield chunk.choices[0].delta.content
+                if chunk.choices and chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
 
                 if hasattr(chunk, "usage") and chunk.usage:
+                    prompt_tokens = chunk.usage.prompt_tokens
+                    completion_tokens = chunk.usage.completion_tokens
                     log_llm_usage(
                         model=openai_client.model,
                         prompt_tokens=chunk.usage.prompt_tokens,
                         completion_tokens=chunk.usage.completion_tokens,
                         total_tokens=chunk.usage.total_tokens,
                     )
+
+            # Only complete answers are cached: not ones the caller stopped reading or that failed midway.
+            # Without usage in the stream, count one completion token per chunk.
+            if key is not None and finish_reason is not None:
+                if completion_tokens is None:
+                    completion_tokens = len(chunks)
+                self.cache.put(key, chunks, finish_reason, prompt_tokens or 0, completion_tokens)
         except openai.AuthenticationError:
             yield json.dumps({"error": "Authentication failed"})
         except openai.RateLimitError:
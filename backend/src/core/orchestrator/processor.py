@@ -1,38 +1,41 @@
 import asyncio
 import logging
-import re
 import time
-from typing import AsyncGenerator, Union
+from typing import AsyncGenerator, Optional, Union
+
+from backend.src.core.tts.scheduler import Priority
+from backend.src.core.tts.segmenter import TextSegmenter
+from backend.src.utils.codecs import Chunk
 
 from src.core.orchestrator.session import SessionContext
 from src.models.llm import ChatMessage as LLMChatMessage
 from src.models.llm import LLMRequest
 from src.models.tts import TTSRequest
+from src.utils.audio import AudioFrame
 
 logger = logging.getLogger(__name__)
 
 class VoiceOrchestrator:
-    def __init__(self, stt_service, llm_service, tts_service):
+    def __init__(self, stt_service, llm_service, tts_service, segmenter: Optional[TextSegmenter] = None):
         self.stt_service = stt_service
         self.llm_service = llm_service
         self.tts_service = tts_service
+        self.segmenter = segmenter or TextSegmenter()
 
-    def _split_into_sentences(self, text: str) -> list[str]:
-        # Split by Japanese punctuation
-        return re.findall(r'[^。！？\n]+[。！？\n]*', text)
-
-    async def process_audio_turn(self, audio_bytes: bytes, session: SessionContext) -> AsyncGenerator[Union[dict, bytes], None]:
+    async def process_audio_turn(
+        self, audio: Union[bytes, AudioFrame], session: SessionContext
+    ) -> AsyncGenerator[Union[dict, Chunk], None]:
         """
         Orchestrates one turn of voice interaction:
-        1. STT: audio -> text
+        1. STT: audio (a VAD AudioFrame, raw 16 kHz PCM or WAV, decoded in memory) -> text
         2. LLM: text -> stream of tokens
-        3. TTS: tokens -> sentence chunks -> audio stream
+        3. TTS: tokens -> segments (a short first one, then sentences or clauses) -> audio stream
         """
         start_time = time.perf_counter()
         try:
             # 1. STT
             stt_start = time.perf_counter()
-            transcript = await asyncio.to_thread(self.stt_service.transcribe, audio_bytes)
+            transcript = await self.stt_service.transcribe(audio)
             stt_duration = time.perf_counter() - stt_start
             
             logger.info("STT stage complete", extra={
@@ -57,7 +60,9 @@ class VoiceOrchestrator:
             llm_request = LLMRequest(messages=messages, stream=True)
 
             full_response = ""
-            current_buffer = ""
+            segments = self.segmenter.stream()
+            # Only the first sentence of the turn keeps the user waiting in silence
+            tts_priority = Priority.INTERACTIVE_FIRST
             
             async for token in self.llm_service.stream_chat_completion(llm_request):
                 if not first_token_received:
@@ -70,21 +75,20 @@ class VoiceOrchestrator:
                     first_token_received = True
                 
                 full_response += token
-                current_buffer += token
-                
-                # Check for sentence boundaries
-                if any(p in token for p in "。！？\n"):
-                    sentences = self._split_into_sentences(current_buffer)
-                    # Process all but the last potentially incomplete sentence
-                    for i in range(len(sentences) - 1):
-                        sentence = sentences[i]
-                        async for audio_chunk in self._stream_tts(sentence, session.config, session.session_id):
-                            yield audio_chunk
-                    current_buffer = sentences[-1]
+
+                # Synthesize each segment as soon as the segmenter considers it complete
+                for segment in segments.feed(token):
+                    async for audio_chunk in self._stream_tts(
+                        segment, session.config, session.session_id, tts_priority
+                    ):
+                        yield audio_chunk
+                    tts_priority = Priority.INTERACTIVE
 
             # Process remaining buffer
-            if current_buffer.strip():
-                async for audio_chunk in self._stream_tts(current_buffer, session.config, session.session_id):
+            for segment in segments.flush():
+                async for audio_chunk in self._stream_tts(
+                    segment, session.config, session.session_id, tts_priority
+                ):
                     yield audio_chunk
 
             session.add_message(role="assistant", content=full_response)
@@ -103,16 +107,20 @@ class VoiceOrchestrator:
             logger.error(f"Error in voice orchestrator: {e}", exc_info=True, extra={"session_id": str(session.session_id)})
             yield {"type": "error", "payload": {"code": "INTERNAL_ERROR", "message": str(e)}}
 
-    async def _stream_tts(self, text: str, config, session_id) -> AsyncGenerator[bytes, None]:
+    async def _stream_tts(
+        self, text: str, config, session_id, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncGenerator[Chunk, None]:
         tts_start = time.perf_counter()
         tts_request = TTSRequest(
             text=text,
             model_id=config.tts_voice,
             style=config.tts_style,
-            stream=True
+            stream=True,
+            output_format=config.tts_output_format,
+            sample_rate=config.tts_sample_rate,
         )
         first_chunk = True
-        async for chunk in self.tts_service.synthesize_stream(tts_request):
+        async for chunk in self.tts_service.synthesize_stream(tts_request, priority=priority, session=session_id):
             if first_chunk:
                 tts_ttfb = time.perf_counter() - tts_start
                 logger.info("TTS segment TTFB", extra={
@@ -5,6 +5,7 @@ from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
 
+from src.core.vad import EnergyVAD
 from src.models.orchestrator import OrchestratorConfig
 
 
@@ -19,6 +20,14 @@ class SessionContext:
         self.history: List[ChatMessage] = []
         self.current_task: Optional[asyncio.Task] = None
         self.config: OrchestratorConfig = OrchestratorConfig()
+        self.vad: Optional[EnergyVAD] = None
+
+    def update_config(self, config: OrchestratorConfig):
+        self.config = config
+        if config.server_vad:
+            self.vad = EnergyVAD(threshold_db=config.vad_threshold_db, hangover_ms=config.vad_hangover_ms)
+        else:
+            self.vad = None
 
     def add_message(self, role: str, content: str):
         self.history.append(ChatMessage(role=role, content=content))
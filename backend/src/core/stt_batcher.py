@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+from prometheus_client import Histogram
+
+from src.core.stt_cache import STT_CACHE_COALESCED, TranscriptCache
+from src.core.stt_processor import AudioInput, STTProcessor, stt_processor
+from src.core.stt_workers import STTWorkerPool
+from src.utils.cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+STT_BATCH_SIZE = Histogram(
+    "stt_batch_size",
+    "Number of utterances per batched STT forward pass",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+STT_QUEUE_WAIT = Histogram(
+    "stt_batch_queue_wait_seconds",
+    "Time an STT request waits in the batching queue before its forward pass starts",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+@dataclass
+class _PendingRequest:
+    audio: AudioInput
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class STTBatcher:
+    """
+    Async front-end for `STTProcessor` that groups concurrent requests into one forward pass.
+
+    A batch is dispatched as soon as it reaches `max_batch_size`, or `max_wait_ms` after its
+    oldest request was queued, whichever comes first. While a batch is running new requests
+    keep queueing, so the batch size grows with load.
+
+    Without a worker pool batches run one at a time in a thread. With an `STTWorkerPool`
+    one batch per worker process can be in flight.
+
+    With a `TranscriptCache`, cached audio is answered without queueing, and concurrent
+    requests for identical audio share a single queued transcription.
+    """
+
+    def __init__(
+        self,
+        processor: STTProcessor,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        worker_pool: Optional[STTWorkerPool] = None,
+        cache: Optional[TranscriptCache] = None,
+    ):
+        self.processor = processor
+        self.worker_pool = worker_pool
+        self.cache = cache
+        self._single_flight: SingleFlight[str] = SingleFlight()
+        self.max_batch_size = max_batch_size or int(os.getenv("STT_BATCH_MAX_SIZE", "8"))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("STT_BATCH_MAX_WAIT_MS", "10"))
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._pending: Deque[_PendingRequest] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def transcribe(self, audio: AudioInput, cache: bool = True) -> str:
+        """
+        Queues one utterance and waits for its transcript. `cache=False` skips the transcript
+        cache, for audio that will not recur (e.g. the growing windows of streaming partials).
+        """
+        if self.cache is None or not cache:
+            return await self._enqueue(audio)
+
+        # Decoding, resampling and hashing a long upload takes a while (and the cache may read a
+        # file); keep it off the event loop
+        signal, key, text = await asyncio.to_thread(self._lookup, audio)
+        if text is not None:
+            return text
+        if key in self._single_flight:
+            STT_CACHE_COALESCED.inc()
+        return await self._single_flight.do(key, lambda: self._transcribe_and_cache(key, signal))
+
+    def _lookup(self, audio: AudioInput) -> Tuple[np.ndarray, str, Optional[str]]:
+        signal = self.processor._to_signal(audio)
+        key = self.cache.key(signal)
+        return signal, key, self.cache.get(key)
+
+    async def _transcribe_and_cache(self, key: str, signal) -> str:
+        text = await self._enqueue(signal)
+        await asyncio.to_thread(self.cache.put, key, text)
+        return text
+
+    async def _enqueue(self, audio: AudioInput) -> str:
+        self._ensure_worker()
+        request = _PendingRequest(audio=audio, future=self._loop.create_future())
+        self._pending.append(request)
+        self._wakeup.set()
+        return await request.future
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.worker_pool.workers if self.worker_pool else 1)
+            self._worker = loop.create_task(self._run())
+
+    async def _next_batch(self) -> List[_PendingRequest]:
+        while not self._pending:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+        deadline = self._pending[0].enqueued_at + self.max_wait
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        batch = []
+        while self._pending and len(batch) < self.max_batch_size:
+            request = self._pending.popleft()
+            # Callers that gave up (e.g. barge-in cancelled the turn) are dropped
+            if not request.future.done():
+                batch.append(request)
+        return batch
+
+    async def _run(self):
+        while True:
+            # Wait for a free slot first so requests keep accumulating while all slots are busy
+            await self._slots.acquire()
+            batch = await self._next_batch()
+            if not batch:
+                self._slots.release()
+                continue
+            asyncio.get_running_loop().create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[_PendingRequest]):
+        started = time.perf_counter()
+        for request in batch:
+            STT_QUEUE_WAIT.observe(started - request.enqueued_at)
+        STT_BATCH_SIZE.observe(len(batch))
+
+        try:
+            audios = [r.audio for r in batch]
+            if self.worker_pool is not None:
+                # Requests that skipped the cache still hold encoded audio; decode it off the event loop
+                signals = await asyncio.to_thread(lambda: [self.processor._to_signal(a) for a in audios])
+                texts = await self.worker_pool.transcribe_batch(signals)
+            else:
+                # The cache was consulted in `transcribe`; the processor must not look it up again
+                texts = await asyncio.to_thread(self.processor.transcribe_uncached, audios)
+        except Exception as e:
+            logger.error(f"Batched transcription of {len(batch)} requests failed: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for request, text in zip(batch, texts):
+            if not request.future.done():
+                request.future.set_result(text)
+
+    async def warm_up(self):
+        """Loads and warms up the model in-process, or in every worker process when a pool is set."""
+        if self.worker_pool is not None:
+            await self.worker_pool.warm_up()
+        else:
+            await asyncio.to_thread(self.processor.warm_up)
+
+    async def close(self):
+        """Stops the dispatcher and the worker processes, if any."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+
+
+def _create_worker_pool() -> Optional[STTWorkerPool]:
+    workers = int(os.getenv("STT_WORKERS", "0"))
+    if workers <= 0:
+        return None
+    logger.info(f"Starting {workers} STT worker processes")
+    return STTWorkerPool(workers)
+
+
+stt_batcher = STTBatcher(stt_processor, worker_pool=_create_worker_pool(), cache=stt_processor.cache)
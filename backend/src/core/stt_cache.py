@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from src.utils.cache import DiskCache, LRUCache
+
+logger = logging.getLogger(__name__)
+
+STT_CACHE_HITS = Counter("stt_cache_hits_total", "Transcriptions served from the result cache", ["tier"])
+STT_CACHE_MISSES = Counter("stt_cache_misses_total", "Transcriptions not found in the result cache")
+STT_CACHE_COALESCED = Counter(
+    "stt_cache_coalesced_total", "Transcriptions that joined an identical in-flight transcription"
+)
+STT_CACHE_BYTES = Gauge("stt_cache_bytes", "Bytes held by the transcription result cache", ["tier"])
+
+# Rough per-entry overhead of the key and bookkeeping, so tiny transcripts are not accounted as free
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class TranscriptCache:
+    """
+    Content-addressed cache of transcripts.
+
+    Keys are the SHA-256 of the normalised input (float32 mono 16 kHz samples) combined with the
+    model id, so the same audio sent as WAV or raw PCM shares one entry. Entries live in a
+    byte-budgeted in-memory LRU, with an optional on-disk tier in `directory` that survives
+    restarts.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        max_bytes: Optional[int] = None,
+        directory: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+    ):
+        self.model_id = model_id
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("STT_CACHE_MAX_MB", "16")) * 1024 * 1024)
+        directory = directory or os.getenv("STT_CACHE_DIR") or None
+        if disk_max_bytes is None and os.getenv("STT_CACHE_DISK_MAX_MB"):
+            disk_max_bytes = int(float(os.getenv("STT_CACHE_DISK_MAX_MB")) * 1024 * 1024)
+
+        self.memory = LRUCache(max_bytes, sizeof=lambda text: len(text.encode()) + ENTRY_OVERHEAD_BYTES)
+        self.disk = DiskCache(directory, disk_max_bytes) if directory else None
+        if self.disk is not None:
+            logger.info(f"STT result cache on disk: {directory} ({len(self.disk)} entries)")
+
+    def key(self, signal: np.ndarray) -> str:
+        digest = hashlib.sha256(self.model_id.encode())
+        digest.update(np.ascontiguousarray(signal, dtype=np.float32).data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        text = self.memory.get(key)
+        if text is not None:
+            STT_CACHE_HITS.labels(tier="memory").inc()
+            return text
+
+        if self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                text = data.decode()
+                self.memory.put(key, text)
+                STT_CACHE_HITS.labels(tier="disk").inc()
+                self._update_gauges()
+                return text
+
+        STT_CACHE_MISSES.inc()
+        return None
+
+    def put(self, key: str, text: str):
+        self.memory.put(key, text)
+        if self.disk is not None and not self.disk.contains(key):
+            self.disk.put(key, text.encode())
+        self._update_gauges()
+
+    def _update_gauges(self):
+        STT_CACHE_BYTES.labels(tier="memory").set(self.memory.nbytes)
+        if self.disk is not None:
+            STT_CACHE_BYTES.labels(tier="disk").set(self.disk.nbytes)
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.utils.audio_utils import STT_SAMPLE_RATE, BytesLike, StreamingPCMDecoder
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+
+
+class AudioWindow(NamedTuple):
+    start: int  # Absolute index of the first sample in the file
+    samples: np.ndarray
+
+
+class SilenceSegmenter:
+    """
+    Cuts a float32 sample stream into windows of at most `max_window_s`.
+
+    Each cut is placed in the quietest 20 ms frame within the last `search_s` of the window, so
+    words are rarely split. Only the current window is buffered, whatever the stream length.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = STT_SAMPLE_RATE,
+        max_window_s: Optional[float] = None,
+        search_s: Optional[float] = None,
+    ):
+        max_window_s = max_window_s or float(os.getenv("STT_LONGFORM_WINDOW_S", "20"))
+        search_s = search_s or float(os.getenv("STT_LONGFORM_SEARCH_S", "5"))
+        self._frame = sample_rate * FRAME_MS // 1000
+        self._max = int(sample_rate * max_window_s)
+        self._search = min(int(sample_rate * search_s), self._max) // self._frame * self._frame
+
+        self._chunks: List[np.ndarray] = []
+        self._buffered = 0
+        self._offset = 0  # Absolute index of the first buffered sample
+
+    def _cut_point(self, window: np.ndarray) -> int:
+        if self._search < self._frame:
+            return window.size
+        region = window[window.size - self._search :].reshape(-1, self._frame)
+        quietest = int(np.argmin(np.einsum("ij,ij->i", region, region)))
+        return window.size - self._search + quietest * self._frame + self._frame // 2
+
+    def push(self, samples: np.ndarray) -> List[AudioWindow]:
+        """Buffers samples and returns every window that is complete."""
+        self._chunks.append(samples)
+        self._buffered += samples.size
+        if self._buffered < self._max:
+            return []
+
+        buffer = np.concatenate(self._chunks)
+        windows = []
+        while buffer.size >= self._max:
+            cut = self._cut_point(buffer[: self._max])
+            windows.append(AudioWindow(self._offset, buffer[:cut]))
+            self._offset += cut
+            buffer = buffer[cut:]
+        self._chunks = [buffer]
+        self._buffered = buffer.size
+        return windows
+
+    def finish(self) -> List[AudioWindow]:
+        """Returns the final, shorter window, if any audio is left."""
+        if not self._buffered:
+            return []
+        window = AudioWindow(self._offset, np.concatenate(self._chunks))
+        self._offset += window.samples.size
+        self._chunks = []
+        self._buffered = 0
+        return [window]
+
+
+class LongFormTranscriber:
+    """
+    Transcribes long audio window by window with up to `max_parallel` windows in flight.
+
+    Windows are submitted concurrently (so the STT batcher can group them into one forward
+    pass), and results are yielded in file order as soon as each one and its predecessors are
+    done. The window source is only advanced while there is a free slot, which bounds memory.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[np.ndarray], Awaitable[str]],
+        sample_rate: int = STT_SAMPLE_RATE,
+        max_parallel: Optional[int] = None,
+    ):
+        self.transcribe = transcribe
+        self.sample_rate = sample_rate
+        self.max_parallel = max_parallel or int(os.getenv("STT_LONGFORM_PARALLEL", "8"))
+        self.duration = 0.0  # Seconds of audio consumed so far
+
+    def _result(self, window: AudioWindow, text: str) -> Dict:
+        return {
+            "text": text,
+            "is_final": True,
+            "start_timestamp": window.start / self.sample_rate,
+            "end_timestamp": (window.start + window.samples.size) / self.sample_rate,
+        }
+
+    async def run(self, windows: AsyncIterator[AudioWindow]) -> AsyncIterator[Dict]:
+        """Yields one final result per non-empty window, in order."""
+        in_flight: Deque[Tuple[AudioWindow, asyncio.Task]] = deque()
+        try:
+            async for window in windows:
+                self.duration = (window.start + window.samples.size) / self.sample_rate
+                in_flight.append((window, asyncio.create_task(self.transcribe(window.samples))))
+                # Hand out finished results early, and wait on the oldest when all slots are busy
+                while in_flight and (len(in_flight) >= self.max_parallel or in_flight[0][1].done()):
+                    done_window, task = in_flight.popleft()
+                    text = await task
+                    if text:
+                        yield self._result(done_window, text)
+
+            while in_flight:
+                done_window, task = in_flight.popleft()
+                text = await task
+                if text:
+                    yield self._result(done_window, text)
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+
+
+async def decode_windows(
+    chunks: AsyncIterator[BytesLike],
+    sample_rate: int = STT_SAMPLE_RATE,
+    segmenter: Optional[SilenceSegmenter] = None,
+) -> AsyncIterator[AudioWindow]:
+    """Decodes an audio file arriving in chunks and cuts it into transcription windows."""
+    decoder = StreamingPCMDecoder(sample_rate)
+    segmenter = segmenter or SilenceSegmenter(sample_rate)
+    try:
+        async for chunk in chunks:
+            # Writing to ffmpeg may block briefly; keep it off the event loop
+            for samples in await asyncio.to_thread(decoder.feed, chunk):
+                for window in segmenter.push(samples):
+                    yield window
+        for samples in await asyncio.to_thread(decoder.finish):
+            for window in segmenter.push(samples):
+                yield window
+        for window in segmenter.finish():
+            yield window
+    finally:
+        decoder.close()
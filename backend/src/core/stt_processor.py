@@ -1,19 +1,36 @@
+import asyncio
 import logging
-import tempfile
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Union
 
+import numpy as np
+import torch
 from nemo.collections.asr.models import ASRModel
 
+from src.core.stt_cache import TranscriptCache
+from src.core.stt_streaming import StreamingTranscriber
+from src.utils.audio import AudioFrame
+from src.utils.audio_utils import STT_SAMPLE_RATE, load_pcm16k
+
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "reazonspeech-nemo-v2"
+
+# WAV bytes, raw 16 kHz s16le PCM, an AudioFrame (e.g. a VAD utterance), or float32 samples at 16 kHz
+AudioInput = Union[bytes, bytearray, memoryview, AudioFrame, np.ndarray]
+
+WARMUP_SECONDS = 1.0
+
 
 class STTProcessor:
     _instance = None
     _model: ASRModel = None  # Initialize to None
+    cache: Optional[TranscriptCache] = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(STTProcessor, cls).__new__(cls)
             # Do NOT call _load_model here. Model will be loaded lazily.
+            cls._instance.cache = TranscriptCache(MODEL_NAME)
         return cls._instance
 
     def _load_model_if_needed(self):
@@ -22,44 +39,130 @@ class STTProcessor:
             logger.info("Lazily loading reazonspeech-nemo-v2 model...")
             try:
                 # Assuming the model can be loaded from pretrained
-                self._model = ASRModel.from_pretrained(model_name="reazonspeech-nemo-v2")
+                self._model = ASRModel.from_pretrained(model_name=MODEL_NAME)
+                self._model.eval()
                 logger.info("reazonspeech-nemo-v2 model loaded successfully.")
             except Exception as e:
                 logger.error(f"Failed to load reazonspeech-nemo-v2 model: {e}")
                 raise
 
-    def transcribe(self, audio_bytes: bytes) -> str:
-        """Transcribes given audio bytes (expected to be in WAV format)."""
+    def warm_up(self):
+        """Loads the model and runs one forward pass on silence so the first real request is not cold."""
+        self._load_model_if_needed()
+        self._infer([np.zeros(int(STT_SAMPLE_RATE * WARMUP_SECONDS), dtype=np.float32)])
+
+    @staticmethod
+    def _to_signal(audio: AudioInput) -> np.ndarray:
+        if isinstance(audio, np.ndarray):
+            return np.ascontiguousarray(audio, dtype=np.float32)
+        return load_pcm16k(audio)
+
+    def transcribe(self, audio: AudioInput) -> str:
+        """
+        Transcribes a single utterance.
+        Accepts WAV bytes, headerless 16 kHz 16-bit mono PCM, an `AudioFrame`, or float32 samples at 16 kHz.
+        """
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios: Sequence[AudioInput]) -> List[str]:
+        """
+        Transcribes several utterances in one padded forward pass.
+        Utterances found in the result cache are not run through the model.
+        """
+        signals = [self._to_signal(audio) for audio in audios]
+        if self.cache is None:
+            return self._infer_loaded(signals)
+
+        keys = [self.cache.key(signal) for signal in signals]
+        texts = [self.cache.get(key) for key in keys]
+        missing = [i for i, text in enumerate(texts) if text is None]
+        if missing:
+            for i, text in zip(missing, self._infer_loaded([signals[i] for i in missing])):
+                texts[i] = text
+                self.cache.put(keys[i], text)
+        return texts
+
+    def transcribe_uncached(self, audios: Sequence[AudioInput]) -> List[str]:
+        """Like `transcribe_batch`, without consulting or filling the result cache (for callers that cache)."""
+        return self._infer_loaded([self._to_signal(audio) for audio in audios])
+
+    def _infer_loaded(self, signals: List[np.ndarray]) -> List[str]:
         self._load_model_if_needed()  # Ensure model is loaded before transcribing
 
         if self._model is None:
             raise RuntimeError("STT model not loaded.")
 
-        # Write audio bytes to a temporary WAV file for NeMo to process
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as temp_audio_file:
-            temp_audio_file.write(audio_bytes)
-            temp_audio_file_path = temp_audio_file.name
+        try:
+            return self._infer(signals)
+        except Exception as e:
+            logger.error(f"Error during transcription: {e}")
+            raise
 
-            try:
-                hypotheses = self._model.transcribe(paths2audio_files=[temp_audio_file_path])
-                return hypotheses[0] if hypotheses else ""
-            except Exception as e:
-                logger.error(f"Error during transcription: {e}")
-                raise
+    def _infer(self, signals: List[np.ndarray]) -> List[str]:
+        """Feeds in-memory signals straight into the model's audio-signal input."""
+        texts = [""] * len(signals)
+        active = [i for i, signal in enumerate(signals) if signal.size > 0]
+        if not active:
+            return texts
+
+        lengths = [signals[i].size for i in active]
+        if len(active) == 1:
+            # Zero-copy: the tensor shares memory with the NumPy buffer
+            batch = torch.from_numpy(signals[active[0]]).unsqueeze(0)
+        else:
+            batch = torch.zeros(len(active), max(lengths), dtype=torch.float32)
+            for row, i in enumerate(active):
+                batch[row, : lengths[row]] = torch.from_numpy(signals[i])
+
+        device = next(self._model.parameters()).device
+        with torch.inference_mode():
+            encoded, encoded_len = self._model.forward(
+                input_signal=batch.to(device),
+                input_signal_length=torch.tensor(lengths, dtype=torch.long, device=device),
+            )
+            hypotheses = self._model.decoding.rnnt_decoder_predictions_tensor(
+                encoder_output=encoded, encoded_lengths=encoded_len
+            )
+
+        # Older NeMo releases return (best_hypotheses, all_hypotheses)
+        if isinstance(hypotheses, tuple):
+            hypotheses = hypotheses[0]
 
-    async def transcribe_stream(self, audio_chunk_generator):
-        """Placeholder for streaming transcription.
-        This would involve a more complex interaction with Nemo's streaming API.
+        for i, hypothesis in zip(active, hypotheses):
+            texts[i] = hypothesis.text if hasattr(hypothesis, "text") else str(hypothesis)
+        return texts
+
+    async def transcribe_stream(
+        self,
+        audio_chunk_generator: AsyncIterator[bytes],
+        decode: Optional[Callable[[np.ndarray], Awaitable[str]]] = None,
+        decode_partial: Optional[Callable[[np.ndarray], Awaitable[str]]] = None,
+    ):
+        """
+        Incrementally transcribes a stream of raw 16 kHz 16-bit mono PCM chunks.
+        Yields partial hypotheses while speech is ongoing and a final result at each endpoint.
+        `decode` transcribes one float32 utterance; by default `transcribe` runs in a worker thread.
+        `decode_partial` transcribes the partial windows; by default the same without the cache.
         """
-        self._load_model_if_needed()  # Ensure model is loaded before streaming transcription
-        logger.info("Simulating streaming transcription...")
-        yield {
-            "text": "ストリーミング転写のシミュレーション",
-            "is_final": False,
-            "start_timestamp": 0.0,
-            "end_timestamp": 1.0,
-        }
-        yield {"text": "これは最終的な結果です", "is_final": True, "start_timestamp": 1.0, "end_timestamp": 2.5}
+        await asyncio.to_thread(self._load_model_if_needed)  # Ensure model is loaded before streaming
+
+        if decode is None:
+
+            async def decode(samples: np.ndarray) -> str:
+                return await asyncio.to_thread(self.transcribe, samples)
+
+            async def decode_partial(samples: np.ndarray) -> str:
+                return (await asyncio.to_thread(self.transcribe_uncached, [samples]))[0]
+
+        transcriber = StreamingTranscriber(decode, decode_partial=decode_partial)
+        try:
+            async for chunk in audio_chunk_generator:
+                for result in await transcriber.feed(chunk):
+                    yield result
+            for result in await transcriber.flush():
+                yield result
+        finally:
+            transcriber.close()
 
 
 stt_processor = STTProcessor()
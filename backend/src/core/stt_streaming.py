@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from prometheus_client import Histogram
+
+from src.utils.audio_utils import STT_SAMPLE_RATE, pcm_to_float32
+
+logger = logging.getLogger(__name__)
+
+STT_STREAM_FINAL_LATENCY = Histogram(
+    "stt_stream_final_latency_seconds",
+    "Time from the last voiced sample of an utterance to its final transcript",
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+FRAME_MS = 20
+PREROLL_MS = 300
+
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity float32 ring buffer addressed by absolute sample index.
+    Memory stays constant no matter how long the stream runs.
+    """
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.total_written = 0
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.total_written - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        if samples.size >= self.capacity:
+            # Only the last `capacity` samples are kept, but the rest still count as written
+            self.total_written += samples.size - self.capacity
+            samples = samples[-self.capacity :]
+        pos = self.total_written % self.capacity
+        first = min(samples.size, self.capacity - pos)
+        self._data[pos : pos + first] = samples[:first]
+        self._data[: samples.size - first] = samples[first:]
+        self.total_written += samples.size
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Returns a contiguous copy of samples [start, end)."""
+        start = max(start, self.oldest)
+        end = min(end, self.total_written)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        pos = start % self.capacity
+        length = end - start
+        if pos + length <= self.capacity:
+            return self._data[pos : pos + length].copy()
+        return np.concatenate((self._data[pos:], self._data[: pos + length - self.capacity]))
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription over a raw 16 kHz s16le PCM stream.
+
+    Audio is kept in a ring buffer holding at most one window. While speech is ongoing the
+    current utterance is re-decoded every `step_ms` of new audio and emitted as a partial
+    hypothesis; successive partial windows overlap. An utterance is finalized once
+    `endpoint_ms` of silence follows speech, or when it fills the window, so the final
+    decode never covers more than `window_s` of audio.
+
+    Partials are decoded with `decode_partial` (default: `decode`) in the background, so `feed`
+    keeps consuming audio meanwhile; a finished partial is returned by the next `feed`. At most
+    one partial decode runs at a time, and one still running when its utterance is finalized is
+    cancelled, since the final result supersedes it. A partial decode that fails is logged and
+    dropped.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[np.ndarray], Awaitable[str]],
+        decode_partial: Optional[Callable[[np.ndarray], Awaitable[str]]] = None,
+        sample_rate: int = STT_SAMPLE_RATE,
+        window_s: Optional[float] = None,
+        step_ms: Optional[float] = None,
+        endpoint_ms: Optional[float] = None,
+        energy_threshold: Optional[float] = None,
+    ):
+        self.decode = decode
+        self.decode_partial = decode_partial or decode
+        self.sample_rate = sample_rate
+        window_s = window_s or float(os.getenv("STT_STREAM_WINDOW_S", "10"))
+        step_ms = step_ms or float(os.getenv("STT_STREAM_STEP_MS", "500"))
+        endpoint_ms = endpoint_ms or float(os.getenv("STT_STREAM_ENDPOINT_MS", "600"))
+        self.energy_threshold = energy_threshold or float(os.getenv("STT_STREAM_ENERGY_THRESHOLD", "0.01"))
+
+        self._frame = sample_rate * FRAME_MS // 1000
+        self._step = int(sample_rate * step_ms / 1000)
+        self._endpoint = int(sample_rate * endpoint_ms / 1000)
+        self._preroll = sample_rate * PREROLL_MS // 1000
+        self._ring = PCMRingBuffer(int(sample_rate * window_s))
+
+        self._byte_carry = b""
+        self._sample_carry = np.zeros(0, dtype=np.float32)
+        self._utterance_start = 0
+        self._in_speech = False
+        self._last_voiced_end = 0
+        self._last_voiced_at = 0.0
+        self._last_partial_at = 0
+        self._last_partial_text = ""
+        self._partial: Optional[asyncio.Task] = None
+        self._partial_span = (0, 0)
+
+    def _seconds(self, sample_index: int) -> float:
+        return sample_index / self.sample_rate
+
+    def _to_frames(self, chunk: bytes) -> np.ndarray:
+        data = self._byte_carry + chunk
+        usable = len(data) - len(data) % 2
+        self._byte_carry = data[usable:]
+        samples = pcm_to_float32(memoryview(data)[:usable], 16)
+        if self._sample_carry.size:
+            samples = np.concatenate((self._sample_carry, samples))
+        n_frames = samples.size // self._frame
+        self._sample_carry = samples[n_frames * self._frame :]
+        return samples[: n_frames * self._frame].reshape(n_frames, self._frame)
+
+    def close(self):
+        """Cancels the partial decode in progress, if any."""
+        if self._partial is not None:
+            self._partial.cancel()
+            self._partial = None
+
+    def _take_partial(self) -> Optional[Dict]:
+        """Returns the partial hypothesis decoded in the background, once it is ready and new."""
+        if self._partial is None or not self._partial.done():
+            return None
+        task, self._partial = self._partial, None
+        try:
+            text = task.result()
+        except Exception as e:
+            # A partial is only a preview; the final decode of the utterance still follows
+            logger.warning(f"Partial decode failed: {e}")
+            return None
+        if not text or text == self._last_partial_text:
+            return None
+        self._last_partial_text = text
+        start, end = self._partial_span
+        return {
+            "text": text,
+            "is_final": False,
+            "start_timestamp": self._seconds(start),
+            "end_timestamp": self._seconds(end),
+        }
+
+    async def _finalize(self, end: int, endpointed: bool) -> Optional[Dict]:
+        # A partial of this utterance would be stale by the time it arrived
+        self.close()
+        start = self._utterance_start
+        text = await self.decode(self._ring.read(start, end))
+        if endpointed:
+            STT_STREAM_FINAL_LATENCY.observe(time.perf_counter() - self._last_voiced_at)
+
+        self._in_speech = False
+        self._utterance_start = self._ring.total_written
+        self._last_partial_text = ""
+        if not text:
+            return None
+        return {
+            "text": text,
+            "is_final": True,
+            "start_timestamp": self._seconds(start),
+            "end_timestamp": self._seconds(end),
+        }
+
+    async def feed(self, chunk: bytes) -> List[Dict]:
+        """Consumes one PCM chunk and returns any partial/final results it produced."""
+        results = []
+        partial = self._take_partial()
+        if partial:
+            results.append(partial)
+        frames = self._to_frames(chunk)
+        if not frames.size:
+            return results
+
+        voiced = np.sqrt(np.mean(np.square(frames), axis=1)) > self.energy_threshold
+        for frame, is_voiced in zip(frames, voiced):
+            self._ring.write(frame)
+            total = self._ring.total_written
+
+            if is_voiced:
+                if not self._in_speech:
+                    self._in_speech = True
+                    self._utterance_start = max(total - self._frame - self._preroll, self._ring.oldest)
+                    self._last_partial_at = self._utterance_start
+                self._last_voiced_end = total
+                self._last_voiced_at = time.perf_counter()
+            elif not self._in_speech:
+                # Only keep a short pre-roll of leading silence
+                self._utterance_start = max(self._utterance_start, total - self._preroll)
+                continue
+
+            if total - self._last_voiced_end >= self._endpoint:
+                result = await self._finalize(self._last_voiced_end, endpointed=True)
+                if result:
+                    results.append(result)
+            elif total - self._utterance_start >= self._ring.capacity:
+                # Window full without an endpoint: finalize so memory and decode cost stay bounded
+                result = await self._finalize(total, endpointed=False)
+                if result:
+                    results.append(result)
+
+        total = self._ring.total_written
+        # While a partial is still decoding, skip this step; the next one covers the newer audio
+        if self._in_speech and total - self._last_partial_at >= self._step and self._partial is None:
+            self._last_partial_at = total
+            self._partial_span = (self._utterance_start, total)
+            self._partial = asyncio.ensure_future(self.decode_partial(self._ring.read(self._utterance_start, total)))
+        return results
+
+    async def flush(self) -> List[Dict]:
+        """Finalizes any utterance still in progress at the end of the stream."""
+        if not self._in_speech:
+            self.close()
+            return []
+        result = await self._finalize(self._ring.total_written, endpointed=False)
+        return [result] if result else []
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Interval between rounds of pings while waiting for the workers to load
+WARMUP_POLL_S = 0.1
+
+# Per-process STT model, set up by the pool initializer
+_processor = None
+
+
+def _init_worker(torch_threads: int):
+    """Runs once in every worker process: pins the thread count, loads and warms up the model."""
+    global _processor
+    import torch
+
+    from src.core.stt_processor import stt_processor
+
+    torch.set_num_threads(torch_threads)
+    # Results are cached once in the parent; a per-worker copy would only duplicate memory
+    stt_processor.cache = None
+    stt_processor.warm_up()
+    _processor = stt_processor
+    logger.info(f"STT worker {os.getpid()} ready ({torch_threads} threads)")
+
+
+def _share_signals(signals: Sequence[np.ndarray]) -> Tuple[SharedMemory, List[Tuple[int, int]]]:
+    """Copies float32 signals back to back into a new shared memory block."""
+    total = sum(signal.size for signal in signals)
+    shm = SharedMemory(create=True, size=max(total, 1) * 4)
+    buffer = np.ndarray((total,), dtype=np.float32, buffer=shm.buf)
+    offsets = []
+    start = 0
+    for signal in signals:
+        buffer[start : start + signal.size] = signal
+        offsets.append((start, start + signal.size))
+        start += signal.size
+    del buffer
+    return shm, offsets
+
+
+def _release(shm: SharedMemory):
+    shm.close()
+    shm.unlink()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _transcribe_shared(shm_name: str, offsets: List[Tuple[int, int]]) -> List[str]:
+    """Worker entry point: transcribes signals read in place from shared memory."""
+    shm = SharedMemory(name=shm_name)
+    # The parent owns the block; keep this process' tracker from unlinking it at exit
+    resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        total = offsets[-1][1] if offsets else 0
+        buffer = np.ndarray((total,), dtype=np.float32, buffer=shm.buf)
+        signals = [buffer[start:end] for start, end in offsets]
+        texts = _processor.transcribe_batch(signals)
+        del signals, buffer
+        return texts
+    finally:
+        shm.close()
+
+
+class STTWorkerPool:
+    """
+    Pool of STT worker processes, each holding its own model, so inference scales past one GIL.
+    Audio reaches the workers through shared memory; only offsets and transcripts are pickled.
+    """
+
+    def __init__(self, workers: int, torch_threads: Optional[int] = None):
+        self.workers = workers
+        torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(torch_threads,),
+        )
+
+    async def transcribe_batch(self, signals: Sequence[np.ndarray]) -> List[str]:
+        shm, offsets = _share_signals(signals)
+        try:
+            future = self._executor.submit(_transcribe_shared, shm.name, offsets)
+        except Exception:
+            _release(shm)
+            raise
+        # Release only once the worker is done with the block, even if the caller is cancelled
+        future.add_done_callback(lambda _: _release(shm))
+        return await asyncio.wrap_future(future)
+
+    async def warm_up(self):
+        """Starts every worker process and returns once each has loaded and warmed up its model."""
+        # Worker processes are spawned lazily on submit, one per task while none is idle. A worker
+        # that is up may answer several pings while another is still loading, so keep pinging
+        # until every process has answered with its PID.
+        ready = set()
+        while True:
+            futures = [self._executor.submit(_ping) for _ in range(self.workers - len(ready))]
+            ready.update(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+            if len(ready) >= self.workers:
+                break
+            await asyncio.sleep(WARMUP_POLL_S)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
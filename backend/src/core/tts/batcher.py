@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+TTS_BATCH_SIZE = Histogram(
+    'tts_batch_size', 'Number of segments per batched TTS forward pass', buckets=(1, 2, 3, 4, 6, 8, 12, 16)
+)
+
+
+@dataclass
+class _Batch:
+    texts: List[str] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    full: asyncio.Event = field(default_factory=asyncio.Event)
+    opened_at: float = field(default_factory=time.perf_counter)
+
+
+class TTSBatcher:
+    """
+    Groups concurrent segments that share a voice and voice settings (the `group` key) into one
+    batched forward pass.
+
+    The first segment of a group opens a batch; the batch is run as soon as it holds
+    `max_batch_size` segments or `max_wait_ms` after it was opened. The batch is run with the
+    `run_batch` callable of the segment that opened it, so it is scheduled with that caller's
+    priority.
+    """
+
+    def __init__(self, max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        self.max_batch_size = max_batch_size or int(os.getenv("TTS_BATCH_MAX_SIZE", "4"))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("TTS_BATCH_MAX_WAIT_MS", "10"))
+        self.max_wait = max_wait_ms / 1000.0
+        self._open: Dict[Hashable, _Batch] = {}
+
+    async def infer(
+        self,
+        group: Hashable,
+        text: str,
+        run_batch: Callable[[List[str]], Awaitable[List[T]]],
+    ) -> T:
+        """Queues one segment and waits for its result from the batch it ends up in."""
+        batch = self._open.get(group)
+        if batch is None:
+            batch = _Batch()
+            self._open[group] = batch
+            asyncio.get_running_loop().create_task(self._flush(group, batch, run_batch))
+
+        future = asyncio.get_running_loop().create_future()
+        batch.texts.append(text)
+        batch.futures.append(future)
+        if len(batch.texts) >= self.max_batch_size:
+            self._close(group, batch)
+        return await future
+
+    def _close(self, group: Hashable, batch: _Batch):
+        if self._open.get(group) is batch:
+            del self._open[group]
+        batch.full.set()
+
+    async def _flush(self, group: Hashable, batch: _Batch, run_batch: Callable[[List[str]], Awaitable[List]]):
+        remaining = batch.opened_at + self.max_wait - time.perf_counter()
+        if remaining > 0:
+            try:
+                await asyncio.wait_for(batch.full.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        self._close(group, batch)
+
+        # Callers that gave up (e.g. barge-in cancelled the turn) are dropped
+        live = [(text, future) for text, future in zip(batch.texts, batch.futures) if not future.done()]
+        if not live:
+            return
+        TTS_BATCH_SIZE.observe(len(live))
+        try:
+            results = await run_batch([text for text, _ in live])
+        except Exception as e:
+            logger.error(f"Batched synthesis of {len(live)} segments failed: {e}")
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(live, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,75 @@
+import logging
+import os
+from typing import Any, Hashable, Optional, Tuple
+
+from backend.src.core.tts.segment_cache import normalize_text
+from backend.src.utils.cache import LRUCache
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+TTS_FEATURE_CACHE_HITS = Counter('tts_feature_cache_hits_total', 'Segments whose text features came from the cache')
+TTS_FEATURE_CACHE_MISSES = Counter('tts_feature_cache_misses_total', 'Segments whose text features were computed')
+TTS_FEATURE_CACHE_BYTES = Gauge('tts_feature_cache_bytes', 'Bytes of text features held by the feature cache')
+
+# Conditional import to allow tests to run without the library installed
+try:
+    import torch
+    from style_bert_vits2.constants import Languages
+    from style_bert_vits2.models.infer import get_text
+except ImportError:
+    torch = None
+
+# Rows of the per-language BERT feature matrices (bert, ja_bert, en_bert)
+BERT_DIM = 1024
+
+Features = Tuple[Any, Any, Any, Any, Any, Any]
+
+
+def _nbytes(entry: Tuple[Any, ...]) -> int:
+    return sum(t.element_size() * t.nelement() for t in entry)
+
+
+class FeatureCache:
+    """
+    Cache of the Style-Bert-VITS2 text front end: normalisation, G2P (phones, tones) and BERT
+    features, as returned by `get_text`.
+
+    These depend only on the text and on how the model was trained (JP-Extra or not, blank
+    tokens), not on the voice, style, speed or pitch, so one cache serves every voice: a
+    sentence repeated with another style or voice only runs the acoustic model and vocoder.
+    Entries are keyed by the normalised text (see `normalize_text`) and held in an LRU bounded
+    by `max_bytes`. Only the Japanese BERT features are stored; the zero matrices for the
+    other languages are rebuilt on a hit.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("TTS_FEATURE_CACHE_MB", "32")) * 1024 * 1024)
+        self.memory = LRUCache(max_bytes, sizeof=_nbytes)
+
+    @staticmethod
+    def key(text: str, hps: Any, device: str) -> Hashable:
+        return (normalize_text(text), hps.version.endswith("JP-Extra"), bool(hps.data.add_blank), str(device))
+
+    def get_text(self, text: str, hps: Any, device: str) -> Features:
+        """`get_text(text, Languages.JP, hps, device)`, from the cache when possible."""
+        key = self.key(text, hps, device)
+        entry = self.memory.get(key)
+        if entry is None:
+            TTS_FEATURE_CACHE_MISSES.inc()
+            _, ja_bert, _, phones, tones, lang_ids = get_text(key[0], Languages.JP, hps, device)
+            entry = (ja_bert, phones, tones, lang_ids)
+            if self.memory.max_bytes:
+                self.memory.put(key, entry)
+                TTS_FEATURE_CACHE_BYTES.set(self.memory.nbytes)
+        else:
+            TTS_FEATURE_CACHE_HITS.inc()
+
+        ja_bert, phones, tones, lang_ids = entry
+        zeros = ja_bert.new_zeros((BERT_DIM, phones.size(0)))
+        return zeros, ja_bert, zeros, phones, tones, lang_ids
+
+    def clear(self):
+        self.memory.clear()
+        TTS_FEATURE_CACHE_BYTES.set(0)
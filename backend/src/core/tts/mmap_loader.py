@@ -0,0 +1,97 @@
+import logging
+import os
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Conditional import to allow tests to run without the library installed
+try:
+    import torch
+    from safetensors.torch import load_file
+except ImportError:
+    torch = None
+
+SMAPS_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared',
+    'Shared_Dirty': 'shared',
+    'Private_Clean': 'private',
+    'Private_Dirty': 'private',
+}
+
+
+def load_style_vectors(path: str) -> np.ndarray:
+    """Maps `style_vectors.npy` read-only instead of reading a private copy."""
+    return np.load(path, mmap_mode='r')
+
+
+def load_mmap_weights(model: Any):
+    """
+    Loads a `TTSModel`'s network with its parameters backed by a read-only mapping of the
+    `.safetensors` file, so workers on the same node share one copy of the weights through the
+    page cache instead of each holding a private one.
+
+    The network is moved to the meta device as soon as it is built (releasing its randomly
+    initialised parameters), and the mapped tensors are assigned to it. Weights on a GPU have to
+    be copied to device memory anyway, so other devices (and `.pth` checkpoints) use
+    `TTSModel.load`, as does a library version whose network is not at the private attribute
+    this relies on.
+    """
+    path = str(model.model_path)
+    device = str(model.device)
+    if torch is None or device != 'cpu' or not path.endswith('.safetensors') or not hasattr(model, '_TTSModel__net_g'):
+        model.load()
+        return
+
+    # TTSModel.load builds the network on `model.device` and copies the weights into it; on the
+    # meta device the copy is a no-op
+    model.device = 'meta'
+    try:
+        model.load()
+    finally:
+        model.device = device
+    net_g = model._TTSModel__net_g
+
+    tensors = load_file(path)
+    tensors.pop('iteration', None)
+    expected = net_g.state_dict()
+    for key, tensor in tensors.items():
+        if key in expected and tensor.dtype != expected[key].dtype:
+            # e.g. a half-precision export; this tensor gets a private converted copy
+            tensors[key] = tensor.to(expected[key].dtype)
+    net_g.load_state_dict(tensors, strict=False, assign=True)
+
+    # Whatever the file did not provide (the posterior encoder, unused for inference) still needs storage
+    for module in net_g.modules():
+        tensors = list(module.parameters(recurse=False)) + list(module.buffers(recurse=False))
+        if any(t.is_meta for t in tensors):
+            module.to_empty(device=device, recurse=False)
+
+
+def mapped_memory(paths: Iterable[str], smaps_path: str = '/proc/self/smaps') -> Dict[str, Dict[str, int]]:
+    """
+    Memory of this process backed by each of `paths`, in bytes, from `/proc/<pid>/smaps`:
+    `rss` (resident), `pss` (resident, with each shared page divided by the number of processes
+    mapping it), `shared` (resident and also mapped by another process) and `private`.
+    Files that are not mapped report zeros; so does every file where smaps is unavailable.
+    """
+    report = {path: dict.fromkeys(('rss', 'pss', 'shared', 'private'), 0) for path in paths}
+    by_realpath = {os.path.realpath(path): usage for path, usage in report.items()}
+    try:
+        with open(smaps_path) as f:
+            usage = None
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                if not parts[0].endswith(':'):
+                    # Mapping header: address perms offset dev inode [path]
+                    usage = by_realpath.get(' '.join(parts[5:])) if len(parts) > 5 else None
+                elif usage is not None and parts[0][:-1] in SMAPS_FIELDS:
+                    usage[SMAPS_FIELDS[parts[0][:-1]]] += int(parts[1]) * 1024
+    except OSError as e:
+        logger.debug(f"Cannot read {smaps_path}: {e}")
+    return report
@@ -1,11 +1,31 @@
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Dict, List, Optional
 
+from backend.src.core.tts.feature_cache import FeatureCache
+from backend.src.core.tts.mmap_loader import load_style_vectors, mapped_memory
+from backend.src.core.tts.onnx_backend import BACKENDS, ONNXVoice, parse_model_backends
+from backend.src.core.tts.sbv2_backend import SBV2Voice
+from backend.src.core.tts.voice_index import VoiceIndex
 from backend.src.models.tts import VoiceModel
+from prometheus_client import Counter, Gauge, Histogram
 
 logger = logging.getLogger(__name__)
 
+TTS_MODEL_LOAD_TIME = Histogram('tts_model_load_duration_seconds', 'Time to load a TTS model into memory', ['model_id'])
+TTS_RESIDENT_MODELS = Gauge('tts_resident_models', 'Number of TTS models held in memory')
+TTS_RESIDENT_BYTES = Gauge('tts_resident_model_bytes', 'Estimated memory held by resident TTS models')
+TTS_MODEL_EVICTIONS = Counter('tts_model_evictions_total', 'TTS models unloaded to stay within the memory budget')
+TTS_MODEL_MAPPED_BYTES = Gauge(
+    'tts_model_mapped_bytes',
+    'Memory backed by a TTS model\'s mapped files (rss, pss, shared, private)',
+    ['model_id', 'type'],
+)
+
 # Conditional import to allow tests to run without the library installed
 try:
     from style_bert_vits2.tts_model import TTSModel
@@ -14,19 +34,167 @@ except ImportError:
     logger.warning("style_bert_vits2 library not found. TTS functionality will be limited.")
 
 class ModelManager:
-    def __init__(self, model_dir: Optional[str] = None):
+    """
+    Loads Style-Bert-VITS2 voices on demand and keeps them in an LRU cache.
+
+    The cache is bounded by `max_resident` models and/or `memory_budget_mb`; a model's memory is
+    estimated from the size of its weights and style vectors. When a load would exceed either
+    limit, the least recently used models are evicted. `load_model` is thread-safe, and
+    concurrent first requests for the same voice wait on a single load.
+
+    Voice metadata for listing comes from a `VoiceIndex` over `model_dir`, so no voice has to
+    be loaded to report its styles and sample rate.
+
+    Each voice runs on an inference backend: `torch` (PyTorch eager), `onnx` (ONNX Runtime) or
+    `onnx-int8` (ONNX Runtime, int8 weights). `default_backend` applies unless `backends` names
+    one for the model.
+
+    With `mmap_weights` (the default), PyTorch voices on the CPU map their `.safetensors` weights
+    and every voice maps its style vectors read-only, so the pages are shared with other worker
+    processes through the page cache. `memory_report` shows how much of each model is resident
+    in this process and how much of that is shared.
+
+    All voices share one `FeatureCache` (`features`), since text features do not depend on the
+    voice.
+    """
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        max_resident: Optional[int] = None,
+        memory_budget_mb: Optional[float] = None,
+        default_backend: Optional[str] = None,
+        backends: Optional[Dict[str, str]] = None,
+        mmap_weights: Optional[bool] = None,
+        features: Optional[FeatureCache] = None,
+    ):
         self.model_dir = model_dir or os.getenv("TTS_MODEL_DIR", "data/models/tts")
-        self._loaded_models: Dict[str, object] = {} # object used if TTSModel is None
-        self._model_info: Dict[str, VoiceModel] = {}
+        # 0 means unlimited
+        self.max_resident = max_resident if max_resident is not None else int(os.getenv("TTS_MAX_RESIDENT_MODELS", "0"))
+        if memory_budget_mb is None:
+            memory_budget_mb = float(os.getenv("TTS_MODEL_MEMORY_BUDGET_MB", "0"))
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.default_backend = default_backend or os.getenv("TTS_BACKEND", "torch")
+        if self.default_backend not in BACKENDS:
+            raise ValueError(f"Unknown TTS backend {self.default_backend!r} (backends: {', '.join(BACKENDS)})")
+        self.backends = backends if backends is not None else parse_model_backends(os.getenv("TTS_MODEL_BACKENDS", ""))
+        if mmap_weights is None:
+            mmap_weights = os.getenv("TTS_MMAP_WEIGHTS", "true").lower() == "true"
+        self.mmap_weights = mmap_weights
+        self.features = features if features is not None else FeatureCache()
+
+        self._loaded_models: "OrderedDict[str, object]" = OrderedDict() # object used if TTSModel is None
+        self._model_sizes: Dict[str, int] = {}
+        self._mapped_files: Dict[str, List[str]] = {}
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.index = VoiceIndex(self.model_dir)
 
     def load_model(self, model_id: str) -> object:
         """
         Loads the model into memory if not already loaded.
-        Returns the TTSModel instance.
+        Returns the TTSModel wrapped in an `SBV2Voice` (or `ONNXVoice`, per the model's backend).
+        Blocking; async callers should run it with `asyncio.to_thread`.
+        """
+        with self._lock:
+            model = self._loaded_models.get(model_id)
+            if model is not None:
+                self._loaded_models.move_to_end(model_id)
+                return model
+            future = self._loading.get(model_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[model_id] = future
+
+        if not owner:
+            # Another thread is already loading this voice
+            return future.result()
+
+        try:
+            start_time = time.perf_counter()
+            model, size, mapped_files = self._load(model_id)
+            TTS_MODEL_LOAD_TIME.labels(model_id=model_id).observe(time.perf_counter() - start_time)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[model_id]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._loaded_models[model_id] = model
+            self._model_sizes[model_id] = size
+            self._mapped_files[model_id] = mapped_files
+            del self._loading[model_id]
+            self._evict()
+        future.set_result(model)
+        self.memory_report()
+        return model
+
+    def _evict(self):
+        """Drops least recently used models until the limits hold. Caller holds the lock."""
+        while len(self._loaded_models) > 1 and (
+            (self.max_resident and len(self._loaded_models) > self.max_resident)
+            or (self.memory_budget and sum(self._model_sizes.values()) > self.memory_budget)
+        ):
+            evicted_id, _ = self._loaded_models.popitem(last=False)
+            self._model_sizes.pop(evicted_id, None)
+            if self._mapped_files.pop(evicted_id, None):
+                for kind in ('rss', 'pss', 'shared', 'private'):
+                    try:
+                        TTS_MODEL_MAPPED_BYTES.remove(evicted_id, kind)
+                    except KeyError:  # evicted before its first report
+                        pass
+            TTS_MODEL_EVICTIONS.inc()
+            logger.info(f"Evicted TTS model: {evicted_id}")
+        TTS_RESIDENT_MODELS.set(len(self._loaded_models))
+        TTS_RESIDENT_BYTES.set(sum(self._model_sizes.values()))
+
+    def resident_models(self) -> List[str]:
+        """Model ids currently in memory, least recently used first."""
+        with self._lock:
+            return list(self._loaded_models)
+
+    def can_stream(self, model_id: str) -> bool:
+        """
+        Whether the voice can stream audio within a sentence (`SBV2Voice.infer_stream`), decided
+        without loading it: from the voice itself when resident, otherwise from its backend.
+        """
+        with self._lock:
+            model = self._loaded_models.get(model_id)
+        if model is not None:
+            return bool(getattr(model, 'can_stream', False))
+        return TTSModel is not None and self.backends.get(model_id, self.default_backend) == "torch"
+
+    def memory_report(self) -> Dict[str, Dict[str, int]]:
         """
-        if model_id in self._loaded_models:
-            return self._loaded_models[model_id]
+        Per resident model, the bytes of its mapped files (weights, style vectors) held by this
+        process: `rss` (resident), `shared` (also mapped by another worker), `private`, and `pss`
+        (shared pages divided among the processes mapping them; summed over workers, the real
+        footprint). Memory outside the mappings, such as a GPU copy, an ONNX Runtime session or
+        converted tensors, is not included. Also updates the `tts_model_mapped_bytes` gauges.
+        """
+        with self._lock:
+            mapped_files = {model_id: list(files) for model_id, files in self._mapped_files.items()}
+        usage = mapped_memory({path for files in mapped_files.values() for path in files})
+
+        report = {}
+        for model_id, files in mapped_files.items():
+            totals = dict.fromkeys(('rss', 'pss', 'shared', 'private'), 0)
+            for path in files:
+                for kind, value in usage[path].items():
+                    totals[kind] += value
+            report[model_id] = totals
 
+        with self._lock:
+            # Skip models evicted while smaps was being read
+            for model_id, totals in report.items():
+                if self._mapped_files.get(model_id):
+                    for kind, value in totals.items():
+                        TTS_MODEL_MAPPED_BYTES.labels(model_id=model_id, type=kind).set(value)
+        return report
+
+    def _load(self, model_id: str):
         if TTSModel is None:
             raise RuntimeError("style_bert_vits2 library is not installed.")
 
@@ -48,59 +216,54 @@ class ModelManager:
              else:
                  raise ValueError(f"No model weights found in {model_path}")
 
-        logger.info(f"Loading TTS model: {model_id}")
+        logger.info(f"Loading TTS model: {model_id} ({self.backends.get(model_id, self.default_backend)})")
         
         # Determine device
         device = "cuda" if os.getenv("USE_GPU", "false").lower() == "true" else "cpu"
 
+        mapped_files = []
+        style_vectors = style_file
+        if self.mmap_weights and os.path.exists(style_file):
+            style_vectors = load_style_vectors(style_file)
+            mapped_files.append(style_file)
+
         model = TTSModel(
             model_path=safetensors_file,
             config_path=config_file,
-            style_vec_path=style_file,
+            style_vec_path=style_vectors,
             device=device
         )
-        
-        self._loaded_models[model_id] = model
-        
-        # Cache model info
-        styles = list(model.style2id.keys()) if hasattr(model, 'style2id') else ["Neutral"]
-        sampling_rate = model.configs.data.sampling_rate if hasattr(model, 'configs') else 44100
-
-        self._model_info[model_id] = VoiceModel(
-            id=model_id,
-            name=model_id,
-            styles=styles,
-            sample_rate=sampling_rate
-        )
-        
-        return model
+        backend = self.backends.get(model_id, self.default_backend)
+        if backend == "torch":
+            voice = SBV2Voice(model, mmap_weights=self.mmap_weights, features=self.features)
+            weights_file = safetensors_file
+            if self.mmap_weights and device == "cpu":
+                mapped_files.insert(0, safetensors_file)
+        else:
+            voice = ONNXVoice(
+                model,
+                os.path.splitext(safetensors_file)[0] + ".onnx",
+                quantize=backend == "onnx-int8",
+                features=self.features,
+            )
+            weights_file = voice.graph_path
+        # TTSModel defers loading the network to the first inference; do it now so the cost is
+        # paid (once) inside the load rather than by the first request
+        voice.load()
+
+        size = os.path.getsize(weights_file)
+        if os.path.exists(style_file):
+            size += os.path.getsize(style_file)
+
+        return voice, size, mapped_files
 
     def get_model_info(self, model_id: str) -> Optional[VoiceModel]:
-        """Returns metadata for a loaded model."""
-        return self._model_info.get(model_id)
+        """Returns metadata for a voice in the model directory, loaded or not."""
+        return self.index.get(model_id)
 
     def list_models(self) -> List[VoiceModel]:
         """
-        Scans the model directory and returns available models.
-        Note: This is a lightweight scan. For full details (styles),
-        the model usually needs to be loaded or config parsed.
+        Returns the voices available in the model directory, with their styles and sample rate.
+        Served from the voice index; no model is loaded.
         """
-        models = []
-        if not os.path.exists(self.model_dir):
-            return models
-
-        for name in os.listdir(self.model_dir):
-            path = os.path.join(self.model_dir, name)
-            if os.path.isdir(path):
-                # If we have it loaded, return full info
-                if name in self._model_info:
-                    models.append(self._model_info[name])
-                else:
-                    # Basic info
-                    models.append(VoiceModel(
-                        id=name,
-                        name=name,
-                        styles=["(Load to see styles)"],
-                        sample_rate=44100
-                    ))
-        return models
+        return self.index.list()
@@ -0,0 +1,224 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from backend.src.core.tts.feature_cache import FeatureCache
+from backend.src.core.tts.sbv2_backend import SBV2Voice
+
+logger = logging.getLogger(__name__)
+
+# Conditional imports: ONNX Runtime runs the graph; PyTorch is needed to export it
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+TEXT_INPUTS = ('x', 'x_lengths', 'sid', 'tone', 'language')
+SCALAR_INPUTS = ('length_scale', 'sdp_ratio', 'noise_scale', 'noise_scale_w')
+OUTPUTS = ('audio', 'y_mask')
+
+DYNAMIC_AXES = {
+    'x': {0: 'batch', 1: 'phonemes'},
+    'x_lengths': {0: 'batch'},
+    'sid': {0: 'batch'},
+    'tone': {0: 'batch', 1: 'phonemes'},
+    'language': {0: 'batch', 1: 'phonemes'},
+    'bert': {0: 'batch', 2: 'phonemes'},
+    'ja_bert': {0: 'batch', 2: 'phonemes'},
+    'en_bert': {0: 'batch', 2: 'phonemes'},
+    'style_vec': {0: 'batch'},
+    'audio': {0: 'batch', 2: 'samples'},
+    'y_mask': {0: 'batch', 2: 'frames'},
+}
+
+
+def parse_model_backends(spec: str) -> Dict[str, str]:
+    """Parses `TTS_MODEL_BACKENDS`, e.g. "jvnv-F1-jp=onnx-int8,jvnv-M1-jp=torch"."""
+    backends = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        model_id, sep, backend = item.partition('=')
+        if not sep or backend.strip() not in BACKENDS:
+            raise ValueError(f"Invalid TTS_MODEL_BACKENDS entry: {item!r} (backends: {', '.join(BACKENDS)})")
+        backends[model_id.strip()] = backend.strip()
+    return backends
+
+
+def graph_inputs(jp_extra: bool) -> Tuple[str, ...]:
+    """Input names of the exported graph; JP-Extra models only take the Japanese BERT features."""
+    bert = ('ja_bert',) if jp_extra else ('bert', 'ja_bert', 'en_bert')
+    return TEXT_INPUTS + bert + ('style_vec',) + SCALAR_INPUTS
+
+
+def default_intra_op_threads() -> int:
+    # Concurrent inferences per voice (TTS_WORKERS) share the cores instead of oversubscribing them
+    return max(1, (os.cpu_count() or 1) // max(1, int(os.getenv('TTS_WORKERS', '2'))))
+
+
+def _is_fresh(path: str, source: str) -> bool:
+    """True if `path` exists and is not older than `source` (e.g. re-exported weights)."""
+    return os.path.exists(path) and (not os.path.exists(source) or os.path.getmtime(path) >= os.path.getmtime(source))
+
+
+def export_onnx(voice: SBV2Voice, path: str, opset: int = 17):
+    """Exports the voice's network (text encoder, duration predictors, flow and vocoder) to `path`."""
+    if torch is None:
+        raise RuntimeError("PyTorch and style_bert_vits2 are required to export an ONNX graph.")
+    model = voice.model
+    if model._TTSModel__net_g is None:
+        model.load()
+    net_g = model._TTSModel__net_g
+    jp_extra = voice.is_jp_extra
+
+    class InferenceGraph(torch.nn.Module):
+        """`net_g.infer` with tensor inputs only, returning the audio and the decoder mask."""
+
+        names = graph_inputs(jp_extra)
+
+        def __init__(self):
+            super().__init__()
+            self.net_g = net_g
+
+        def forward(self, *args):
+            inputs = dict(zip(self.names, args))
+            text = [inputs[name] for name in TEXT_INPUTS]
+            bert = [inputs['ja_bert']] if jp_extra else [inputs['bert'], inputs['ja_bert'], inputs['en_bert']]
+            o, _, y_mask, _ = self.net_g.infer(
+                *text, *bert, inputs['style_vec'], **{name: inputs[name] for name in SCALAR_INPUTS}
+            )
+            return o, y_mask
+
+    graph = InferenceGraph().eval()
+
+    example = voice._batch_inputs(["こんにちは。"], next(iter(voice.style2id)), 1.0)
+    scalars = {'length_scale': 1.0, **voice.sampling_params()}
+    args = tuple(
+        example[name] if name in example else torch.tensor(scalars[name], dtype=torch.float32, device=model.device)
+        for name in graph.names
+    )
+    tmp_path = f"{path}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            graph,
+            args,
+            tmp_path,
+            input_names=list(graph.names),
+            output_names=list(OUTPUTS),
+            dynamic_axes={name: DYNAMIC_AXES[name] for name in (*graph.names, *OUTPUTS) if name in DYNAMIC_AXES},
+            opset_version=opset,
+        )
+    os.replace(tmp_path, path)
+
+
+def quantize_onnx(path: str, quantized_path: str):
+    """Writes an int8 copy of the graph (dynamic quantization: int8 weights, activations quantized at run time)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_path = f"{quantized_path}.tmp"
+    quantize_dynamic(path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, quantized_path)
+
+
+class ONNXVoice(SBV2Voice):
+    """
+    A Style-Bert-VITS2 voice whose network runs under ONNX Runtime instead of PyTorch eager mode.
+
+    The graph is exported next to the weights (`<model>.onnx`, plus `<model>.int8.onnx` when
+    `quantize` is set) the first time the voice is loaded, and re-exported if the weights are
+    newer. Text features (pyopenjtalk and BERT) still come from style-bert-vits2. The interface
+    is the same as `SBV2Voice`; single texts are a batch of one.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        onnx_path: str,
+        quantize: bool = False,
+        intra_op_threads: Optional[int] = None,
+        features: Optional[FeatureCache] = None,
+    ):
+        super().__init__(model, features=features)
+        self.onnx_path = onnx_path
+        self.quantize = quantize
+        self.intra_op_threads = (
+            intra_op_threads or int(os.getenv('TTS_ONNX_THREADS', '0')) or default_intra_op_threads()
+        )
+        self.session = None
+        self._input_names: Tuple[str, ...] = ()
+
+    @property
+    def graph_path(self) -> str:
+        if not self.quantize:
+            return self.onnx_path
+        return f"{os.path.splitext(self.onnx_path)[0]}.int8.onnx"
+
+    def load(self):
+        if ort is None:
+            raise RuntimeError("onnxruntime is not installed.")
+        weights = str(self.model.model_path)
+        if not _is_fresh(self.graph_path, weights):
+            if not _is_fresh(self.onnx_path, weights):
+                logger.info(f"Exporting ONNX graph: {self.onnx_path}")
+                export_onnx(self, self.onnx_path)
+            if self.quantize:
+                logger.info(f"Quantizing ONNX graph: {self.graph_path}")
+                quantize_onnx(self.onnx_path, self.graph_path)
+        # The PyTorch network was only needed for the export
+        self.model._TTSModel__net_g = None
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ['CPUExecutionProvider']
+        if str(self.model.device).startswith('cuda'):
+            providers.insert(0, 'CUDAExecutionProvider')
+        self.session = ort.InferenceSession(self.graph_path, options, providers=providers)
+        # The exporter drops inputs the graph does not use
+        self._input_names = tuple(i.name for i in self.session.get_inputs())
+
+    def infer(
+        self,
+        text: str,
+        style: str = "Neutral",
+        style_weight: float = 1.0,
+        speed: float = 1.0,
+        pitch: float = 1.0,
+    ) -> Tuple[int, np.ndarray]:
+        sr, audios = self._synthesize([text], style, style_weight, speed, pitch)
+        return sr, audios[0]
+
+    def infer_batch(
+        self,
+        texts: List[str],
+        style: str = "Neutral",
+        style_weight: float = 1.0,
+        speed: float = 1.0,
+        pitch: float = 1.0,
+    ) -> Tuple[int, List[np.ndarray]]:
+        if not texts:
+            return self.sample_rate, []
+        return self._synthesize(texts, style, style_weight, speed, pitch)
+
+    def _forward(self, inputs: Dict[str, Any], length_scale: float) -> Tuple[np.ndarray, List[int]]:
+        if self.session is None:
+            self.load()
+        scalars = {'length_scale': length_scale, **self.sampling_params()}
+        feeds = {
+            name: inputs[name].cpu().numpy() if name in inputs else np.array(scalars[name], dtype=np.float32)
+            for name in self._input_names
+        }
+        audio, y_mask = self.session.run(list(OUTPUTS), feeds)
+        hop_length = self.model.hyper_parameters.data.hop_length
+        lengths = (y_mask.sum(axis=(1, 2)).astype(np.int64) * hop_length).tolist()
+        return audio[:, 0], lengths
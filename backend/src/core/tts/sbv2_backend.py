@@ -0,0 +1,350 @@
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from backend.src.core.tts.feature_cache import FeatureCache
+from backend.src.core.tts.mmap_loader import load_mmap_weights
+from backend.src.utils.audio import float_to_int16
+
+logger = logging.getLogger(__name__)
+
+# Conditional import to allow tests to run without the library installed
+try:
+    import torch
+    from style_bert_vits2.constants import DEFAULT_NOISE, DEFAULT_NOISEW, DEFAULT_SDP_RATIO, Languages
+    from style_bert_vits2.models import commons
+    from style_bert_vits2.models.infer import get_text
+    from style_bert_vits2.voice import adjust_voice
+except ImportError:
+    torch = None
+
+
+# Where streamed audio puts the voice's typical peak; the rest is headroom for louder pieces
+STREAM_PEAK = 0.8
+
+
+def to_int16(audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Peak-normalises float audio to 16-bit, as `TTSModel.infer` does, writing into `out` if given."""
+    if audio.dtype.kind != 'f':
+        if out is None:
+            return audio.astype(np.int16)
+        out[...] = audio
+        return out
+    return float_to_int16(audio, out, normalize=True)
+
+
+def overlap_add_chunks(
+    decode: Callable[[int, int], np.ndarray],
+    num_frames: int,
+    hop_length: int,
+    chunk_frames: int,
+    context_frames: int,
+    overlap_frames: int,
+) -> Iterator[np.ndarray]:
+    """
+    Runs a vocoder over `num_frames` latent frames in chunks and yields the audio in order.
+
+    `decode(start, end)` returns the float audio for latent frames [start, end), `hop_length`
+    samples per frame. Each chunk of `chunk_frames` is decoded with `context_frames` of extra
+    latent on both sides, which are cut off again, so its edges see the same receptive field as
+    a single pass. Consecutive chunks also both decode the `overlap_frames` between them, and
+    the two versions are crossfaded (overlap-add), hiding any remaining discontinuity.
+    """
+    start = 0
+    tail = None
+    while start < num_frames:
+        end = min(start + chunk_frames, num_frames)
+        stop = min(end + overlap_frames, num_frames)
+        first, last = max(0, start - context_frames), min(num_frames, stop + context_frames)
+        audio = decode(first, last)[(start - first) * hop_length : (stop - first) * hop_length]
+
+        if tail is not None:
+            n = tail.size
+            fade_in = np.linspace(0.0, 1.0, n + 2, dtype=np.float32)[1:-1]
+            audio[:n] = tail + (audio[:n] - tail) * fade_in
+        if stop == end:
+            yield audio
+            return
+        cut = audio.size - (stop - end) * hop_length
+        tail = audio[cut:].copy()
+        yield audio[:cut]
+        start = end
+
+
+class SBV2Voice:
+    """
+    Adapts a Style-Bert-VITS2 `TTSModel` to the request-level parameters used by the Synthesizer
+    (`speed`, `pitch`), and adds `infer_batch`, which synthesizes several texts with the same
+    voice settings in one padded forward pass.
+
+    With `mmap_weights`, `load` maps the weights file rather than copying it (see
+    `load_mmap_weights`). With a `FeatureCache`, text features are looked up there before
+    running the text front end, and single texts also take the batched path (as a batch of one)
+    so they use it too, as long as that path is equivalent to `TTSModel.infer` (see
+    `_reimplements`).
+
+    `infer_stream` yields a text's audio in pieces while the vocoder is still running, which
+    brings the first audio of a long sentence forward.
+    """
+
+    def __init__(self, model: Any, mmap_weights: bool = False, features: Optional[FeatureCache] = None):
+        self.model = model
+        self.mmap_weights = mmap_weights
+        self.features = features
+        # Typical peak of this voice's output, to scale streamed audio (see `infer_stream`)
+        self._peak: Optional[float] = None
+        # Whether `TTSModel`'s private network and style vectors can be reached; checked at load
+        self._internals: Optional[bool] = None
+        self.chunk_frames = int(os.getenv("TTS_VOCODER_CHUNK_FRAMES", "40"))
+        self.context_frames = int(os.getenv("TTS_VOCODER_CONTEXT_FRAMES", "6"))
+        self.overlap_frames = int(os.getenv("TTS_VOCODER_OVERLAP_FRAMES", "2"))
+        # Overrides of the batched forward pass's sampling defaults (sdp_ratio, noise_scale, noise_scale_w)
+        self.sampling: Dict[str, float] = {}
+
+    @property
+    def style2id(self) -> Dict[str, int]:
+        return self.model.style2id
+
+    @property
+    def sample_rate(self) -> int:
+        return self.model.hyper_parameters.data.sampling_rate
+
+    def load(self):
+        if self.mmap_weights:
+            load_mmap_weights(self.model)
+        else:
+            self.model.load()
+        self._internals = self._find_internals()
+        if torch is not None and not self._internals:
+            logger.warning(
+                "TTSModel internals not found; batching, the feature cache and incremental streaming are disabled"
+            )
+
+    @property
+    def has_internals(self) -> bool:
+        """
+        Whether the network and style vectors, which `TTSModel` keeps private, can be reached.
+        The batched, cached and streamed paths need them; without them (PyTorch missing, or a
+        library version that renamed them) every text goes through `TTSModel.infer`.
+        """
+        if self._internals is None:
+            self._internals = self._find_internals()
+        return self._internals
+
+    def _find_internals(self) -> bool:
+        return (
+            torch is not None
+            and hasattr(self.model, '_TTSModel__net_g')
+            and hasattr(self.model, '_TTSModel__get_style_vector')
+        )
+
+    def _reimplements(self, text: str) -> bool:
+        """
+        True if `_synthesize` gives the same result as `TTSModel.infer` for `text`. It runs one
+        line with the default speaker; `TTSModel.infer` synthesizes each line of multi-line text
+        separately and joins them with silence, so such text is left to it.
+        """
+        return self.has_internals and '\n' not in text
+
+    def infer(
+        self,
+        text: str,
+        style: str = "Neutral",
+        style_weight: float = 1.0,
+        speed: float = 1.0,
+        pitch: float = 1.0,
+    ) -> Tuple[int, np.ndarray]:
+        if self.features is not None and self._reimplements(text):
+            sr, audios = self._synthesize([text], style, style_weight, speed, pitch)
+            return sr, audios[0]
+        return self.model.infer(
+            text=text,
+            style=style,
+            style_weight=style_weight,
+            length=1.0 / speed,
+            pitch_scale=pitch,
+        )
+
+    def infer_batch(
+        self,
+        texts: List[str],
+        style: str = "Neutral",
+        style_weight: float = 1.0,
+        speed: float = 1.0,
+        pitch: float = 1.0,
+    ) -> Tuple[int, List[np.ndarray]]:
+        """
+        Runs the texts through the network as one batch. Text features are padded to the
+        longest input, and each output is cut back to its own length using the decoder mask.
+        """
+        if len(texts) == 1 or not all(self._reimplements(text) for text in texts):
+            results = [self.infer(text, style, style_weight, speed, pitch) for text in texts]
+            return results[0][0] if results else self.sample_rate, [audio for _, audio in results]
+        return self._synthesize(texts, style, style_weight, speed, pitch)
+
+    @property
+    def is_jp_extra(self) -> bool:
+        return self.model.hyper_parameters.version.endswith("JP-Extra")
+
+    @property
+    def can_stream(self) -> bool:
+        """True if `infer_stream` can run: it needs the PyTorch network, piece by piece."""
+        return self.has_internals and self.model._TTSModel__net_g is not None
+
+    def infer_stream(
+        self,
+        text: str,
+        style: str = "Neutral",
+        style_weight: float = 1.0,
+        speed: float = 1.0,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Synthesizes one text and yields its 16-bit audio in pieces as the vocoder produces them.
+
+        The text encoder, duration predictor and flow need the whole text and run first; the
+        vocoder, most of the compute, then runs over overlapping chunks of the latent
+        (`overlap_add_chunks`; sizes from `TTS_VOCODER_*_FRAMES`). Since the clip's peak is not
+        known until the end, pieces are scaled by the typical peak of this voice's earlier
+        output instead of being peak-normalised (see `_scale_stream`), so they come out somewhat
+        quieter than `infer`. Pitch shifting needs the whole clip and is not supported.
+        """
+        inputs = self._batch_inputs([text], style, style_weight)
+        net_g = self.model._TTSModel__net_g
+        with torch.no_grad():
+            z, g = self._latent(net_g, inputs, 1.0 / speed)
+
+        def decode(start: int, end: int) -> np.ndarray:
+            with torch.no_grad():
+                return net_g.dec(z[:, :, start:end], g=g)[0, 0].float().cpu().numpy()
+
+        sr = self.sample_rate
+        hop_length = self.model.hyper_parameters.data.hop_length
+        chunks = overlap_add_chunks(
+            decode, z.size(2), hop_length, self.chunk_frames, self.context_frames, self.overlap_frames
+        )
+        for audio in self._scale_stream(chunks):
+            yield sr, float_to_int16(audio)
+
+    def _scale_stream(self, chunks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        """
+        Scales streamed float audio in place so this voice's typical peak lands at `STREAM_PEAK`,
+        with one gain for the whole text. Until a peak has been observed (warm-up normally does),
+        the gain assumes the vocoder's full range, so nothing is amplified. Louder pieces are
+        clipped rather than wrapped.
+        """
+        gain = STREAM_PEAK / (self._peak or 1.0)
+        seen = 0.0
+        for audio in chunks:
+            if audio.size:
+                seen = max(seen, float(np.abs(audio).max()))
+            audio *= gain
+            np.clip(audio, -1.0, 1.0, out=audio)
+            yield audio
+        self._observe_peak(seen)
+
+    def _observe_peak(self, peak: float):
+        if peak > 0:
+            self._peak = peak if self._peak is None else 0.8 * self._peak + 0.2 * peak
+
+    def _latent(self, net_g: Any, inputs: Dict[str, "torch.Tensor"], length_scale: float):
+        """`net_g.infer` up to the vocoder's input: returns the masked latent z and the speaker embedding."""
+        params = self.sampling_params()
+        g = net_g.emb_g(inputs["sid"]).unsqueeze(-1)
+        text = [inputs[name] for name in ("x", "x_lengths", "tone", "language")]
+        if self.is_jp_extra:
+            x, m_p, logs_p, x_mask = net_g.enc_p(*text, inputs["ja_bert"], inputs["style_vec"], g=g)
+        else:
+            x, m_p, logs_p, x_mask = net_g.enc_p(
+                *text, inputs["bert"], inputs["ja_bert"], inputs["en_bert"], inputs["style_vec"], inputs["sid"], g=g
+            )
+        sdp_ratio = params["sdp_ratio"]
+        logw_sdp = net_g.sdp(x, x_mask, g=g, reverse=True, noise_scale=params["noise_scale_w"])
+        logw = logw_sdp * sdp_ratio + net_g.dp(x, x_mask, g=g) * (1 - sdp_ratio)
+        w_ceil = torch.ceil(torch.exp(logw) * x_mask * length_scale)
+        y_lengths = torch.clamp_min(torch.sum(w_ceil, [1, 2]), 1).long()
+        y_mask = torch.unsqueeze(commons.sequence_mask(y_lengths, None), 1).to(x_mask.dtype)
+        attn = commons.generate_path(w_ceil, torch.unsqueeze(x_mask, 2) * torch.unsqueeze(y_mask, -1))
+        m_p = torch.matmul(attn.squeeze(1), m_p.transpose(1, 2)).transpose(1, 2)
+        logs_p = torch.matmul(attn.squeeze(1), logs_p.transpose(1, 2)).transpose(1, 2)
+        z_p = m_p + torch.randn_like(m_p) * torch.exp(logs_p) * params["noise_scale"]
+        z = net_g.flow(z_p, y_mask, g=g, reverse=True)
+        return z * y_mask, g
+
+    def _synthesize(
+        self, texts: List[str], style: str, style_weight: float, speed: float, pitch: float
+    ) -> Tuple[int, List[np.ndarray]]:
+        inputs = self._batch_inputs(texts, style, style_weight)
+        audio, lengths = self._forward(inputs, 1.0 / speed)
+        audios = [audio[i, :n] for i, n in enumerate(lengths)]
+        self._observe_peak(float(np.abs(audio).max()) if audio.size else 0.0)
+
+        sr = self.sample_rate
+        if pitch != 1.0:
+            audios = [adjust_voice(fs=sr, wave=audio, pitch_scale=pitch)[1] for audio in audios]
+        # One int16 buffer for the whole batch; each segment is a view into it
+        sizes = [audio.size for audio in audios]
+        pcm = np.empty(sum(sizes), dtype=np.int16)
+        offsets = np.cumsum([0, *sizes]).tolist()
+        return sr, [to_int16(audio, pcm[offsets[i] : offsets[i + 1]]) for i, audio in enumerate(audios)]
+
+    def _batch_inputs(self, texts: List[str], style: str, style_weight: float) -> Dict[str, "torch.Tensor"]:
+        """Text features for the network, padded to the longest text (batch first)."""
+        model = self.model
+        hps = model.hyper_parameters
+        style_vec = model._TTSModel__get_style_vector(model.style2id[style], style_weight)
+
+        if self.features is not None:
+            features = [self.features.get_text(text, hps, model.device) for text in texts]
+        else:
+            features = [get_text(text, Languages.JP, hps, model.device) for text in texts]
+        batch = len(features)
+        lengths = [phones.size(0) for _, _, _, phones, _, _ in features]
+        max_len = max(lengths)
+
+        def pad(index: int) -> "torch.Tensor":
+            first = features[0][index]
+            padded = first.new_zeros((batch, *first.shape[:-1], max_len))
+            for i, feature in enumerate(features):
+                padded[i, ..., : feature[index].shape[-1]] = feature[index]
+            return padded.to(model.device)
+
+        bert, ja_bert, en_bert, phones, tones, lang_ids = (pad(i) for i in range(6))
+        return dict(
+            x=phones,
+            x_lengths=torch.LongTensor(lengths).to(model.device),
+            sid=torch.zeros(batch, dtype=torch.long, device=model.device),
+            tone=tones,
+            language=lang_ids,
+            bert=bert,
+            ja_bert=ja_bert,
+            en_bert=en_bert,
+            style_vec=torch.from_numpy(np.stack([style_vec] * batch)).to(model.device),
+        )
+
+    def sampling_params(self) -> Dict[str, float]:
+        """Same sampling parameters as TTSModel.infer's defaults, unless overridden in `sampling`."""
+        return {
+            "sdp_ratio": DEFAULT_SDP_RATIO,
+            "noise_scale": DEFAULT_NOISE,
+            "noise_scale_w": DEFAULT_NOISEW,
+            **self.sampling,
+        }
+
+    def _forward(self, inputs: Dict[str, "torch.Tensor"], length_scale: float) -> Tuple[np.ndarray, List[int]]:
+        """Runs the PyTorch network; returns float audio (batch, samples) and each item's length."""
+        model = self.model
+        if model._TTSModel__net_g is None:
+            model.load()
+        net_g = model._TTSModel__net_g
+
+        with torch.no_grad():
+            common = dict(style_vec=inputs["style_vec"], length_scale=length_scale, **self.sampling_params())
+            text = [inputs[name] for name in ("x", "x_lengths", "sid", "tone", "language")]
+            if self.is_jp_extra:
+                o, _, y_mask, _ = net_g.infer(*text, inputs["ja_bert"], **common)
+            else:
+                o, _, y_mask, _ = net_g.infer(*text, inputs["bert"], inputs["ja_bert"], inputs["en_bert"], **common)
+            hop_length = self.model.hyper_parameters.data.hop_length
+            lengths = (y_mask.sum(dim=(1, 2)).long() * hop_length).tolist()
+            return o[:, 0].float().cpu().numpy(), lengths
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+TTS_QUEUE_DEPTH = Gauge('tts_scheduler_queue_depth', 'TTS segments waiting for an inference slot', ['priority'])
+TTS_QUEUE_WAIT = Histogram(
+    'tts_scheduler_wait_seconds', 'Time TTS segments waited for an inference slot', ['priority'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+class Priority(IntEnum):
+    """Scheduling class of a synthesis job; lower values are served first."""
+    INTERACTIVE_FIRST = 0  # First sentence of a voice turn: the user is waiting in silence
+    INTERACTIVE = 1  # Later sentences of a voice turn, already covered by audio being played
+    BATCH = 2  # REST synthesis
+
+
+def parse_model_workers(spec: str) -> Dict[str, int]:
+    """Parses `TTS_MODEL_WORKERS`, e.g. "jvnv-F1-jp=3,jvnv-M1-jp=1"."""
+    workers = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        model_id, sep, count = item.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid TTS_MODEL_WORKERS entry: {item!r}")
+        workers[model_id.strip()] = int(count)
+    return workers
+
+
+class _ModelQueue:
+    """Free slots of one model and its waiters: per priority, per session, in arrival order."""
+
+    def __init__(self, workers: int):
+        self.free = workers
+        self.waiters: Dict[Priority, "OrderedDict[Hashable, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in Priority
+        }
+
+    def has_waiters(self) -> bool:
+        return any(self.waiters.values())
+
+    def push(self, priority: Priority, session: Hashable, waiter: asyncio.Future):
+        self.waiters[priority].setdefault(session, deque()).append(waiter)
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """
+        Takes the next waiter from the highest non-empty class. Sessions within a class take
+        turns: the served session moves to the back, so one long request cannot hold up others.
+        """
+        for priority in Priority:
+            sessions = self.waiters[priority]
+            if sessions:
+                session, queue = next(iter(sessions.items()))
+                waiter = queue.popleft()
+                if queue:
+                    sessions.move_to_end(session)
+                else:
+                    del sessions[session]
+                return waiter
+        return None
+
+    def remove(self, priority: Priority, session: Hashable, waiter: asyncio.Future):
+        queue = self.waiters[priority].get(session)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self.waiters[priority][session]
+
+
+class InferenceScheduler:
+    """
+    Hands out TTS inference slots per model.
+
+    Each model has `workers` slots (`TTS_WORKERS`, default 2), overridable per model through
+    `model_workers` / `TTS_MODEL_WORKERS`. When all slots of a model are busy, jobs wait in
+    priority order, and sessions within a priority class are served round-robin.
+    """
+
+    def __init__(self, workers: Optional[int] = None, model_workers: Optional[Dict[str, int]] = None):
+        self.workers = workers or int(os.getenv("TTS_WORKERS", "2"))
+        if model_workers is None:
+            model_workers = parse_model_workers(os.getenv("TTS_MODEL_WORKERS", ""))
+        self.model_workers = model_workers
+        self._queues: Dict[str, _ModelQueue] = {}
+
+    def _queue(self, model_id: str) -> _ModelQueue:
+        queue = self._queues.get(model_id)
+        if queue is None:
+            queue = _ModelQueue(self.model_workers.get(model_id, self.workers))
+            self._queues[model_id] = queue
+        return queue
+
+    async def acquire(self, model_id: str, priority: Priority = Priority.BATCH, session: Optional[Hashable] = None):
+        queue = self._queue(model_id)
+        if queue.free > 0 and not queue.has_waiters():
+            queue.free -= 1
+            TTS_QUEUE_WAIT.labels(priority=priority.name).observe(0)
+            return
+
+        # Anonymous jobs form a session of their own
+        session = session if session is not None else object()
+        waiter = asyncio.get_running_loop().create_future()
+        queue.push(priority, session, waiter)
+        TTS_QUEUE_DEPTH.labels(priority=priority.name).inc()
+        start_time = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release(model_id)
+            else:
+                queue.remove(priority, session, waiter)
+            raise
+        finally:
+            TTS_QUEUE_DEPTH.labels(priority=priority.name).dec()
+        TTS_QUEUE_WAIT.labels(priority=priority.name).observe(time.perf_counter() - start_time)
+
+    def release(self, model_id: str):
+        queue = self._queues[model_id]
+        while True:
+            waiter = queue.pop()
+            if waiter is None:
+                queue.free += 1
+                return
+            if not waiter.done():
+                # Hand the slot straight to the waiter so no later arrival can take it
+                waiter.set_result(None)
+                return
+
+    @asynccontextmanager
+    async def slot(
+        self, model_id: str, priority: Priority = Priority.BATCH, session: Optional[Hashable] = None
+    ) -> AsyncIterator[None]:
+        await self.acquire(model_id, priority, session)
+        try:
+            yield
+        finally:
+            self.release(model_id)
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import unicodedata
+from typing import Optional
+
+from backend.src.models.tts import TTSRequest
+from backend.src.utils.audio import AudioFrame
+from backend.src.utils.cache import DiskCache, LRUCache
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_HITS = Counter('tts_cache_hits_total', 'Synthesized segments served from the PCM cache', ['tier'])
+TTS_CACHE_MISSES = Counter('tts_cache_misses_total', 'Synthesized segments not found in the PCM cache')
+TTS_CACHE_HIT_RATIO = Gauge('tts_cache_hit_ratio', 'Fraction of segment lookups served from the PCM cache')
+TTS_CACHE_BYTES = Gauge('tts_cache_bytes', 'Bytes of PCM held by the segment cache', ['tier'])
+
+# On-disk entries start with the sample rate, followed by the int16 PCM
+_DISK_HEADER = struct.Struct('<I')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Folds full/half-width variants and whitespace so equivalent segments share an entry."""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+class SegmentCache:
+    """
+    Cache of synthesized segments as 16-bit `AudioFrame`s.
+
+    Entries are keyed by the voice parameters plus the normalised text and live in a
+    byte-budgeted in-memory LRU. An optional on-disk tier in `directory` survives restarts;
+    its files are read through mmap, so repeated reads come straight from the page cache.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        directory: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+    ):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("TTS_CACHE_MAX_MB", "64")) * 1024 * 1024)
+        directory = directory or os.getenv("TTS_CACHE_DIR") or None
+        if disk_max_bytes is None and os.getenv("TTS_CACHE_DISK_MAX_MB"):
+            disk_max_bytes = int(float(os.getenv("TTS_CACHE_DISK_MAX_MB")) * 1024 * 1024)
+
+        self.memory = LRUCache(max_bytes, sizeof=lambda frame: frame.nbytes)
+        self.disk = DiskCache(directory, disk_max_bytes) if directory else None
+        self.hits = 0
+        self.lookups = 0
+
+    @staticmethod
+    def key(model_id: str, text: str, request: TTSRequest) -> str:
+        params = [model_id, request.style, request.style_weight, request.speed, request.pitch, normalize_text(text)]
+        return hashlib.sha256(json.dumps(params, ensure_ascii=False).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[AudioFrame]:
+        self.lookups += 1
+        entry = self.memory.get(key)
+        tier = 'memory'
+        if entry is None and self.disk is not None:
+            entry = self._read_disk(key)
+            tier = 'disk'
+            if entry is not None:
+                self.memory.put(key, entry)
+
+        if entry is None:
+            TTS_CACHE_MISSES.inc()
+        else:
+            self.hits += 1
+            TTS_CACHE_HITS.labels(tier=tier).inc()
+        self._update_gauges()
+        return entry
+
+    def put(self, key: str, frame: AudioFrame):
+        self.memory.put(key, frame)
+        if self.disk is not None and not self.disk.contains(key):
+            self.disk.put(key, _DISK_HEADER.pack(frame.sample_rate) + frame.view())
+        self._update_gauges()
+
+    def _read_disk(self, key: str) -> Optional[AudioFrame]:
+        if not self.disk.contains(key):
+            return None
+        try:
+            with open(self.disk.path(key), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                (sample_rate,) = _DISK_HEADER.unpack_from(mapped)
+                pcm = mapped[_DISK_HEADER.size:]
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Unreadable TTS cache entry {key}: {e}")
+            return None
+        self.disk.touch(key)
+        return AudioFrame.from_buffer(pcm, sample_rate)
+
+    def _update_gauges(self):
+        TTS_CACHE_HIT_RATIO.set(self.hits / self.lookups if self.lookups else 0.0)
+        TTS_CACHE_BYTES.labels(tier='memory').set(self.memory.nbytes)
+        if self.disk is not None:
+            TTS_CACHE_BYTES.labels(tier='disk').set(self.disk.nbytes)
@@ -0,0 +1,115 @@
+import os
+from typing import List, Optional
+
+SENTENCE_ENDS = "。！？!?\n"
+# Clause boundaries where a long sentence can be cut without breaking a word
+CLAUSE_BREAKS = "、，,；;：:…‥"
+# Closing brackets/quotes stay with the punctuation they follow
+CLOSERS = "」』）)】〕〉》\"'"
+
+
+class TextSegmenter:
+    """
+    Splits Japanese text into TTS segments.
+
+    A segment ends at a sentence end (`。！？` or newline) once it is at least `min_chars` long;
+    shorter sentences are merged with the next one, which gives the model more context for
+    prosody. A segment that reaches `max_chars` without a sentence end is cut at its last clause
+    boundary (`、` etc.), else at its last word boundary, else at `max_chars`.
+
+    With `short_first`, the first segment ends at the first sentence end, at the first clause
+    boundary past `min_chars`, or at the first word boundary past `first_max_chars`, so audio can
+    start before the rest of the sentence is known or synthesized.
+    """
+
+    def __init__(
+        self,
+        min_chars: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        first_max_chars: Optional[int] = None,
+    ):
+        self.min_chars = min_chars if min_chars is not None else int(os.getenv("TTS_SEGMENT_MIN_CHARS", "8"))
+        self.max_chars = max_chars or int(os.getenv("TTS_SEGMENT_MAX_CHARS", "40"))
+        self.first_max_chars = first_max_chars or int(os.getenv("TTS_FIRST_SEGMENT_MAX_CHARS", "16"))
+
+    def stream(self, short_first: bool = True) -> "SegmentStream":
+        """Returns an incremental segmenter for text arriving in pieces (e.g. LLM tokens)."""
+        return SegmentStream(self, short_first)
+
+    def split(self, text: str, short_first: bool = True) -> List[str]:
+        """Splits a complete text; whitespace-only segments are dropped."""
+        stream = self.stream(short_first)
+        segments = stream.feed(text) + stream.flush()
+        # A short tail reads better attached to the previous segment, if that still fits
+        if (
+            len(segments) > 1
+            and len(segments[-1]) < self.min_chars
+            and len(segments[-2]) + len(segments[-1]) <= self.max_chars
+        ):
+            segments[-2:] = [segments[-2] + segments[-1]]
+        return segments
+
+    def cut(self, buffer: str, first: bool) -> Optional[int]:
+        """Returns the length of the next complete segment in `buffer`, or None if more text is needed."""
+        last_clause = last_word = None
+        i = 0
+        while i < len(buffer):
+            char = buffer[i]
+            end = i + 1
+            if char in SENTENCE_ENDS or char in CLAUSE_BREAKS:
+                # Keep runs like "！？" and closing quotes with the break
+                while end < len(buffer) and (buffer[end] in SENTENCE_ENDS or buffer[end] in CLOSERS):
+                    end += 1
+                if end == len(buffer):
+                    # The run may continue in the next piece of text (e.g. "！" then "？")
+                    return None
+                if char in SENTENCE_ENDS:
+                    if first or end >= self.min_chars:
+                        return end
+                elif end >= self.min_chars:
+                    if first:
+                        return end
+                    last_clause = end
+            elif i >= self.min_chars and _is_word_boundary(buffer[i - 1], char):
+                if first and i >= self.first_max_chars:
+                    return i
+                last_word = i
+            if end >= self.max_chars:
+                return last_clause or last_word or end
+            i = end
+        return None
+
+
+def _is_word_boundary(prev: str, char: str) -> bool:
+    """
+    Rough bunsetsu boundary: hiragana (particles, okurigana) followed by kanji or katakana,
+    as in "商品は|明日". The honorific prefixes お/ご belong to the word that follows.
+    """
+    return "\u3041" <= prev <= "\u309f" and prev not in "おご" and ("\u4e00" <= char <= "\u9fff" or "\u30a0" <= char <= "\u30ff")
+
+
+class SegmentStream:
+    """Incremental `TextSegmenter`: feed text as it arrives, and flush at the end."""
+
+    def __init__(self, segmenter: TextSegmenter, short_first: bool = True):
+        self.segmenter = segmenter
+        self.first = short_first
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Adds text and returns the segments it completed."""
+        self.buffer += text
+        segments = []
+        while True:
+            end = self.segmenter.cut(self.buffer, self.first)
+            if end is None:
+                return segments
+            segment, self.buffer = self.buffer[:end], self.buffer[end:]
+            if segment.strip():
+                segments.append(segment)
+                self.first = False
+
+    def flush(self) -> List[str]:
+        """Returns whatever text is left as the final segment."""
+        segment, self.buffer = self.buffer, ""
+        return [segment] if segment.strip() else []
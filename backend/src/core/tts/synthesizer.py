@@ -1,13 +1,22 @@
 import asyncio
 import logging
-import re
+import os
+import threading
 import time
-from typing import AsyncGenerator, List, Tuple
+from collections import deque
+from typing import AsyncGenerator, Deque, Hashable, List, Optional, Tuple
 
 import numpy as np
+from backend.src.core.tts.batcher import TTSBatcher
 from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.sbv2_backend import SBV2Voice
+from backend.src.core.tts.scheduler import InferenceScheduler, Priority
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.segmenter import TextSegmenter
 from backend.src.models.tts import TTSRequest
-from backend.src.utils.audio import create_wav_header
+from backend.src.utils.audio import AudioFrame, crossfade_concat, crossfade_length, wav_buffer
+from backend.src.utils.cache import SingleFlight
+from backend.src.utils.codecs import Chunk, StreamEncoder, WavEncoder, create_encoder
 from prometheus_client import Counter, Histogram
 
 logger = logging.getLogger(__name__)
@@ -15,108 +24,426 @@ logger = logging.getLogger(__name__)
 TTS_CHARS_TOTAL = Counter('tts_generated_characters_total', 'Total Japanese characters synthesized', ['model_id'])
 TTS_INFERENCE_TIME = Histogram('tts_inference_duration_seconds', 'Time spent in TTS inference', ['model_id'])
 
+WARMUP_TEXT = "こんにちは。"
+
+
+async def _infer_in_thread(func, *args, **kwargs):
+    """
+    `asyncio.to_thread` for inference under a slot. The thread cannot be interrupted, so if the
+    caller is cancelled it waits for the thread before re-raising: the slot is only released
+    once the voice is free again.
+    """
+    thread = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+    try:
+        return await asyncio.shield(thread)
+    except asyncio.CancelledError:
+        await asyncio.wait([thread])
+        raise
+
+
 class Synthesizer:
-    def __init__(self, model_manager: ModelManager):
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        cache: Optional[SegmentCache] = None,
+        lookahead: Optional[int] = None,
+        scheduler: Optional[InferenceScheduler] = None,
+        batcher: Optional[TTSBatcher] = None,
+        segmenter: Optional[TextSegmenter] = None,
+        crossfade_ms: Optional[float] = None,
+        incremental_min_chars: Optional[int] = None,
+    ):
         self.model_manager = model_manager
-        # Limit concurrent heavy inference tasks
-        self._semaphore = asyncio.Semaphore(2)
+        # Limits concurrent heavy inference per model and orders waiting jobs by priority
+        self.scheduler = scheduler or InferenceScheduler()
+        self.cache = cache or SegmentCache()
+        self.segmenter = segmenter or TextSegmenter()
+        self._single_flight = SingleFlight()
+        # Sentences synthesized ahead of the one being streamed
+        self.lookahead = lookahead if lookahead is not None else int(os.getenv("TTS_STREAM_LOOKAHEAD", "2"))
+        # Optional cross-request batching of segments with identical voice settings
+        if batcher is None and os.getenv("TTS_BATCHING", "false").lower() == "true":
+            batcher = TTSBatcher()
+        self.batcher = batcher
+        # Overlap between consecutive segments when batch mode joins them
+        self.crossfade_ms = crossfade_ms if crossfade_ms is not None else float(os.getenv("TTS_CROSSFADE_MS", "10"))
+        # First segments at least this long are streamed while the vocoder runs (0 disables)
+        if incremental_min_chars is None:
+            incremental_min_chars = int(os.getenv("TTS_STREAM_INCREMENTAL_MIN_CHARS", "20"))
+        self.incremental_min_chars = incremental_min_chars
 
-    def _split_sentences(self, text: str) -> List[str]:
+    def _split_segments(self, text: str, short_first: bool = True) -> List[str]:
         """
-        Splits Japanese text into sentences to reduce latency for streaming.
-        Splits by `。`, `！`, `？`, `\n` and keeps the delimiters.
+        Splits Japanese text into segments to reduce latency for streaming.
+        Segments end at sentence ends, and long sentences are cut at clause boundaries
+        (see `TextSegmenter`); the delimiters stay attached to their segment.
         """
-        # Finds one or more non-delimiter characters followed by optional delimiters
-        # This keeps the punctuation attached to the sentence.
-        sentences = re.findall(r'[^。！？\n]+[。！？\n]*', text)
-        if not sentences:
-            return [text] if text else []
-        return sentences
+        return self.segmenter.split(text, short_first)
 
-    async def _infer_pcm(self, text: str, request: TTSRequest) -> Tuple[int, bytes]:
+    async def _infer_pcm(
+        self,
+        text: str,
+        request: TTSRequest,
+        priority: Priority = Priority.BATCH,
+        session: Optional[Hashable] = None,
+    ) -> AudioFrame:
         """
-        Internal method to run inference and return (sample_rate, pcm_bytes).
+        Internal method to run inference and return the segment as a 16-bit `AudioFrame`.
+        Cached segments are returned without waiting for an inference slot, and identical
+        concurrent segments share one inference (scheduled with the first caller's priority).
         """
         model_id = request.model_id or "default"
-        
-        # Load model (outside semaphore to allow caching check, but load is fast if cached)
-        # However, accessing model object inside semaphore is safer if not thread-safe.
-        # model_manager.load_model is thread-safe enough for read.
-        
-        async with self._semaphore:
-            model = self.model_manager.load_model(model_id)
-            
-            start_time = time.perf_counter()
-            logger.debug(f"Inferring segment: {text[:10]}... (model: {model_id})")
-
-            # Run inference in a threadpool
-            sr, audio_data = await asyncio.to_thread(
-                model.infer,
-                text=text,
-                style=request.style,
-                style_weight=request.style_weight,
-                speed=request.speed,
-                pitch=request.pitch
+        key = self.cache.key(model_id, text, request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        return await self._single_flight.do(
+            key, lambda: self._infer_and_cache(key, text, request, priority, session)
+        )
+
+    async def _infer_and_cache(
+        self, key: str, text: str, request: TTSRequest, priority: Priority, session: Optional[Hashable]
+    ) -> AudioFrame:
+        frame = await self._infer_uncached(text, request, priority, session)
+        self.cache.put(key, frame)
+        return frame
+
+    async def _infer_uncached(
+        self,
+        text: str,
+        request: TTSRequest,
+        priority: Priority = Priority.BATCH,
+        session: Optional[Hashable] = None,
+    ) -> AudioFrame:
+        model_id = request.model_id or "default"
+        if self.batcher is not None:
+            group = (model_id, request.style, request.style_weight, request.speed, request.pitch)
+            return await self.batcher.infer(
+                group, text, lambda texts: self._infer_batch(texts, request, priority, session)
             )
-            
+
+        async with self.scheduler.slot(model_id, priority, session):
+            # Loading a model from disk takes seconds; keep it off the event loop
+            model = await asyncio.to_thread(self.model_manager.load_model, model_id)
+            return await self._infer_loaded(model, model_id, text, request)
+
+    async def _infer_loaded(self, model: object, model_id: str, text: str, request: TTSRequest) -> AudioFrame:
+        """Synthesizes one segment with a loaded model. Caller holds the slot."""
+        start_time = time.perf_counter()
+        logger.debug(f"Inferring segment: {text[:10]}... (model: {model_id})")
+
+        # Run inference in a threadpool
+        sr, audio_data = await _infer_in_thread(
+            model.infer,
+            text=text,
+            style=request.style,
+            style_weight=request.style_weight,
+            speed=request.speed,
+            pitch=request.pitch
+        )
+
+        duration = time.perf_counter() - start_time
+        TTS_INFERENCE_TIME.labels(model_id=model_id).observe(duration)
+        TTS_CHARS_TOTAL.labels(model_id=model_id).inc(len(text))
+
+        return self._to_frame(sr, audio_data)
+
+    async def _infer_batch(
+        self,
+        texts: List[str],
+        request: TTSRequest,
+        priority: Priority,
+        session: Optional[Hashable],
+    ) -> List[AudioFrame]:
+        """Synthesizes segments sharing the request's voice settings in one forward pass."""
+        model_id = request.model_id or "default"
+
+        async with self.scheduler.slot(model_id, priority, session):
+            model = await asyncio.to_thread(self.model_manager.load_model, model_id)
+
+            start_time = time.perf_counter()
+            if hasattr(model, 'infer_batch'):
+                sr, audios = await _infer_in_thread(
+                    model.infer_batch,
+                    texts,
+                    style=request.style,
+                    style_weight=request.style_weight,
+                    speed=request.speed,
+                    pitch=request.pitch
+                )
+            else:
+                results = [
+                    await _infer_in_thread(
+                        model.infer,
+                        text=text,
+                        style=request.style,
+                        style_weight=request.style_weight,
+                        speed=request.speed,
+                        pitch=request.pitch
+                    )
+                    for text in texts
+                ]
+                sr, audios = results[0][0], [audio for _, audio in results]
+
             duration = time.perf_counter() - start_time
             TTS_INFERENCE_TIME.labels(model_id=model_id).observe(duration)
-            TTS_CHARS_TOTAL.labels(model_id=model_id).inc(len(text))
+            TTS_CHARS_TOTAL.labels(model_id=model_id).inc(sum(len(text) for text in texts))
+
+            return [self._to_frame(sr, audio) for audio in audios]
+
+    async def _infer_incremental(
+        self,
+        text: str,
+        request: TTSRequest,
+        priority: Priority,
+        session: Optional[Hashable],
+        queue: "asyncio.Queue[Optional[AudioFrame]]",
+    ) -> AudioFrame:
+        """
+        Synthesizes one segment, putting its audio in `queue` piece by piece as the vocoder
+        produces it (see `SBV2Voice.infer_stream`), then None. Returns the whole segment, which
+        is cached like any other. Cached segments, segments already being synthesized for
+        another caller (which are joined, as in `_infer_pcm`) and voices that cannot stream
+        arrive as a single piece.
+        """
+        try:
+            model_id = request.model_id or "default"
+            key = self.cache.key(model_id, text, request)
+            frame = self.cache.get(key)
+            if frame is None and key not in self._single_flight and self._can_stream(model_id):
+                return await self._single_flight.do(
+                    key, lambda: self._stream_and_cache(key, model_id, text, request, priority, session, queue)
+                )
+            if frame is None:
+                frame = await self._single_flight.do(
+                    key, lambda: self._infer_and_cache(key, text, request, priority, session)
+                )
+            queue.put_nowait(frame)
+            return frame
+        finally:
+            queue.put_nowait(None)
+
+    def _can_stream(self, model_id: str) -> bool:
+        can_stream = getattr(self.model_manager, 'can_stream', None)
+        return can_stream is not None and can_stream(model_id)
 
-            # Normalize if float
-            if audio_data.dtype.kind == 'f':
-                audio_data = np.clip(audio_data, -1.0, 1.0)
-                audio_data = (audio_data * 32767).astype(np.int16)
-            
-            return sr, audio_data.tobytes()
+    async def _stream_and_cache(
+        self,
+        key: str,
+        model_id: str,
+        text: str,
+        request: TTSRequest,
+        priority: Priority,
+        session: Optional[Hashable],
+        queue: asyncio.Queue,
+    ) -> AudioFrame:
+        async with self.scheduler.slot(model_id, priority, session):
+            model = await asyncio.to_thread(self.model_manager.load_model, model_id)
+            if isinstance(model, SBV2Voice) and model.can_stream:
+                frame = await self._stream_pieces(model, model_id, text, request, queue)
+            else:
+                # Not known until loaded (e.g. the library internals it needs are missing); keep the slot
+                frame = await self._infer_loaded(model, model_id, text, request)
+                queue.put_nowait(frame)
+        self.cache.put(key, frame)
+        return frame
 
-    async def synthesize(self, request: TTSRequest) -> bytes:
+    async def _stream_pieces(
+        self, model: SBV2Voice, model_id: str, text: str, request: TTSRequest, queue: asyncio.Queue
+    ) -> AudioFrame:
         """
-        Synthesizes full text to audio (WAV) in one go (Batch mode).
+        Runs `model.infer_stream` in a thread, forwarding each piece to `queue`. Caller holds the
+        slot. Returns the whole segment exactly as it was streamed, for the segment cache, so a
+        repeated request plays at the same level as the first one.
+        """
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+
+        def produce() -> List[AudioFrame]:
+            pieces = []
+            for sr, audio in model.infer_stream(
+                text, style=request.style, style_weight=request.style_weight, speed=request.speed
+            ):
+                if stop.is_set():
+                    break
+                frame = AudioFrame(audio, sr)
+                pieces.append(frame)
+                loop.call_soon_threadsafe(queue.put_nowait, frame)
+            return pieces
+
+        start_time = time.perf_counter()
+        logger.debug(f"Streaming segment: {text[:10]}... (model: {model_id})")
+        thread = asyncio.ensure_future(asyncio.to_thread(produce))
+        try:
+            pieces = await asyncio.shield(thread)
+        except asyncio.CancelledError:
+            # The thread cannot be interrupted: stop it after the current chunk, and keep the
+            # caller's slot until it has, so the voice never runs more inferences than it has slots
+            stop.set()
+            await asyncio.wait([thread])
+            raise
+        TTS_INFERENCE_TIME.labels(model_id=model_id).observe(time.perf_counter() - start_time)
+        TTS_CHARS_TOTAL.labels(model_id=model_id).inc(len(text))
+        if not pieces:  # e.g. nothing left to say after normalisation
+            return AudioFrame(np.zeros(0, dtype=np.int16), model.sample_rate)
+        return AudioFrame(np.concatenate([piece.samples for piece in pieces]), pieces[0].sample_rate)
+
+    @staticmethod
+    def _to_frame(sample_rate: int, audio_data: np.ndarray) -> AudioFrame:
+        # Float output is clipped in place and cast straight into one int16 buffer
+        if audio_data.dtype.kind == 'f':
+            return AudioFrame.from_float(audio_data, sample_rate)
+        return AudioFrame(audio_data.astype(np.int16, copy=False), sample_rate)
+
+    async def warm_up(self, model_id: str):
+        """
+        Loads a voice and synthesizes a short phrase so that the first real request
+        does not pay for model loading, JIT compilation or allocator growth.
+        """
+        model = await asyncio.to_thread(self.model_manager.load_model, model_id)
+        await asyncio.to_thread(model.infer, text=WARMUP_TEXT)
+        if isinstance(model, SBV2Voice) and model.can_stream:
+            # Also sets the level the voice's streamed audio is scaled to (see `SBV2Voice.infer_stream`)
+            await asyncio.to_thread(lambda: list(model.infer_stream(WARMUP_TEXT)))
+        logger.info(f"TTS model warmed up: {model_id}")
+
+    async def synthesize(self, request: TTSRequest) -> Chunk:
+        """
+        Synthesizes full text to audio in one go (Batch mode), encoded as `request.output_format`.
+        Text longer than one segment is split as for streaming, and the segments are synthesized
+        concurrently (as many at a time as the scheduler gives this request slots) and joined
+        with short crossfades.
         """
         model_id = request.model_id or "default"
-        logger.info(f"Batch synthesis start: {len(request.text)} chars (model: {model_id})")
-        
-        sr, pcm_data = await self._infer_pcm(request.text, request)
-        
-        header = create_wav_header(
-            sample_rate=sr,
-            channels=1,
-            bit_depth=16,
-            data_size=len(pcm_data)
+        encoder = create_encoder(request.output_format, request.sample_rate)
+        segments = self._split_segments(request.text, short_first=False)
+        logger.info(f"Batch synthesis start: {len(request.text)} chars, {len(segments)} segments (model: {model_id})")
+
+        if len(segments) <= 1:
+            frame = await self._infer_pcm(request.text, request)
+            return await asyncio.to_thread(encoder.encode_all, frame)
+
+        # One scheduler session for the whole request, so its segments take turns with other callers
+        session = object()
+        tasks = [
+            asyncio.create_task(self._infer_pcm(segment, request, Priority.BATCH, session)) for segment in segments
+        ]
+        try:
+            frames = await asyncio.gather(*tasks)
+        finally:
+            # A failed segment (or a cancelled request) drops the rest
+            for task in tasks:
+                task.cancel()
+        return await asyncio.to_thread(self._join, frames, encoder)
+
+    def _join(self, frames: List[AudioFrame], encoder: StreamEncoder) -> Chunk:
+        """Joins segment frames into one preallocated buffer and encodes it."""
+        sample_rate = frames[0].sample_rate
+        crossfade = int(sample_rate * self.crossfade_ms / 1000)
+        if isinstance(encoder, WavEncoder) and encoder.sample_rate in (None, sample_rate):
+            # Crossfade straight into the WAV file's sample area, behind its exact-size header
+            buffer, samples = wav_buffer(crossfade_length(frames, crossfade), sample_rate)
+            crossfade_concat(frames, crossfade, out=samples)
+            return memoryview(buffer)
+        return encoder.encode_all(AudioFrame(crossfade_concat(frames, crossfade), sample_rate))
+
+    def _streams_incrementally(self, segment: str, request: TTSRequest, priority: Priority) -> bool:
+        """
+        Whether the first segment of a stream is sent while the vocoder is still running: only
+        when it is long enough for that to matter and no pitch shift (which needs the whole
+        clip) is requested. Later sentences of a voice turn (INTERACTIVE) follow audio already
+        playing and are synthesized whole.
+        """
+        return (
+            bool(self.incremental_min_chars)
+            and len(segment) >= self.incremental_min_chars
+            and request.pitch == 1.0
+            and priority != Priority.INTERACTIVE
         )
-        
-        return header + pcm_data
 
-    async def synthesize_stream(self, request: TTSRequest) -> AsyncGenerator[bytes, None]:
+    async def synthesize_stream(
+        self,
+        request: TTSRequest,
+        priority: Priority = Priority.BATCH,
+        session: Optional[Hashable] = None,
+    ) -> AsyncGenerator[Chunk, None]:
         """
         Streams audio chunks by synthesizing sentence by sentence (True Streaming).
+        Up to `lookahead` sentences are synthesized ahead of the one being sent, so inference
+        overlaps with the consumer; chunks are still yielded in sentence order.
+        The first sentence is scheduled with `priority`; interactive streams schedule the rest
+        as INTERACTIVE, since by then the listener already has audio.
+        Each segment is encoded to `request.output_format` in a thread as soon as it is ready;
+        PCM and WAV chunks are memoryviews of the synthesized samples rather than copies.
+        A long first segment is sent piece by piece while the vocoder is still running (see
+        `_streams_incrementally`), so first audio does not wait for the whole sentence.
         """
-        sentences = self._split_sentences(request.text)
+        encoder = create_encoder(request.output_format, request.sample_rate)
+        later_priority = max(priority, Priority.INTERACTIVE)
+        # Later sentences of a voice turn follow audio already playing; no need to cut them short
+        sentences = self._split_segments(request.text, short_first=priority != Priority.INTERACTIVE)
         logger.info(f"Streaming synthesis start: {len(request.text)} chars, {len(sentences)} segments")
-        
-        first_chunk = True
-        
-        for segment in sentences:
-            if not segment.strip():
-                continue
-                
-            try:
-                sr, pcm_data = await self._infer_pcm(segment, request)
-                
-                if first_chunk:
-                    # Send WAV header with unknown size (0xFFFFFFFF)
-                    yield create_wav_header(
-                        sample_rate=sr,
-                        channels=1,
-                        bit_depth=16,
-                        data_size=0xFFFFFFFF
-                    )
-                    first_chunk = False
-                
-                yield pcm_data
-                
-            except Exception as e:
-                logger.error(f"Error synthesizing segment '{segment}': {e}")
-                # Continue to next segment? or abort. Usually abort.
-                raise e
\ No newline at end of file
+
+        # (segment, task returning its frame, queue of its pieces if it is streamed incrementally)
+        pending: Deque[Tuple[str, asyncio.Task, Optional[asyncio.Queue]]] = deque()
+        upcoming = iter(enumerate(sentences))
+        started = False
+        current = None
+
+        def schedule():
+            while len(pending) <= self.lookahead:
+                index, segment = next(upcoming, (None, None))
+                if segment is None:
+                    return
+                segment_priority = priority if index == 0 else later_priority
+                queue = None
+                if index == 0 and self._streams_incrementally(segment, request, priority):
+                    queue = asyncio.Queue()
+                    coro = self._infer_incremental(segment, request, segment_priority, session, queue)
+                else:
+                    coro = self._infer_pcm(segment, request, segment_priority, session)
+                pending.append((segment, asyncio.create_task(coro), queue))
+
+        async def pieces(task: asyncio.Task, queue: Optional[asyncio.Queue]) -> AsyncGenerator[AudioFrame, None]:
+            if queue is not None:
+                while (frame := await queue.get()) is not None:
+                    yield frame
+            # Raises if the segment failed
+            frame = await task
+            if queue is None:
+                yield frame
+
+        try:
+            schedule()
+            while pending:
+                segment, task, queue = pending.popleft()
+                current = task
+                try:
+                    async for frame in pieces(task, queue):
+                        # Start the next segment before handing this one to the (possibly slow) consumer
+                        schedule()
+
+                        if not started:
+                            # Container header (WAV: unknown size 0xFFFFFFFF; Ogg: Opus header pages)
+                            header = encoder.start(frame.sample_rate)
+                            if header:
+                                yield header
+                            started = True
+
+                        chunk = await asyncio.to_thread(encoder.encode, frame)
+                        if chunk:
+                            yield chunk
+                except Exception as e:
+                    logger.error(f"Error synthesizing segment '{segment}': {e}")
+                    raise
+
+            if started:
+                tail = await asyncio.to_thread(encoder.finish)
+                if tail:
+                    yield tail
+        finally:
+            # Client went away or a segment failed: drop the segment being streamed and the work queued ahead
+            if current is not None:
+                current.cancel()
+            for _, task, _ in pending:
+                task.cancel()
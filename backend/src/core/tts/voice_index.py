@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from backend.src.models.tts import VoiceModel
+
+logger = logging.getLogger(__name__)
+
+# Style-Bert-VITS2's default when a config does not set `data.sampling_rate`
+DEFAULT_SAMPLE_RATE = 44100
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def read_voice_config(model_id: str, config_path: str) -> VoiceModel:
+    """Builds a voice's metadata from its Style-Bert-VITS2 `config.json`; raises ValueError if unusable."""
+    try:
+        with open(config_path, encoding='utf-8') as f:
+            config = json.load(f)
+        data = config.get('data', {})
+        style2id = data.get('style2id') or {str(i): i for i in range(int(data.get('num_styles', 1)))}
+        # Same order as the style vectors
+        styles = [name for name, _ in sorted(style2id.items(), key=lambda item: item[1])]
+        return VoiceModel(
+            id=model_id,
+            name=config.get('model_name') or model_id,
+            styles=styles,
+            sample_rate=int(data.get('sampling_rate', DEFAULT_SAMPLE_RATE)),
+        )
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid voice config {config_path}: {e}") from e
+
+
+class VoiceIndex:
+    """
+    Metadata (styles, sample rate) of the voices in a model directory, read from each voice's
+    `config.json` without loading any weights.
+
+    Lookups are served from memory after a single `stat` of the model directory; the directory
+    is rescanned when its mtime changes (a voice added, removed or renamed), and a rescan only
+    re-reads configs whose mtime changed. Voice directories without a readable config or weights
+    are re-checked whenever their own mtime changes, so a voice that is still being copied shows
+    up once its files are in place. In-place edits of an existing config are picked up by a full
+    re-check every `recheck_s` seconds, or immediately after `invalidate()`.
+    """
+
+    def __init__(self, model_dir: str, recheck_s: Optional[float] = None):
+        self.model_dir = model_dir
+        if recheck_s is None:
+            recheck_s = float(os.getenv("TTS_VOICE_INDEX_RECHECK_S", "30"))
+        self.recheck_s = recheck_s
+
+        self._entries: Dict[str, Tuple[int, VoiceModel]] = {}  # model_id -> (config mtime, metadata)
+        self._incomplete: Dict[str, Optional[int]] = {}  # model_id -> voice directory mtime
+        self._models: List[VoiceModel] = []
+        self._dir_mtime: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def list(self) -> List[VoiceModel]:
+        self._refresh()
+        return list(self._models)
+
+    def get(self, model_id: str) -> Optional[VoiceModel]:
+        self._refresh()
+        entry = self._entries.get(model_id)
+        return entry[1] if entry else None
+
+    def invalidate(self):
+        """Forces a full re-check on the next lookup."""
+        with self._lock:
+            self._checked_at = None
+
+    def _stale(self, dir_mtime: Optional[int]) -> bool:
+        if (
+            self._checked_at is None
+            or dir_mtime != self._dir_mtime
+            or time.monotonic() - self._checked_at >= self.recheck_s
+        ):
+            return True
+        # A voice still being copied: its directory changes as files are added
+        return any(
+            _mtime_ns(os.path.join(self.model_dir, name)) != mtime for name, mtime in self._incomplete.items()
+        )
+
+    def _refresh(self):
+        dir_mtime = _mtime_ns(self.model_dir)
+        if not self._stale(dir_mtime):
+            return
+        with self._lock:
+            # Another thread may have rescanned while this one waited
+            if self._stale(dir_mtime):
+                self._scan()
+                self._dir_mtime = dir_mtime
+                self._checked_at = time.monotonic()
+
+    def _scan(self):
+        """Rebuilds the index, re-reading only configs that changed. Caller holds the lock."""
+        try:
+            names = sorted(os.listdir(self.model_dir))
+        except OSError:
+            names = []
+
+        entries: Dict[str, Tuple[int, VoiceModel]] = {}
+        incomplete: Dict[str, Optional[int]] = {}
+        for name in names:
+            path = os.path.join(self.model_dir, name)
+            if not os.path.isdir(path):
+                continue
+            config_path = os.path.join(path, 'config.json')
+            config_mtime = _mtime_ns(config_path)
+            if config_mtime is None or not any(f.endswith('.safetensors') for f in os.listdir(path)):
+                incomplete[name] = _mtime_ns(path)
+                continue
+
+            cached = self._entries.get(name)
+            if cached is not None and cached[0] == config_mtime:
+                entries[name] = cached
+                continue
+            try:
+                entries[name] = (config_mtime, read_voice_config(name, config_path))
+            except ValueError as e:
+                if name not in self._incomplete:
+                    logger.warning(str(e))
+                incomplete[name] = _mtime_ns(path)
+
+        if entries.keys() != self._entries.keys():
+            logger.info(f"TTS voice index: {len(entries)} voices in {self.model_dir}")
+        self._entries = entries
+        self._incomplete = incomplete
+        self._models = [info for _, info in entries.values()]
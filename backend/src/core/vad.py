@@ -0,0 +1,138 @@
+import logging
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from src.utils.audio import AudioFrame
+from src.utils.audio_utils import STT_SAMPLE_RATE, BytesLike
+
+logger = logging.getLogger(__name__)
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+
+class VADEvent(NamedTuple):
+    type: str  # SPEECH_START or SPEECH_END
+    audio: Optional[AudioFrame] = None  # Utterance (16-bit mono) for SPEECH_END
+
+
+class EnergyVAD:
+    """
+    Frame-energy voice activity detector for one raw 16-bit mono PCM stream.
+
+    Speech starts after `min_speech_ms` of frames above `threshold_db` (dBFS) and ends after
+    `hangover_ms` of frames below it. The utterance handed out with SPEECH_END includes a short
+    pre-roll before the first voiced frame and is trimmed shortly after the last one.
+
+    Frame energies for a whole chunk are computed in one vectorised pass, and the state machine
+    only iterates over runs of voiced/unvoiced frames, so the per-chunk Python overhead does not
+    grow with the chunk length.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = STT_SAMPLE_RATE,
+        threshold_db: float = -40.0,
+        hangover_ms: int = 500,
+        min_speech_ms: int = 100,
+        preroll_ms: int = 200,
+        tail_ms: int = 100,
+        max_utterance_s: float = 30.0,
+        frame_ms: int = 20,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * frame_ms // 1000
+        self._frame_bytes = self.frame_len * 2
+        # Threshold on the sum of squared int16 samples of a frame
+        rms = 10 ** (threshold_db / 20) * 32768
+        self._energy_threshold = rms * rms * self.frame_len
+        self._hangover = max(1, hangover_ms // frame_ms)
+        self._min_speech = max(1, min_speech_ms // frame_ms)
+        self._preroll_bytes = (preroll_ms // frame_ms) * self._frame_bytes
+        self._tail_bytes = (tail_ms // frame_ms) * self._frame_bytes
+        self._max_bytes = int(max_utterance_s * 1000 // frame_ms) * self._frame_bytes
+
+        self._carry = b""
+        self._audio = bytearray()  # Pre-roll while idle, the current utterance while in speech
+        self.in_speech = False
+        self._voiced_run = 0
+        self._silence_run = 0
+        self._last_voiced = 0  # Byte offset into _audio just after the last voiced frame
+
+    def reset(self):
+        self._carry = b""
+        self._audio = bytearray()
+        self.in_speech = False
+        self._voiced_run = 0
+        self._silence_run = 0
+        self._last_voiced = 0
+
+    def _frame_voicing(self, data: BytesLike, n_frames: int) -> np.ndarray:
+        frames = np.frombuffer(data, dtype="<i2", count=n_frames * self.frame_len).reshape(n_frames, self.frame_len)
+        frames = frames.astype(np.float32)
+        return np.einsum("ij,ij->i", frames, frames) > self._energy_threshold
+
+    def _end_speech(self, events: List[VADEvent]):
+        end = min(len(self._audio), self._last_voiced + self._tail_bytes)
+        # Hand out the buffer itself, trimmed in place, rather than a copy of it
+        del self._audio[end:]
+        events.append(VADEvent(SPEECH_END, AudioFrame.from_buffer(self._audio, self.sample_rate)))
+        self._audio = bytearray()
+        self.in_speech = False
+        self._voiced_run = 0
+        self._silence_run = 0
+
+    def process(self, chunk: BytesLike) -> List[VADEvent]:
+        """Consumes a PCM chunk of any length and returns the events it triggered, in order."""
+        # The chunk is only viewed; its bytes are copied once, into the utterance buffer
+        data = memoryview(self._carry + chunk if self._carry else chunk).cast("B")
+        n_frames = len(data) // self._frame_bytes
+        self._carry = bytes(data[n_frames * self._frame_bytes :])
+        if n_frames == 0:
+            return []
+
+        voiced = self._frame_voicing(data, n_frames)
+        edges = np.flatnonzero(voiced[1:] != voiced[:-1]) + 1
+        run_starts = np.concatenate(([0], edges))
+        run_ends = np.concatenate((edges, [n_frames]))
+
+        events: List[VADEvent] = []
+        fb = self._frame_bytes
+        for run_start, run_end in zip(run_starts.tolist(), run_ends.tolist()):
+            is_voiced = bool(voiced[run_start])
+            pos = run_start
+            while pos < run_end:
+                length = run_end - pos
+                if not self.in_speech:
+                    if is_voiced:
+                        needed = self._min_speech - self._voiced_run
+                        take = min(length, needed)
+                        self._audio += data[pos * fb : (pos + take) * fb]
+                        self._voiced_run += take
+                        pos += take
+                        if self._voiced_run >= self._min_speech:
+                            self.in_speech = True
+                            self._silence_run = 0
+                            self._last_voiced = len(self._audio)
+                            events.append(VADEvent(SPEECH_START))
+                    else:
+                        self._voiced_run = 0
+                        self._audio += data[pos * fb : run_end * fb]
+                        if len(self._audio) > self._preroll_bytes:
+                            del self._audio[: len(self._audio) - self._preroll_bytes]
+                        pos = run_end
+                else:
+                    if is_voiced:
+                        take = length
+                        self._silence_run = 0
+                        self._audio += data[pos * fb : (pos + take) * fb]
+                        self._last_voiced = len(self._audio)
+                    else:
+                        take = min(length, self._hangover - self._silence_run)
+                        self._silence_run += take
+                        self._audio += data[pos * fb : (pos + take) * fb]
+                    pos += take
+                    if self._silence_run >= self._hangover or len(self._audio) >= self._max_bytes:
+                        self._end_speech(events)
+        return events
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+MODEL_WARMUP_DURATION = Histogram(
+    "model_warmup_duration_seconds",
+    "Time to load and warm up one model at startup",
+    ["component"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0),
+)
+SERVICE_READY = Gauge("service_ready", "1 once startup model warm-up has completed successfully")
+
+
+def preload_tts_models() -> List[str]:
+    """TTS voices to warm up at startup, from the comma-separated `TTS_PRELOAD_MODELS`."""
+    return [m.strip() for m in os.getenv("TTS_PRELOAD_MODELS", "").split(",") if m.strip()]
+
+
+class ModelWarmup:
+    """
+    Startup phase that loads the STT model and the configured TTS voices concurrently and
+    runs one short inference on each. `ready` only turns true once every step has succeeded.
+    """
+
+    def __init__(self, steps: Dict[str, Callable[[], Awaitable[None]]]):
+        self.steps = steps
+        self.done = False
+        self.errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.done and not self.errors
+
+    def status(self) -> Dict:
+        if not self.done:
+            return {"status": "warming_up"}
+        if self.errors:
+            return {"status": "failed", "errors": self.errors}
+        return {"status": "ready"}
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[None]]):
+        start_time = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            logger.error(f"Warm-up of {name} failed: {e}")
+            self.errors[name] = str(e)
+            return
+        duration = time.perf_counter() - start_time
+        MODEL_WARMUP_DURATION.labels(component=name).observe(duration)
+        logger.info(f"Warm-up of {name} finished in {duration:.2f}s")
+
+    async def run(self):
+        logger.info(f"Warming up models: {', '.join(self.steps)}")
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self.steps.items()))
+        self.done = True
+        SERVICE_READY.set(1 if self.ready else 0)
+
+    async def start(self):
+        """Startup hook: runs the warm-up in the background so liveness checks answer meanwhile."""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
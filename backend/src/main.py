@@ -1,8 +1,15 @@
+from functools import partial
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from backend.src.api.v1.tts_dependencies import get_synthesizer
+from src.core.stt_batcher import stt_batcher
 
 from .api.v1.endpoints import llm, orchestrator, stt, tts
+from .core.warmup import ModelWarmup, preload_tts_models
 from .middlewares.logging import LoggingMiddleware
 from .middlewares.metrics import (  # Import MetricsMiddleware class and metrics_endpoint function
     MetricsMiddleware,
@@ -12,11 +19,20 @@ from .middlewares.rate_limiter import initialize_rate_limiter
 
 load_dotenv()  # Load environment variables from .env file
 
+# Load and warm up models eagerly so the first request after a deploy is not cold
+warmup = ModelWarmup(
+    {
+        "stt": stt_batcher.warm_up,
+        **{f"tts:{model_id}": partial(get_synthesizer().warm_up, model_id) for model_id in preload_tts_models()},
+    }
+)
+
 app = FastAPI(
     title="Local Voice Assistant API",
     description="API for Japanese Speech-to-Text and LLM services.",
     version="1.0.0",
-    on_startup=[initialize_rate_limiter],  # Initialize rate limiter on startup
+    on_startup=[initialize_rate_limiter, warmup.start],  # Initialize rate limiter and start model warm-up
+    on_shutdown=[warmup.stop, stt_batcher.close],  # Stop STT worker processes
 )
 
 origins = [
@@ -42,3 +58,15 @@ app.include_router(stt.router, prefix="/api/v1", tags=["stt"])
 app.include_router(llm.router, prefix="/api/v1/llm", tags=["llm"])
 app.include_router(tts.router, prefix="/api/v1/tts", tags=["tts"])
 app.include_router(orchestrator.router, prefix="/api/v1/orchestrator", tags=["orchestrator"])
+
+
+@app.get("/health", tags=["health"])
+async def health():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+
+@app.get("/ready", tags=["health"])
+async def ready():
+    """Readiness: 200 only once every configured model is loaded and warmed up."""
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.status())
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -8,6 +8,15 @@ class OrchestratorConfig(BaseModel):
     llm_model: Optional[str] = Field(None, description="LLM model to use")
     tts_voice: Optional[str] = Field(None, description="TTS voice to use")
     tts_style: Optional[str] = Field(None, description="TTS style to use")
+    tts_output_format: Literal["wav", "pcm", "mulaw", "opus"] = Field(
+        "wav", description="Encoding of the audio frames sent to the client"
+    )
+    tts_sample_rate: Optional[int] = Field(None, ge=8000, le=48000, description="Sample rate of the audio sent to the client")
+    server_vad: bool = Field(
+        False, description="Endpoint speech on the server instead of treating each binary frame as one utterance"
+    )
+    vad_threshold_db: float = Field(-40.0, le=0.0, description="Frame level (dBFS) above which audio counts as speech")
+    vad_hangover_ms: int = Field(500, ge=100, le=5000, description="Silence after speech before the turn ends")
 
 class WebSocketEvent(BaseModel):
     type: str = Field(..., description="Event type: config, speech_start, transcript, error, processing_start")
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -15,3 +15,8 @@ class TranscriptionResult(BaseModel):
     is_final: bool
     start_timestamp: float
     end_timestamp: float
+
+
+class LongFormTranscriptionResult(BaseModel):
+    text: str
+    segments: List[TranscriptionResult]
@@ -1,16 +1,24 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
 class TTSRequest(BaseModel):
-    text: str = Field(..., max_length=500, description="The Japanese text to synthesize.")
+    text: str = Field(
+        ..., max_length=5000, description="The Japanese text to synthesize. Long texts are synthesized in segments."
+    )
     model_id: Optional[str] = Field(None, description="The specific model/speaker to use.")
     style: Optional[str] = Field("Neutral", description="The emotion/style name.")
     style_weight: Optional[float] = Field(1.0, description="Intensity of the chosen style.")
     speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Speech rate.")
     pitch: Optional[float] = Field(1.0, description="Fundamental frequency scale.")
     stream: bool = Field(False, description="Whether to use chunked transfer encoding.")
+    output_format: Literal["wav", "pcm", "mulaw", "opus"] = Field(
+        "wav", description="Audio encoding: 16-bit WAV, raw 16-bit PCM, G.711 mu-law, or Opus in Ogg."
+    )
+    sample_rate: Optional[int] = Field(
+        None, ge=8000, le=48000, description="Output sample rate. Defaults to the model's rate (8 kHz for mulaw, 48 kHz for opus)."
+    )
 
 class VoiceModel(BaseModel):
     id: str = Field(..., description="Unique identifier.")
@@ -1,4 +1,10 @@
 import struct
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+WAV_HEADER_SIZE = 44
 
 
 def create_wav_header(sample_rate: int, channels: int = 1, bit_depth: int = 16, data_size: int = 0xFFFFFFFF) -> bytes:
@@ -38,3 +44,243 @@ def create_wav_header(sample_rate: int, channels: int = 1, bit_depth: int = 16,
         b'data',
         data_size       # Subchunk2Size
     )
+
+
+def float_to_int16(audio: np.ndarray, out: Optional[np.ndarray] = None, normalize: bool = False) -> np.ndarray:
+    """
+    Converts float samples in [-1, 1] to int16, writing into `out` (allocated if None).
+
+    The scaled values are cast straight into `out`, so no float temporaries the size of the
+    audio are created. Out-of-range samples are clipped in place in `audio` when it is writable.
+    With `normalize`, the audio is scaled so that its peak is full scale instead of clipped.
+    """
+    if out is None:
+        out = np.empty(audio.shape, dtype=np.int16)
+    if audio.size == 0:
+        return out
+
+    scale = 32767.0
+    if normalize:
+        peak = float(np.abs(audio).max())
+        if peak > 0:
+            scale /= peak
+    elif audio.flags.writeable:
+        np.clip(audio, -1.0, 1.0, out=audio)
+    else:
+        audio = np.clip(audio, -1.0, 1.0)
+    np.multiply(audio, scale, out=out, casting="unsafe")
+    return out
+
+
+class AudioFrame:
+    """
+    A block of PCM samples backed by a NumPy array, together with its sample rate.
+
+    Mono audio is a 1-D array; multichannel audio has shape (frames, channels) and is interleaved
+    in memory. `from_buffer` views existing bytes without copying, and `view` hands the samples
+    to the transport layer (sockets, response bodies, files) as a memoryview, so audio moves
+    between STT, TTS and the orchestrator without intermediate `bytes` copies.
+    """
+
+    __slots__ = ("samples", "sample_rate")
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_buffer(
+        cls, data: Union[bytes, bytearray, memoryview], sample_rate: int, channels: int = 1, dtype: str = "<i2"
+    ) -> "AudioFrame":
+        """Views interleaved PCM bytes in place; a trailing partial frame is ignored."""
+        view = memoryview(data).cast("B")
+        frame_bytes = np.dtype(dtype).itemsize * channels
+        samples = np.frombuffer(view[: len(view) - len(view) % frame_bytes], dtype=dtype)
+        if channels > 1:
+            samples = samples.reshape(-1, channels)
+        return cls(samples, sample_rate)
+
+    @classmethod
+    def from_float(cls, audio: np.ndarray, sample_rate: int, out: Optional[np.ndarray] = None) -> "AudioFrame":
+        """Converts float model output to a 16-bit frame (see `float_to_int16`)."""
+        return cls(float_to_int16(audio, out), sample_rate)
+
+    @property
+    def channels(self) -> int:
+        return 1 if self.samples.ndim == 1 else self.samples.shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.samples.dtype
+
+    @property
+    def num_frames(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes
+
+    @property
+    def duration(self) -> float:
+        return self.num_frames / self.sample_rate
+
+    def view(self) -> memoryview:
+        """The raw sample bytes as a memoryview (copied only if the array is not contiguous)."""
+        return memoryview(np.ascontiguousarray(self.samples)).cast("B")
+
+    def to_float32(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converts to float32 in [-1, 1], writing into `out` (allocated if None)."""
+        if out is None:
+            out = np.empty(self.samples.shape, dtype=np.float32)
+        if self.dtype.kind == "f":
+            out[...] = self.samples
+            return out
+        # Scale in place after the cast, so there is no float64 temporary
+        out[...] = self.samples
+        out *= np.float32(1.0 / (1 << (8 * self.dtype.itemsize - 1)))
+        return out
+
+
+def wav_buffer(num_frames: int, sample_rate: int, channels: int = 1) -> Tuple[bytearray, np.ndarray]:
+    """
+    Allocates a complete 16-bit WAV file with an exact-size header, and returns it together with
+    an int16 view of its sample area for the caller to fill in place.
+    """
+    data_size = num_frames * channels * 2
+    buffer = bytearray(WAV_HEADER_SIZE + data_size)
+    buffer[:WAV_HEADER_SIZE] = create_wav_header(sample_rate, channels, 16, data_size)
+    samples = np.frombuffer(buffer, dtype="<i2", offset=WAV_HEADER_SIZE)
+    return buffer, samples.reshape(-1, channels) if channels > 1 else samples
+
+
+def write_wav(frame: AudioFrame) -> bytearray:
+    """
+    Encodes a 16-bit frame as a complete WAV file with an exact-size header.
+    The header and samples are written into one preallocated buffer, with a single copy of the audio.
+    """
+    buffer, samples = wav_buffer(frame.num_frames, frame.sample_rate, frame.channels)
+    samples[...] = frame.samples
+    return buffer
+
+
+def _overlaps(lengths: Sequence[int], crossfade: int) -> List[int]:
+    # A frame never gives more than half of itself to each neighbour
+    return [min(crossfade, a // 2, b // 2) for a, b in zip(lengths, lengths[1:])]
+
+
+def crossfade_length(frames: Sequence[AudioFrame], crossfade: int) -> int:
+    """Number of samples `crossfade_concat` produces for `frames`."""
+    lengths = [frame.num_frames for frame in frames]
+    return sum(lengths) - sum(_overlaps(lengths, crossfade))
+
+
+def crossfade_concat(frames: Sequence[AudioFrame], crossfade: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Joins 16-bit mono frames end to end, overlapping each pair by up to `crossfade` samples with
+    linear fades so the joins do not click. Samples are copied once into `out` (allocated if None,
+    else `crossfade_length` long); only the overlaps go through float32.
+    """
+    lengths = [frame.num_frames for frame in frames]
+    overlaps = _overlaps(lengths, crossfade)
+    if out is None:
+        out = np.empty(sum(lengths) - sum(overlaps), dtype=np.int16)
+
+    pos = 0
+    for i, frame in enumerate(frames):
+        samples = frame.samples
+        overlap = overlaps[i - 1] if i else 0
+        if overlap:
+            fade_in = np.linspace(0.0, 1.0, overlap + 2, dtype=np.float32)[1:-1]
+            tail = out[pos - overlap : pos].astype(np.float32)
+            tail += (samples[:overlap] - tail) * fade_in
+            out[pos - overlap : pos] = np.rint(tail)
+        out[pos : pos + lengths[i] - overlap] = samples[overlap:]
+        pos += lengths[i] - overlap
+    return out
+
+
+def resample_pcm16(pcm: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resamples mono int16 audio. Downsampling low-pass filters first (windowed sinc) so that
+    content above the new Nyquist frequency does not alias; the rate change itself is linear
+    interpolation. For audio that arrives in chunks, use a `Resampler`.
+    """
+    if orig_sr == target_sr or pcm.size == 0:
+        return pcm
+    resampler = Resampler(orig_sr, target_sr)
+    return np.concatenate([resampler.process(pcm), resampler.flush()])
+
+
+def resample_float32(samples: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """`resample_pcm16` for float32 signals, such as STT input in [-1, 1]."""
+    if orig_sr == target_sr or samples.size == 0:
+        return samples
+    resampler = Resampler(orig_sr, target_sr, dtype=np.float32)
+    return np.concatenate([resampler.process(samples), resampler.flush()])
+
+
+class Resampler:
+    """
+    `resample_pcm16` over a stream of chunks. The filter history and the interpolation phase
+    carry over between chunks, so the joined output equals resampling the whole signal at once:
+    no dips at chunk edges and no drift from rounding each chunk's length. Output lags the input
+    by half the filter length; `flush` returns the rest once the input has ended.
+
+    Output is `dtype`: int16 is rounded and clipped, float32 is returned as computed.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int, dtype: type = np.int16):
+        self.target_sr = target_sr
+        self.orig_sr = orig_sr
+        self.dtype = dtype
+        self.step = orig_sr / target_sr
+        self._kernel = _lowpass_kernel(orig_sr, target_sr) if target_sr < orig_sr else None
+        self._half = self._kernel.size // 2 if self._kernel is not None else 0
+        # Input not yet consumed, starting with the zeros the filter sees before the first sample
+        self._buffer = np.zeros(self._half, dtype=np.float32)
+        self._offset = -self._half  # Input index of _buffer[0]
+        self._received = 0
+        self._produced = 0
+
+    def process(self, pcm: np.ndarray) -> np.ndarray:
+        self._buffer = np.concatenate([self._buffer, pcm.astype(np.float32)])
+        self._received += pcm.size
+        # Filtered samples are final once the input reaches half a filter past them
+        ready = self._received - self._half
+        return self._emit(int(np.floor((ready - 1) / self.step)) + 1 if ready > 0 else 0)
+
+    def flush(self) -> np.ndarray:
+        self._buffer = np.concatenate([self._buffer, np.zeros(self._half, dtype=np.float32)])
+        total = int(round(self._received * self.target_sr / self.orig_sr))
+        return self._emit(total)
+
+    def _emit(self, end: int) -> np.ndarray:
+        if end <= self._produced:
+            return np.zeros(0, dtype=self.dtype)
+        samples = self._buffer
+        if self._kernel is not None:
+            samples = np.convolve(samples, self._kernel, mode="valid")
+        start = self._offset + self._half  # Input index of samples[0]
+        positions = np.arange(self._produced, end, dtype=np.float64) * self.step - start
+        # Positions past the last sample (only when flushing) hold it, like np.interp
+        out = np.interp(positions, np.arange(samples.size), samples)
+        self._produced = end
+
+        # Keep what the next output sample still needs
+        keep = int(self._produced * self.step) - self._half - self._offset
+        if keep > 0:
+            self._buffer = self._buffer[keep:]
+            self._offset += keep
+        if self.dtype != np.int16:
+            return out.astype(self.dtype)
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16)
+
+
+@lru_cache(maxsize=16)
+def _lowpass_kernel(orig_sr: int, target_sr: int) -> np.ndarray:
+    cutoff = 0.45 * target_sr / orig_sr  # cycles per input sample, just under the new Nyquist
+    taps = int(10 / cutoff) | 1
+    n = np.arange(taps) - taps // 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hanning(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
@@ -1,26 +1,361 @@
-import io
+import os
+import queue
+import struct
+import subprocess
+import tempfile
+import threading
+from typing import IO, List, NamedTuple, Optional, Union
 
-import pydub
+import numpy as np
 
+from src.utils.audio import AudioFrame, resample_float32
 
-def convert_audio_to_wav(audio_bytes: bytes, original_format: str) -> bytes:
-    """Converts audio from its original format to WAV (PCM, 16kHz, mono, 16-bit)."""
-    audio_segment = pydub.AudioSegment.from_file(io.BytesIO(audio_bytes), format=original_format)
+# Sample rate expected by the reazonspeech NeMo model.
+STT_SAMPLE_RATE = 16000
 
-    # Set frame rate, channels, and sample width for Nemo compatibility
-    audio_segment = audio_segment.set_frame_rate(16000)
-    audio_segment = audio_segment.set_channels(1)
-    audio_segment = audio_segment.set_sample_width(2)  # 16-bit
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
 
-    output_buffer = io.BytesIO()
-    audio_segment.export(output_buffer, format="wav")
-    return output_buffer.getvalue()
+BytesLike = Union[bytes, bytearray, memoryview]
 
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
 
-def get_audio_duration(audio_bytes: bytes, audio_format: str) -> float:
-    """Gets the duration of audio in seconds."""
-    audio_segment = pydub.AudioSegment.from_file(io.BytesIO(audio_bytes), format=audio_format)
-    return len(audio_segment) / 1000.0
+
+class WavData(NamedTuple):
+    pcm: memoryview  # View over the `data` chunk of the original buffer (no copy)
+    sample_rate: int
+    channels: int
+    bit_depth: int
+    audio_format: int
+
+
+def is_wav(audio: BytesLike) -> bool:
+    """Returns True if the buffer starts with a RIFF/WAVE header."""
+    view = memoryview(audio)
+    return len(view) >= 12 and view[0:4] == b"RIFF" and view[8:12] == b"WAVE"
+
+
+def _scan_wav_header(view: memoryview) -> Optional[tuple]:
+    """
+    Walks the RIFF chunks up to the `data` chunk header.
+    Returns (sample_rate, channels, bit_depth, audio_format, data_offset, data_size), or None if
+    the buffer ends before the data chunk header.
+    """
+    if not is_wav(view):
+        raise ValueError("Not a RIFF/WAVE buffer.")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset : offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+
+        if chunk_id == b"fmt ":
+            if body + 16 > len(view):
+                return None
+            audio_format, channels, sample_rate, _, _, bit_depth = struct.unpack_from("<HHIIHH", view, body)
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                if body + 26 > len(view):
+                    return None
+                # The real format tag is the first two bytes of the SubFormat GUID
+                (audio_format,) = struct.unpack_from("<H", view, body + 24)
+            fmt = (sample_rate, channels, bit_depth, audio_format)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk found before fmt chunk.")
+            return (*fmt, body, chunk_size)
+
+        # Chunks are word-aligned
+        offset = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+def parse_wav(audio: BytesLike) -> WavData:
+    """
+    Parses a RIFF/WAVE buffer without copying the sample data.
+
+    Streaming headers (data size 0 or 0xFFFFFFFF, as written by `create_wav_header`)
+    are accepted; the data chunk then extends to the end of the buffer.
+    """
+    view = memoryview(audio).cast("B")
+    header = _scan_wav_header(view)
+    if header is None:
+        raise ValueError("WAV buffer has no data chunk.")
+
+    sample_rate, channels, bit_depth, audio_format, body, chunk_size = header
+    if chunk_size in (0, 0xFFFFFFFF):
+        end = len(view)
+    else:
+        end = min(body + chunk_size, len(view))
+    return WavData(view[body:end], sample_rate, channels, bit_depth, audio_format)
+
+
+def pcm_to_float32(pcm: BytesLike, bit_depth: int = 16, audio_format: int = WAVE_FORMAT_PCM) -> np.ndarray:
+    """
+    Converts interleaved PCM bytes to float32 samples in [-1, 1].
+    The bytes are viewed in place with `np.frombuffer`; the only allocation is the float32 output.
+    """
+    view = memoryview(pcm).cast("B")
+    sample_bytes = bit_depth // 8
+    view = view[: len(view) - len(view) % sample_bytes]
+
+    if audio_format == WAVE_FORMAT_IEEE_FLOAT and bit_depth == 32:
+        return np.frombuffer(view, dtype="<f4").astype(np.float32)
+    if audio_format != WAVE_FORMAT_PCM:
+        raise ValueError(f"Unsupported WAV format tag: {audio_format:#x}")
+
+    if bit_depth == 16:
+        ints, scale = np.frombuffer(view, dtype="<i2"), 1.0 / 32768
+    elif bit_depth == 32:
+        ints, scale = np.frombuffer(view, dtype="<i4"), 1.0 / 2147483648
+    else:
+        raise ValueError(f"Unsupported PCM bit depth: {bit_depth}")
+
+    out = ints.astype(np.float32)
+    out *= np.float32(scale)  # in place, no float64 temporary
+    return out
+
+
+def load_pcm16k(audio: Union[BytesLike, AudioFrame]) -> np.ndarray:
+    """
+    Converts an `AudioFrame`, WAV bytes, or headerless 16 kHz 16-bit mono PCM into float32 mono
+    16 kHz samples ready to be fed to the STT model. No temporary files or subprocesses are involved.
+    Other rates are resampled with the anti-aliasing filter of `resample_pcm16`.
+    """
+    if isinstance(audio, AudioFrame):
+        samples = audio.to_float32()
+        if audio.channels > 1:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        return resample_float32(samples, audio.sample_rate, STT_SAMPLE_RATE)
+
+    if is_wav(audio):
+        wav = parse_wav(audio)
+        samples = pcm_to_float32(wav.pcm, wav.bit_depth, wav.audio_format)
+        if wav.channels > 1:
+            usable = samples.size - samples.size % wav.channels
+            samples = samples[:usable].reshape(-1, wav.channels).mean(axis=1, dtype=np.float32)
+        return resample_float32(samples, wav.sample_rate, STT_SAMPLE_RATE)
+
+    # Headerless input (e.g. orchestrator WebSocket frames) is raw 16 kHz s16le mono
+    return pcm_to_float32(audio, 16)
+
+
+def sniff_audio_format(data: BytesLike) -> Optional[str]:
+    """
+    Detects the container/codec from the leading magic bytes.
+    Returns one of AUDIO_FORMATS' keys, or None if the buffer is not recognised as audio.
+    """
+    head = bytes(memoryview(data)[:12])
+    if len(head) >= 12 and head[0:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[0:3] == b"ID3":
+        return "mp3"
+    if head[0:4] == b"OggS":
+        return "ogg"
+    if head[0:4] == b"fLaC":
+        return "flac"
+    if head[0:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        # ISO base media file (MP4/M4A, typically AAC inside)
+        return "mp4"
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        # MPEG frame sync; layer bits 00 mean an ADTS (AAC) stream instead of MPEG audio
+        return "aac" if head[1] & 0x06 == 0 else "mp3"
+    return None
+
+
+# Sniffed format -> ffmpeg demuxer
+AUDIO_FORMATS = {
+    "wav": "wav",
+    "mp3": "mp3",
+    "aac": "aac",
+    "ogg": "ogg",
+    "flac": "flac",
+    "webm": "matroska",
+    "mp4": "mp4",
+}
+
+
+class StreamingPCMDecoder:
+    """
+    Decodes an uploaded audio file (any format `sniff_audio_format` recognises) as it arrives.
+
+    File bytes go in through `feed`, float32 mono samples at `sample_rate` come out as soon as
+    they are decoded, so memory stays bounded by the chunk size rather than the file length.
+    PCM WAV at the target rate is converted in-process; other inputs are piped through one
+    long-running ffmpeg process whose output is drained by a reader thread. MP4 cannot be read
+    from a pipe, since its index may come after the audio: it is spooled to a temporary file and
+    decoded by `finish`.
+    """
+
+    HEADER_LIMIT = 1 << 16  # Give up on the WAV fast path if no data chunk shows up by then
+    READ_SIZE = 1 << 16
+
+    def __init__(self, sample_rate: int = STT_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.samples_out = 0
+        self._head = bytearray()  # Input buffered until the decode path is known
+        self._wav: Optional[tuple] = None  # (channels, bit_depth, audio_format) on the fast path
+        self._remaining: Optional[int] = None  # Data chunk bytes left; None means until EOF
+        self._carry = b""
+        self._ffmpeg: Optional[subprocess.Popen] = None
+        self._spool: Optional[IO[bytes]] = None
+        self._output: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stderr = bytearray()
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio decoded so far."""
+        return self.samples_out / self.sample_rate
+
+    @property
+    def _undecided(self) -> bool:
+        return self._wav is None and self._ffmpeg is None and self._spool is None
+
+    def feed(self, data: BytesLike) -> List[np.ndarray]:
+        """Consumes the next piece of the file and returns the samples decoded so far."""
+        if self._undecided:
+            self._head += data
+            if not self._choose_path(final=False):
+                return []
+            data, self._head = bytes(self._head), bytearray()
+        return self._decode(data)
+
+    def finish(self) -> List[np.ndarray]:
+        """Signals the end of the file and returns the remaining samples."""
+        chunks = []
+        if self._undecided:
+            self._choose_path(final=True)
+            data, self._head = bytes(self._head), bytearray()
+            chunks = self._decode(data)
+        if self._spool is not None:
+            self._spool.flush()
+            self._start_ffmpeg(AUDIO_FORMATS["mp4"], self._spool.name)
+        if self._ffmpeg is None:
+            return chunks
+
+        self._ffmpeg.stdin.close()
+        for thread in self._threads:
+            thread.join()
+        returncode = self._ffmpeg.wait()
+        if self._spool is not None:
+            self._spool.close()
+        chunks += self._drain()
+        if self._carry:
+            raise ValueError("ffmpeg produced a truncated sample.")
+        if returncode != 0:
+            raise ValueError(f"ffmpeg could not decode the audio: {self._stderr.decode(errors='replace').strip()}")
+        return chunks
+
+    def close(self):
+        """Stops ffmpeg if the stream is abandoned before `finish`."""
+        if self._ffmpeg is not None and self._ffmpeg.poll() is None:
+            self._ffmpeg.kill()
+            self._ffmpeg.wait()
+        if self._spool is not None:
+            self._spool.close()  # Deletes the file
+
+    def _choose_path(self, final: bool) -> bool:
+        audio_format = sniff_audio_format(self._head)
+        if audio_format is None:
+            if final or len(self._head) >= 12:
+                raise ValueError("Unrecognised audio format.")
+            return False
+
+        if audio_format == "wav":
+            header = _scan_wav_header(memoryview(self._head))
+            if header is None and not final and len(self._head) < self.HEADER_LIMIT:
+                return False
+            if header is None and final:
+                raise ValueError("WAV buffer has no data chunk.")
+            if header is not None:
+                sample_rate, channels, bit_depth, audio_format_tag, body, chunk_size = header
+                fast = sample_rate == self.sample_rate and (audio_format_tag, bit_depth) in (
+                    (WAVE_FORMAT_PCM, 16),
+                    (WAVE_FORMAT_PCM, 32),
+                    (WAVE_FORMAT_IEEE_FLOAT, 32),
+                )
+                if fast:
+                    self._wav = (channels, bit_depth, audio_format_tag)
+                    self._remaining = None if chunk_size in (0, 0xFFFFFFFF) else chunk_size
+                    del self._head[:body]
+                    return True
+
+        if audio_format == "mp4":
+            self._spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=".mp4")
+            return True
+
+        self._start_ffmpeg(AUDIO_FORMATS[audio_format])
+        return True
+
+    def _start_ffmpeg(self, demuxer: str, source: str = "pipe:0"):
+        command = [FFMPEG_BINARY, "-nostdin", "-hide_banner", "-loglevel", "error", "-f", demuxer, "-i", source]
+        command += ["-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(self.sample_rate), "pipe:1"]
+        try:
+            self._ffmpeg = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise RuntimeError(f"ffmpeg is required to decode {demuxer} audio but was not found.")
+
+        def read_stdout():
+            while chunk := self._ffmpeg.stdout.read1(self.READ_SIZE):
+                self._output.put(chunk)
+
+        def read_stderr():
+            self._stderr += self._ffmpeg.stderr.read()
+
+        # Both pipes are drained continuously so ffmpeg never blocks on a full pipe while we write
+        self._threads = [
+            threading.Thread(target=read_stdout, daemon=True),
+            threading.Thread(target=read_stderr, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _decode(self, data: BytesLike) -> List[np.ndarray]:
+        if self._spool is not None:
+            self._spool.write(data)
+            return []
+        if self._ffmpeg is not None:
+            try:
+                self._ffmpeg.stdin.write(data)
+            except BrokenPipeError:
+                pass  # ffmpeg exited; its error is reported by finish()
+            return self._drain()
+
+        if self._remaining is not None:
+            data = memoryview(data)[: self._remaining]
+            self._remaining -= len(data)
+        channels, bit_depth, audio_format = self._wav
+        return self._convert(bytes(data), bit_depth, audio_format, channels)
+
+    def _drain(self) -> List[np.ndarray]:
+        pieces = []
+        while True:
+            try:
+                pieces.append(self._output.get_nowait())
+            except queue.Empty:
+                break
+        return self._convert(b"".join(pieces), 16, WAVE_FORMAT_PCM, 1) if pieces else []
+
+    def _convert(self, data: bytes, bit_depth: int, audio_format: int, channels: int) -> List[np.ndarray]:
+        data = self._carry + data
+        block = channels * bit_depth // 8
+        usable = len(data) - len(data) % block
+        self._carry = data[usable:]
+        if not usable:
+            return []
+        samples = pcm_to_float32(memoryview(data)[:usable], bit_depth, audio_format)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+        self.samples_out += samples.size
+        return [samples]
 
 
 def chunk_audio(audio_bytes: bytes, chunk_size_ms: int = 1000) -> bytes:
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LRUCache(Generic[T]):
+    """
+    Thread-safe LRU cache bounded by the total size of its values rather than their count.
+    `sizeof` returns the number of bytes a value is accounted for.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[T], int] = len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: T):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self.nbytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+class DiskCache:
+    """
+    Directory-backed cache with one file per key that survives restarts.
+
+    Keys must be filename-safe (e.g. hex digests). Writes are atomic (temp file + rename), and
+    when `max_bytes` is set the least recently used files are deleted to stay within it.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        # LRU index of the files already on disk, oldest access first
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+        self.nbytes = sum(self._files.values())
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self._files
+
+    def touch(self, key: str):
+        """Marks a file as recently used; the mtime carries the LRU order across restarts."""
+        with self._lock:
+            if key not in self._files:
+                return
+            self._files.move_to_end(key)
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.contains(key):
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self.nbytes -= self._files.pop(key, 0)
+            return None
+        self.touch(key)
+        return data
+
+    def put(self, key: str, data: Any):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+        except OSError as e:
+            logger.warning(f"Could not write cache file {key}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+
+        size = memoryview(data).nbytes
+        evicted = []
+        with self._lock:
+            self.nbytes += size - self._files.pop(key, 0)
+            self._files[key] = size
+            while self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._files) > 1:
+                name, evicted_size = self._files.popitem(last=False)
+                self.nbytes -= evicted_size
+                evicted.append(name)
+        for name in evicted:
+            try:
+                os.unlink(self.path(name))
+            except OSError:
+                pass
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent async calls for the same key into one execution whose result is
+    shared by every caller. The shared call keeps running while any caller still waits for it,
+    and is cancelled once every caller has been cancelled, since nobody wants its result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def _forget(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            self._waiters[call] = 0
+            call.add_done_callback(lambda _: self._forget(key, call))
+        self._waiters[call] += 1
+        try:
+            return await asyncio.shield(call)
+        finally:
+            self._waiters[call] -= 1
+            if not self._waiters[call]:
+                del self._waiters[call]
+                if not call.done():
+                    # The last caller was cancelled; later callers start a new call
+                    self._forget(key, call)
+                    call.cancel()
@@ -0,0 +1,279 @@
+import logging
+import os
+import struct
+import zlib
+from typing import List, Optional, Union
+
+import numpy as np
+from backend.src.utils.audio import AudioFrame, Resampler, create_wav_header, resample_pcm16, write_wav
+
+logger = logging.getLogger(__name__)
+
+# Conditional import: Opus output needs opuslib and the libopus shared library
+try:
+    import opuslib
+except (ImportError, OSError):
+    opuslib = None
+
+OUTPUT_FORMATS = ("wav", "pcm", "mulaw", "opus")
+
+MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "pcm": "audio/L16",
+    "mulaw": "audio/basic",
+    "opus": "audio/ogg; codecs=opus",
+}
+
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_FRAME_MS = 20
+OPUS_BITRATE = int(os.getenv("TTS_OPUS_BITRATE", "32000"))
+
+# Encoded chunks are handed to the transport as-is; PCM and WAV data are views of the samples
+Chunk = Union[bytes, bytearray, memoryview]
+
+
+def _build_mulaw_table() -> np.ndarray:
+    """
+    G.711 μ-law code for every int16 value, indexed by the value's uint16 bit pattern.
+    Follows the Sun reference encoder (g711.c), which works on 14-bit magnitudes.
+    """
+    values = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(values < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(values), 8159) + 0x21
+    segment = np.maximum(np.floor(np.log2(magnitude)).astype(np.int32) - 5, 0)
+    code = (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    code[segment >= 8] = 0x7F  # Clipped to full scale
+    return (code ^ mask).astype(np.uint8)
+
+
+_MULAW_TABLE = _build_mulaw_table()
+
+
+def encode_mulaw(pcm: np.ndarray) -> memoryview:
+    """Encodes int16 samples as 8-bit G.711 μ-law."""
+    return memoryview(_MULAW_TABLE[pcm.astype(np.int16, copy=False).view(np.uint16)])
+
+
+# Each byte with its bits in reverse order, for bytes.translate
+_BIT_REVERSED = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+
+def ogg_crc(data: bytes) -> int:
+    """
+    The Ogg page checksum: CRC-32 with polynomial 0x04C11DB7, MSB first, initial value 0 and no
+    final XOR. zlib computes the bit-reflected form of the same polynomial, so the input bytes
+    are bit-reversed on the way in and the result on the way out; seeding with 0xFFFFFFFF and
+    XORing the result cancel zlib's own initial value and final XOR.
+    """
+    reflected = zlib.crc32(data.translate(_BIT_REVERSED), 0xFFFFFFFF) ^ 0xFFFFFFFF
+    return int(f"{reflected:032b}"[::-1], 2)
+
+
+class OggWriter:
+    """Packs packets into Ogg pages (RFC 3533) for one logical stream."""
+
+    def __init__(self, serial: int):
+        self.serial = serial
+        self.sequence = 0
+
+    def page(self, packets: List[bytes], granule: int, first: bool = False, last: bool = False) -> bytes:
+        """Writes complete packets as one or more pages; `granule` is the position after the last packet."""
+        pages = []
+        current: List[bytes] = []
+        lacing = 0
+        for packet in packets:
+            needed = len(packet) // 255 + 1
+            if current and lacing + needed > 255:
+                # Packets never span pages here, so earlier pages carry no granule position (-1)
+                pages.append(self._page(current, -1, first and not pages, False))
+                current, lacing = [], 0
+            current.append(packet)
+            lacing += needed
+        pages.append(self._page(current, granule, first and not pages, last))
+        return b"".join(pages)
+
+    def _page(self, packets: List[bytes], granule: int, first: bool, last: bool) -> bytes:
+        segments = bytearray()
+        for packet in packets:
+            segments += b"\xff" * (len(packet) // 255) + bytes([len(packet) % 255])
+        header_type = (0x02 if first else 0) | (0x04 if last else 0)
+        header = struct.pack(
+            "<4sBBqIIIB", b"OggS", 0, header_type, granule, self.serial, self.sequence, 0, len(segments)
+        )
+        body = header + bytes(segments) + b"".join(packets)
+        self.sequence += 1
+        crc = ogg_crc(body)
+        return body[:22] + struct.pack("<I", crc) + body[26:]
+
+
+class StreamEncoder:
+    """
+    Encodes 16-bit mono `AudioFrame` segments into an output format as they are synthesized.
+
+    `start` returns the container header, `encode` the bytes for one segment, and `finish` any
+    trailing bytes. Each call returns a self-contained chunk that can be sent immediately.
+    """
+
+    media_type = "application/octet-stream"
+    default_sample_rate: Optional[int] = None  # None keeps the model's rate
+
+    def __init__(self, sample_rate: Optional[int] = None):
+        self.sample_rate = sample_rate or self.default_sample_rate
+        self.input_rate: Optional[int] = None
+        self._resampler: Optional[Resampler] = None
+
+    def start(self, input_rate: int) -> bytes:
+        self.input_rate = input_rate
+        self.sample_rate = self.sample_rate or input_rate
+        if self.sample_rate != input_rate:
+            # One resampler for the whole stream, so segment boundaries are seamless
+            self._resampler = Resampler(input_rate, self.sample_rate)
+        return b""
+
+    def _convert(self, frame: AudioFrame) -> np.ndarray:
+        return self._resampler.process(frame.samples) if self._resampler else frame.samples
+
+    def _flush(self) -> np.ndarray:
+        """The resampled samples still held back by `_convert` at the end of the stream."""
+        return self._resampler.flush() if self._resampler else np.zeros(0, dtype=np.int16)
+
+    def encode(self, frame: AudioFrame) -> Chunk:
+        raise NotImplementedError
+
+    def finish(self) -> Chunk:
+        return b""
+
+    def encode_all(self, frame: AudioFrame) -> Chunk:
+        """Encodes a complete (non-streamed) clip."""
+        return b"".join((self.start(frame.sample_rate), self.encode(frame), self.finish()))
+
+
+class PCMEncoder(StreamEncoder):
+    """Headerless s16le."""
+
+    media_type = MEDIA_TYPES["pcm"]
+
+    def encode(self, frame: AudioFrame) -> Chunk:
+        if self.sample_rate == self.input_rate:
+            return frame.view()
+        return AudioFrame(self._convert(frame), self.sample_rate).view()
+
+    def finish(self) -> Chunk:
+        return AudioFrame(self._flush(), self.sample_rate).view()
+
+
+class WavEncoder(PCMEncoder):
+    media_type = MEDIA_TYPES["wav"]
+
+    def start(self, input_rate: int) -> bytes:
+        super().start(input_rate)
+        # Unknown length while streaming
+        return create_wav_header(sample_rate=self.sample_rate, channels=1, bit_depth=16, data_size=0xFFFFFFFF)
+
+    def encode_all(self, frame: AudioFrame) -> Chunk:
+        self.start(frame.sample_rate)
+        if self.sample_rate != self.input_rate:
+            frame = AudioFrame(resample_pcm16(frame.samples, self.input_rate, self.sample_rate), self.sample_rate)
+        return memoryview(write_wav(frame))
+
+
+class MulawEncoder(StreamEncoder):
+    """Headerless G.711 μ-law, 8 kHz unless another rate is requested (telephony)."""
+
+    media_type = MEDIA_TYPES["mulaw"]
+    default_sample_rate = 8000
+
+    def encode(self, frame: AudioFrame) -> Chunk:
+        return encode_mulaw(self._convert(frame))
+
+    def finish(self) -> Chunk:
+        return encode_mulaw(self._flush())
+
+
+class OpusEncoder(StreamEncoder):
+    """
+    Ogg Opus (RFC 7845). The header pages are returned by `start`, and every segment is
+    flushed as complete pages, so a client can decode each chunk as soon as it arrives.
+    Samples that do not fill a 20 ms frame are carried over to the next segment, and the last
+    frame is zero-padded; the end-of-stream granule position lets decoders trim the padding.
+    """
+
+    media_type = MEDIA_TYPES["opus"]
+    default_sample_rate = 48000
+
+    def __init__(self, sample_rate: Optional[int] = None, bitrate: int = OPUS_BITRATE):
+        check_output_format("opus", sample_rate)
+        super().__init__(sample_rate)
+        self.bitrate = bitrate
+        self._ogg = OggWriter(serial=int.from_bytes(os.urandom(4), "little"))
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._samples = 0  # Real (unpadded) samples encoded, in 48 kHz units
+        self._granule = 0
+
+    def start(self, input_rate: int) -> bytes:
+        super().start(input_rate)
+        self._encoder = opuslib.Encoder(self.sample_rate, 1, "voip")
+        self._encoder.bitrate = self.bitrate
+        self._frame = self.sample_rate * OPUS_FRAME_MS // 1000
+        self._scale = 48000 // self.sample_rate  # Granule positions are always in 48 kHz samples
+        self._pre_skip = self._encoder.lookahead * self._scale
+        self._granule = self._pre_skip
+
+        head = struct.pack("<8sBBHIhB", b"OpusHead", 1, 1, self._pre_skip, self.sample_rate, 0, 0)
+        vendor = b"voice-backend"
+        tags = b"OpusTags" + struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", 0)
+        return self._ogg.page([head], 0, first=True) + self._ogg.page([tags], 0)
+
+    def _encode_frames(self, samples: np.ndarray) -> List[bytes]:
+        packets = []
+        for offset in range(0, samples.size, self._frame):
+            packets.append(self._encoder.encode(samples[offset : offset + self._frame].tobytes(), self._frame))
+            self._granule += self._frame * self._scale
+        return packets
+
+    def encode(self, frame: AudioFrame) -> Chunk:
+        samples = np.concatenate([self._pending, self._convert(frame)])
+        usable = samples.size - samples.size % self._frame
+        self._pending = samples[usable:]
+        self._samples += usable * self._scale
+        packets = self._encode_frames(samples[:usable])
+        return self._ogg.page(packets, self._granule) if packets else b""
+
+    def finish(self) -> Chunk:
+        samples = np.concatenate([self._pending, self._flush()])
+        full = samples.size - samples.size % self._frame
+        self._samples += samples.size * self._scale
+        self._pending = samples[full:]
+        packets = self._encode_frames(samples[:full])
+        padded = np.zeros(self._frame, dtype=np.int16)
+        padded[: self._pending.size] = self._pending
+        self._pending = np.zeros(0, dtype=np.int16)
+        packets += self._encode_frames(padded)
+        # The final granule position marks where the real audio ends, so the padding is trimmed
+        self._granule = self._pre_skip + self._samples
+        return self._ogg.page(packets, self._granule, last=True)
+
+
+_ENCODERS = {
+    "wav": WavEncoder,
+    "pcm": PCMEncoder,
+    "mulaw": MulawEncoder,
+    "opus": OpusEncoder,
+}
+
+
+def check_output_format(output_format: str, sample_rate: Optional[int] = None):
+    """Raises ValueError if this server cannot produce the requested format."""
+    if output_format not in _ENCODERS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if output_format == "opus":
+        if opuslib is None:
+            raise ValueError("Opus output is not available on this server (opuslib is not installed).")
+        if sample_rate and sample_rate not in OPUS_SAMPLE_RATES:
+            raise ValueError(f"Opus supports sample rates {OPUS_SAMPLE_RATES}, got {sample_rate}")
+
+
+def create_encoder(output_format: str = "wav", sample_rate: Optional[int] = None) -> StreamEncoder:
+    """Returns a fresh encoder; raises ValueError for unknown formats or unsupported rates."""
+    check_output_format(output_format, sample_rate)
+    return _ENCODERS[output_format](sample_rate)
@@ -33,3 +33,33 @@ def test_websocket_orchestrator():
             # Receive audio chunk
             resp = websocket.receive_bytes()
             assert resp == b"audio_chunk"
+
+def test_websocket_orchestrator_server_vad():
+    import numpy as np
+
+    received = []
+
+    with patch("src.api.v1.endpoints.orchestrator.orchestrator") as mock_orchestrator:
+        async def mock_process(audio_bytes, session):
+            received.append(audio_bytes)
+            yield {"type": "processing_start", "payload": {"transcript": "input"}}
+
+        mock_orchestrator.process_audio_turn = mock_process
+
+        t = np.arange(8000) / 16000
+        speech = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16).tobytes()
+        silence = bytes(16000 * 2)
+
+        with client.websocket_connect("/api/v1/orchestrator/ws?api_key=test_key") as websocket:
+            websocket.send_json({"type": "config", "payload": {"server_vad": True, "vad_hangover_ms": 300}})
+
+            # Fragmented upload: many small frames must not start a turn each
+            for i in range(0, len(speech), 640):
+                websocket.send_bytes(speech[i : i + 640])
+            assert websocket.receive_json()["type"] == "speech_start"
+
+            websocket.send_bytes(silence)
+            assert websocket.receive_json()["type"] == "processing_start"
+
+    assert len(received) == 1
+    assert received[0].nbytes >= len(speech)
@@ -1,7 +1,8 @@
 import asyncio
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from backend.src.core.tts.scheduler import Priority
 
 from src.core.orchestrator.processor import VoiceOrchestrator
 from src.core.orchestrator.session import SessionContext
@@ -11,7 +12,7 @@ from src.core.orchestrator.session import SessionContext
 async def test_voice_orchestrator_process_turn():
     # Mock services
     mock_stt = MagicMock()
-    mock_stt.transcribe.return_value = "こんにちは"
+    mock_stt.transcribe = AsyncMock(return_value="こんにちは")
     
     mock_llm = MagicMock()
     async def mock_stream_llm(*args, **kwargs):
@@ -47,7 +48,7 @@ async def test_voice_orchestrator_process_turn():
 @pytest.mark.asyncio
 async def test_voice_orchestrator_cancellation():
     mock_stt = MagicMock()
-    mock_stt.transcribe.return_value = "こんにちは"
+    mock_stt.transcribe = AsyncMock(return_value="こんにちは")
     
     mock_llm = MagicMock()
     async def mock_stream_llm(*args, **kwargs):
@@ -70,3 +71,33 @@ async def test_voice_orchestrator_cancellation():
         pass # Expected
 
 
+
+
+@pytest.mark.asyncio
+async def test_only_first_sentence_is_scheduled_as_interactive_first():
+    mock_stt = MagicMock()
+    mock_stt.transcribe = AsyncMock(return_value="こんにちは")
+
+    mock_llm = MagicMock()
+    async def mock_stream_llm(*args, **kwargs):
+        for token in ["はい。", "承知", "しました。", "どうぞ"]:
+            yield token
+    mock_llm.stream_chat_completion = mock_stream_llm
+
+    calls = []
+    mock_tts = MagicMock()
+    async def mock_stream_tts(request, priority, session):
+        calls.append((request.text, priority, session))
+        yield b"audio"
+    mock_tts.synthesize_stream = mock_stream_tts
+
+    orchestrator = VoiceOrchestrator(stt_service=mock_stt, llm_service=mock_llm, tts_service=mock_tts)
+    session = SessionContext()
+    async for _ in orchestrator.process_audio_turn(b"audio", session):
+        pass
+
+    assert [(text, priority) for text, priority, _ in calls] == [
+        ("はい。", Priority.INTERACTIVE_FIRST),
+        ("承知しました。どうぞ", Priority.INTERACTIVE),
+    ]
+    assert all(s == session.session_id for _, _, s in calls)
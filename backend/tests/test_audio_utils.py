@@ -0,0 +1,258 @@
+import io
+import os
+import subprocess
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.utils import audio_utils
+from src.utils.audio import (
+    AudioFrame,
+    create_wav_header,
+    crossfade_concat,
+    crossfade_length,
+    float_to_int16,
+    wav_buffer,
+    write_wav,
+)
+from src.utils.audio_utils import (
+    STT_SAMPLE_RATE,
+    StreamingPCMDecoder,
+    is_wav,
+    load_pcm16k,
+    parse_wav,
+    sniff_audio_format,
+)
+
+
+def make_pcm(n_samples=1600):
+    return (np.arange(n_samples, dtype=np.int16) % 200 - 100).astype(np.int16)
+
+
+def test_parse_wav_is_zero_copy():
+    pcm = make_pcm()
+    wav_bytes = create_wav_header(STT_SAMPLE_RATE, data_size=pcm.nbytes) + pcm.tobytes()
+
+    wav = parse_wav(wav_bytes)
+
+    assert wav.sample_rate == STT_SAMPLE_RATE
+    assert wav.channels == 1
+    assert wav.bit_depth == 16
+    assert wav.pcm.obj is wav_bytes  # view over the original buffer
+    assert np.array_equal(np.frombuffer(wav.pcm, dtype="<i2"), pcm)
+
+
+def test_load_pcm16k_wav_and_raw_pcm_match():
+    pcm = make_pcm()
+    wav_bytes = create_wav_header(STT_SAMPLE_RATE, data_size=pcm.nbytes) + pcm.tobytes()
+
+    from_wav = load_pcm16k(wav_bytes)
+    from_raw = load_pcm16k(pcm.tobytes())
+
+    assert from_wav.dtype == np.float32
+    assert np.allclose(from_wav, pcm / 32768)
+    assert np.array_equal(from_wav, from_raw)
+
+
+def test_load_pcm16k_streaming_header():
+    pcm = make_pcm()
+    wav_bytes = create_wav_header(STT_SAMPLE_RATE) + pcm.tobytes()  # data size 0xFFFFFFFF
+
+    assert load_pcm16k(wav_bytes).size == pcm.size
+
+
+def test_load_pcm16k_downmixes_and_resamples():
+    sr = 48000
+    stereo = np.zeros((sr, 2), dtype=np.float32)
+    stereo[:, 0] = 0.5
+    buffer = io.BytesIO()
+    sf.write(buffer, stereo, sr, format="WAV", subtype="PCM_16")
+
+    samples = load_pcm16k(buffer.getvalue())
+
+    assert samples.size == STT_SAMPLE_RATE
+    assert np.allclose(samples[100:-100], 0.25, atol=1e-3)  # The filter fades in/out at the edges
+
+
+def test_load_pcm16k_filters_before_downsampling():
+    sr = 48000
+    t = np.arange(sr) / sr
+    above_nyquist = (np.sin(2 * np.pi * 10000 * t) * 16000).astype(np.int16)  # Would alias to 6 kHz
+    wav_bytes = create_wav_header(sr, data_size=above_nyquist.nbytes) + above_nyquist.tobytes()
+
+    assert np.abs(load_pcm16k(wav_bytes)[100:-100]).max() < 0.01
+
+
+def test_parse_wav_rejects_non_wav():
+    assert not is_wav(b"ID3\x03\x00")
+    with pytest.raises(ValueError):
+        parse_wav(b"not a wav file at all")
+
+
+@pytest.mark.parametrize(
+    "head, expected",
+    [
+        (b"RIFF\x24\x00\x00\x00WAVEfmt ", "wav"),
+        (b"ID3\x04\x00\x00", "mp3"),
+        (b"\xff\xfb\x90\x64", "mp3"),
+        (b"\xff\xf1\x50\x80", "aac"),
+        (b"OggS\x00\x02", "ogg"),
+        (b"fLaC\x00\x00", "flac"),
+        (b"\x1a\x45\xdf\xa3\x01", "webm"),
+        (b"\x00\x00\x00\x20ftypM4A ", "mp4"),
+        (b"dummy_data", None),
+        (b"", None),
+    ],
+)
+def test_sniff_audio_format(head, expected):
+    assert sniff_audio_format(head) == expected
+
+
+def decode(data, chunk_size=4096):
+    decoder = StreamingPCMDecoder()
+    chunks = []
+    for offset in range(0, len(data), chunk_size):
+        chunks += decoder.feed(data[offset : offset + chunk_size])
+    chunks += decoder.finish()
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32), decoder
+
+
+def test_streaming_decoder_16k_wav_never_spawns_ffmpeg(monkeypatch):
+    monkeypatch.setattr(subprocess, "Popen", lambda *args, **kwargs: pytest.fail("ffmpeg was spawned"))
+    pcm = make_pcm(STT_SAMPLE_RATE // 2)
+    wav_bytes = create_wav_header(STT_SAMPLE_RATE, data_size=pcm.nbytes) + pcm.tobytes()
+
+    samples, decoder = decode(wav_bytes)
+
+    assert decoder.duration == 0.5
+    assert np.array_equal(samples, load_pcm16k(pcm.tobytes()))
+
+
+def test_streaming_decoder_other_formats_use_one_ffmpeg_pass(tmp_path, monkeypatch):
+    # Stand-in for ffmpeg that records its arguments and outputs no audio
+    args_file = tmp_path / "args"
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text(f'#!/bin/sh\necho "$@" >> {args_file}\ncat > /dev/null\n')
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setattr(audio_utils, "FFMPEG_BINARY", str(fake_ffmpeg))
+    stereo_44k = io.BytesIO()
+    sf.write(stereo_44k, np.zeros((441, 2), dtype=np.float32), 44100, format="WAV", subtype="PCM_16")
+
+    for data in (b"ID3\x04" + bytes(64), stereo_44k.getvalue()):
+        decode(data)
+
+    calls = [line.split() for line in args_file.read_text().splitlines()]
+    assert [call[call.index("-f") + 1] for call in calls] == ["mp3", "wav"]
+    assert all(call[call.index("-ar") + 1] == str(STT_SAMPLE_RATE) for call in calls)
+
+
+def test_streaming_decoder_reads_wav_data_chunk_only():
+    pcm = make_pcm(4000)
+    # Trailing chunk after the data chunk must not leak into the samples
+    wav_bytes = create_wav_header(STT_SAMPLE_RATE, data_size=pcm.nbytes) + pcm.tobytes() + b"LIST\x04\x00\x00\x00abcd"
+
+    samples, decoder = decode(wav_bytes, chunk_size=333)
+
+    np.testing.assert_array_equal(samples, load_pcm16k(pcm.tobytes()))
+    assert decoder.duration == pcm.size / STT_SAMPLE_RATE
+
+
+def test_streaming_decoder_pipes_other_formats_through_ffmpeg(tmp_path, monkeypatch):
+    # Stand-in for ffmpeg that echoes its input back as "decoded" PCM
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text("#!/bin/sh\nexec cat\n")
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setattr(audio_utils, "FFMPEG_BINARY", str(fake_ffmpeg))
+    data = b"ID3\x04" + make_pcm(50000).tobytes()
+
+    samples, _ = decode(data)
+
+    np.testing.assert_array_equal(samples, load_pcm16k(data))
+
+
+def test_streaming_decoder_hands_mp4_to_ffmpeg_as_a_file(tmp_path, monkeypatch):
+    # Stand-in for ffmpeg that "decodes" the file named after -i, skipping the 8-byte box header
+    args_file = tmp_path / "args"
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text(
+        f'#!/bin/sh\necho "$@" > {args_file}\n'
+        'while [ "$1" != "-i" ]; do shift; done\n'
+        'tail -c +9 "$2"\n'
+    )
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setattr(audio_utils, "FFMPEG_BINARY", str(fake_ffmpeg))
+    pcm = make_pcm(20000)
+    data = b"\x00\x00\x00\x08ftyp" + pcm.tobytes()
+
+    samples, decoder = decode(data)
+
+    np.testing.assert_array_equal(samples, load_pcm16k(pcm.tobytes()))
+    args = args_file.read_text().split()
+    assert args[args.index("-f") + 1] == "mp4"
+    source = args[args.index("-i") + 1]
+    assert source != "pipe:0"
+    assert not os.path.exists(source)  # The spooled upload is deleted
+
+
+def test_streaming_decoder_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        StreamingPCMDecoder().feed(b"dummy_data_not_audio")
+
+
+def test_audio_frame_views_buffer_without_copying():
+    data = bytearray(make_pcm(8).tobytes() + b"\x01")  # trailing partial sample is ignored
+
+    frame = AudioFrame.from_buffer(data, STT_SAMPLE_RATE)
+
+    assert frame.num_frames == 8
+    assert np.shares_memory(frame.samples, np.frombuffer(data, dtype=np.uint8))
+    assert bytes(frame.view()) == bytes(data[:16])
+    assert AudioFrame.from_buffer(data[:16], 8000, channels=2).samples.shape == (4, 2)
+
+
+def test_float_to_int16_writes_into_preallocated_buffer():
+    audio = np.array([0.0, 0.5, -0.5, 1.5, -2.0], dtype=np.float32)
+    out = np.empty(8, dtype=np.int16)
+
+    result = float_to_int16(audio, out[2:7])
+
+    assert np.shares_memory(result, out)
+    # Same values as np.clip(...) * 32767 then astype(np.int16)
+    assert out[2:7].tolist() == [0, 16383, -16383, 32767, -32767]
+    assert float_to_int16(np.array([0.25, -0.5]), normalize=True).tolist() == [16383, -32767]
+
+
+def test_write_wav_has_exact_header_and_round_trips():
+    pcm = make_pcm()
+    wav = write_wav(AudioFrame(pcm, 22050))
+
+    parsed = parse_wav(wav)
+
+    assert len(wav) == 44 + pcm.nbytes
+    assert parsed.sample_rate == 22050
+    assert np.array_equal(np.frombuffer(parsed.pcm, dtype=np.int16), pcm)
+
+
+def test_load_pcm16k_accepts_audio_frames():
+    frame = AudioFrame(np.full(800, 16384, dtype=np.int16), 8000)
+
+    samples = load_pcm16k(frame)
+
+    assert samples.dtype == np.float32 and samples.size == 1600
+    assert np.allclose(samples, 0.5)
+
+
+def test_crossfade_concat_overlaps_neighbours_into_preallocated_buffer():
+    frames = [AudioFrame(np.full(n, value, dtype=np.int16), 16000) for n, value in ((10, 1000), (4, -1000))]
+    buffer, samples = wav_buffer(crossfade_length(frames, 3), 16000)
+
+    crossfade_concat(frames, 3, out=samples)
+
+    # The overlap is capped at half of the shorter frame
+    assert samples.size == 12 and len(buffer) == 44 + 24
+    assert samples[:8].tolist() == [1000] * 8
+    assert samples[8:10].tolist() == [333, -333]  # linear fade over the 2 overlapping samples
+    assert samples[10:].tolist() == [-1000, -1000]
+    assert parse_wav(buffer).sample_rate == 16000
+    assert crossfade_concat(frames, 0).tolist() == [1000] * 10 + [-1000] * 4
@@ -0,0 +1,85 @@
+import asyncio
+import os
+
+import pytest
+
+from src.utils.cache import DiskCache, LRUCache, SingleFlight
+
+
+def test_lru_cache_evicts_least_recently_used_within_byte_budget():
+    cache = LRUCache(max_bytes=10)
+    cache.put("a", b"xxxx")
+    cache.put("b", b"xxxx")
+    assert cache.get("a") == b"xxxx"  # "b" becomes the oldest
+
+    cache.put("c", b"xxxx")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"xxxx"
+    assert cache.nbytes == 8
+    assert cache.evictions == 1
+    cache.put("huge", b"x" * 11)  # larger than the whole budget: not cached
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_disk_cache_survives_restart_and_respects_budget(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=8)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+
+    reopened = DiskCache(str(tmp_path), max_bytes=8)
+    assert reopened.get("a") == b"1234"
+    assert reopened.nbytes == 8
+
+    reopened.put("c", b"90ab")  # "b" is least recently used
+
+    assert reopened.get("b") is None
+    assert sorted(os.listdir(tmp_path)) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    flight = SingleFlight()
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert "key" not in flight
+    assert await flight.do("key", work) == "result"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_the_call_once_every_caller_is_cancelled():
+    started, cancelled = asyncio.Event(), []
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    flight = SingleFlight()
+    callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+    await started.wait()
+
+    callers[0].cancel()
+    await asyncio.sleep(0)
+    assert not cancelled and "key" in flight  # one caller still waits
+
+    callers[1].cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert cancelled == [True]
+    assert "key" not in flight
@@ -0,0 +1,144 @@
+import struct
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.models.tts import TTSRequest
+from backend.src.utils import codecs
+from backend.src.utils.audio import AudioFrame
+from backend.src.utils.codecs import OggWriter, Resampler, create_encoder, encode_mulaw, ogg_crc, resample_pcm16
+
+
+def parse_ogg(data: bytes):
+    """Returns (header_type, granule, sequence, packets) per page, checking each CRC."""
+    pages, offset = [], 0
+    while offset < len(data):
+        assert data[offset : offset + 4] == b"OggS"
+        _, header_type, granule, _, sequence, crc, count = struct.unpack_from("<BBqIIIB", data, offset + 4)
+        lacing = data[offset + 27 : offset + 27 + count]
+        body_start = offset + 27 + count
+        size = sum(lacing)
+        page = data[offset : body_start + size]
+        assert ogg_crc(page[:22] + b"\0\0\0\0" + page[26:]) == crc
+
+        packets, current, position = [], 0, body_start
+        for value in lacing:
+            current += value
+            if value < 255:
+                packets.append(data[position : position + current])
+                position += current
+                current = 0
+        pages.append((header_type, granule, sequence, packets))
+        offset = body_start + size
+    return pages
+
+
+def test_mulaw_matches_g711_reference():
+    pcm = np.array([0, 1000, -1000, 32767, -32768], dtype=np.int16)
+    assert encode_mulaw(pcm) == bytes.fromhex("ffce4e8000")
+
+
+def test_downsampling_filters_above_new_nyquist():
+    t = np.arange(44100) / 44100
+    speech_band = (np.sin(2 * np.pi * 1000 * t) * 10000).astype(np.int16)
+    above_nyquist = (np.sin(2 * np.pi * 6000 * t) * 10000).astype(np.int16)
+
+    assert resample_pcm16(speech_band, 44100, 8000).size == 8000
+    assert np.abs(resample_pcm16(speech_band, 44100, 8000)[100:-100]).max() > 9000
+    assert np.abs(resample_pcm16(above_nyquist, 44100, 8000)[100:-100]).max() < 100
+
+
+@pytest.mark.parametrize("orig_sr, target_sr", [(44100, 8000), (22050, 16000), (24000, 48000)])
+def test_chunked_resampling_matches_one_pass(orig_sr, target_sr):
+    pcm = (np.random.default_rng(0).standard_normal(20011) * 3000).astype(np.int16)
+    resampler = Resampler(orig_sr, target_sr)
+
+    chunks = [resampler.process(chunk) for chunk in np.split(pcm, [1, 441, 442, 5000, 9999])]
+    streamed = np.concatenate(chunks + [resampler.flush()])
+
+    np.testing.assert_array_equal(streamed, resample_pcm16(pcm, orig_sr, target_sr))
+
+
+def test_ogg_pages_split_at_255_lacing_values():
+    assert ogg_crc(b"123456789") == 0x89A1897F
+    writer = OggWriter(serial=7)
+    packets = [bytes([i % 256]) * 100 for i in range(300)]
+
+    pages = parse_ogg(writer.page([b"head"], 0, first=True) + writer.page(packets, 48000, last=True))
+
+    assert [p[0] for p in pages] == [0x02, 0, 0x04]
+    assert [p[2] for p in pages] == [0, 1, 2]
+    assert pages[1][1] == -1 and pages[2][1] == 48000
+    assert pages[1][3] + pages[2][3] == packets
+
+
+def test_opus_stream_framing(monkeypatch):
+    class FakeEncoder:
+        lookahead = 156
+
+        def __init__(self, fs, channels, application):
+            self.fs = fs
+
+        def encode(self, pcm, frame_size):
+            assert len(pcm) == frame_size * 2
+            return b"\xfc" + bytes(3)
+
+    monkeypatch.setattr(codecs, "opuslib", SimpleNamespace(Encoder=FakeEncoder))
+    encoder = create_encoder("opus", sample_rate=24000)
+
+    header = encoder.start(24000)
+    first = encoder.encode(AudioFrame(np.zeros(24000 * 30 // 1000, dtype=np.int16), 24000))  # 30 ms
+    tail = encoder.finish()
+    pages = parse_ogg(header + first + tail)
+
+    head = pages[0][3][0]
+    assert head.startswith(b"OpusHead") and pages[0][0] == 0x02
+    pre_skip = struct.unpack_from("<H", head, 10)[0]
+    assert pre_skip == 156 * 2  # in 48 kHz samples
+    assert pages[1][3][0].startswith(b"OpusTags")
+    assert len(pages[2][3]) == 1  # one full 20 ms frame; 10 ms carried over
+    assert pages[3][0] == 0x04 and pages[3][1] == pre_skip + 30 * 48  # padding trimmed by granule
+
+
+def test_unavailable_or_unknown_formats_are_rejected(monkeypatch):
+    monkeypatch.setattr(codecs, "opuslib", None)
+    with pytest.raises(ValueError):
+        create_encoder("opus")
+    with pytest.raises(ValueError):
+        create_encoder("flac")
+
+
+@pytest.mark.asyncio
+async def test_stream_mulaw_resampled_as_one_signal():
+    model = MagicMock()
+    model.infer.return_value = (16000, np.full(1600, 1000, dtype=np.int16))
+    manager = MagicMock()
+    manager.load_model.return_value = model
+    synth = Synthesizer(manager, cache=SegmentCache(max_bytes=0))
+
+    request = TTSRequest(text="こんにちは。ありがとうございます。", stream=True, output_format="mulaw")
+    chunks = [chunk async for chunk in synth.synthesize_stream(request)]
+
+    # Headerless, one chunk per segment plus the samples the filter held back
+    assert len(chunks) == 3
+    assert sum(len(chunk) for chunk in chunks) == 1600  # 2 x 100 ms at 8 kHz, one byte per sample
+    assert b"".join(chunks) == bytes(encode_mulaw(resample_pcm16(np.full(3200, 1000, dtype=np.int16), 16000, 8000)))
+
+
+@pytest.mark.asyncio
+async def test_batch_wav_header_has_exact_size_after_resampling():
+    model = MagicMock()
+    model.infer.return_value = (44100, np.zeros(44100, dtype=np.int16))
+    manager = MagicMock()
+    manager.load_model.return_value = model
+    synth = Synthesizer(manager, cache=SegmentCache(max_bytes=0))
+
+    audio = await synth.synthesize(TTSRequest(text="こんにちは", sample_rate=16000))
+
+    sample_rate, = struct.unpack_from("<I", audio, 24)
+    data_size, = struct.unpack_from("<I", audio, 40)
+    assert sample_rate == 16000
+    assert data_size == len(audio) - 44 == 32000
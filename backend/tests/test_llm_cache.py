@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.llm import cache as llm_cache
+from src.core.llm.cache import LLM_CACHE_TOKENS_SAVED, ResponseCache
+from src.core.llm.client import openai_client
+from src.core.llm.service import LLMService
+from src.models.llm import ChatMessage, LLMRequest
+
+
+def request(content="Hi", temperature=0.0, **kwargs):
+    return LLMRequest(messages=[ChatMessage(role="user", content=content)], temperature=temperature, **kwargs)
+
+
+def completion(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=9, completion_tokens=3, total_tokens=12),
+    )
+
+
+async def token_stream(tokens):
+    for i, token in enumerate(tokens):
+        finish_reason = "stop" if i == len(tokens) - 1 else None
+        delta = SimpleNamespace(content=token)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)], usage=None)
+
+
+@pytest.fixture
+def api_calls(monkeypatch):
+    calls = []
+
+    async def create_chat_completion(messages, temperature=1.0, max_tokens=None, stream=False):
+        calls.append(messages)
+        if stream:
+            return token_stream(["こんにちは", "、", "元気です", "。"])
+        return completion("Hello!")
+
+    monkeypatch.setattr(openai_client, "create_chat_completion", create_chat_completion)
+    return calls
+
+
+def saved(type):
+    return LLM_CACHE_TOKENS_SAVED.labels(type=type)._value.get()
+
+
+def test_cache_key_is_canonical_and_covers_the_request_parameters():
+    key = ResponseCache.key("gpt-5-mini", request(max_tokens=10), stream=False)
+
+    assert key == ResponseCache.key("gpt-5-mini", request(max_tokens=10), stream=False)
+    assert key != ResponseCache.key("gpt-5-mini", request(max_tokens=20), stream=False)
+    assert key != ResponseCache.key("gpt-5-mini", request(temperature=0.2, max_tokens=10), stream=False)
+    assert key != ResponseCache.key("gpt-5-mini", request("Hello", max_tokens=10), stream=False)
+    assert key != ResponseCache.key("gpt-4o", request(max_tokens=10), stream=False)
+    assert key != ResponseCache.key("gpt-5-mini", request(max_tokens=10), stream=True)
+
+
+def test_cache_expires_entries_and_stays_within_budget(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_bytes=1000, ttl=60)
+    cache.put("a", ["x" * 100], "stop", 1, 1)
+
+    now[0] += 59
+    assert cache.get("a", mode="batch").content == "x" * 100
+    now[0] += 2
+    assert cache.get("a", mode="batch") is None
+    assert cache.memory.nbytes == 0
+
+    for key in "bcdefg":
+        cache.put(key, ["x" * 100], "stop", 1, 1)
+    assert cache.memory.nbytes <= 1000
+    assert cache.get("b", mode="batch") is None  # least recently used
+    assert cache.get("g", mode="batch") is not None
+
+
+@pytest.mark.asyncio
+async def test_identical_deterministic_requests_reach_the_api_once(api_calls):
+    service = LLMService(cache=ResponseCache(max_bytes=1024 * 1024, ttl=60, max_temperature=0.0))
+    before = saved("completion")
+
+    first = await service.get_chat_completion(request())
+    second = await service.get_chat_completion(request())
+
+    assert len(api_calls) == 1
+    assert second == first
+    assert saved("completion") - before == 3
+
+    # Sampled requests are never cached
+    await service.get_chat_completion(request(temperature=0.7))
+    await service.get_chat_completion(request(temperature=0.7))
+    assert len(api_calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_hit_replays_the_stored_chunks(api_calls):
+    service = LLMService(cache=ResponseCache(max_bytes=1024 * 1024, ttl=60))
+
+    streamed = [token async for token in service.stream_chat_completion(request(stream=True))]
+    replayed = [token async for token in service.stream_chat_completion(request(stream=True))]
+
+    assert replayed == streamed == ["こんにちは", "、", "元気です", "。"]
+    assert len(api_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_abandoned_by_the_caller_is_not_cached(api_calls):
+    service = LLMService(cache=ResponseCache(max_bytes=1024 * 1024, ttl=60))
+
+    tokens = service.stream_chat_completion(request(stream=True))
+    assert await tokens.__anext__() == "こんにちは"
+    await tokens.aclose()
+    assert [token async for token in service.stream_chat_completion(request(stream=True))][-1] == "。"
+
+    assert len(api_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_is_off_by_default(api_calls, monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_MAX_MB", raising=False)
+    service = LLMService()
+
+    await service.get_chat_completion(request())
+    await service.get_chat_completion(request())
+
+    assert len(api_calls) == 2
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.core.stt_batcher import STTBatcher
+from src.core.stt_cache import STT_CACHE_MISSES, TranscriptCache
+from src.utils.audio import create_wav_header
+from src.utils.audio_utils import load_pcm16k
+
+
+def make_processor():
+    processor = MagicMock()
+    processor.transcribe_uncached.side_effect = lambda audios: [f"text-{a.decode()}" for a in audios]
+    return processor
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_forward_pass():
+    processor = make_processor()
+    batcher = STTBatcher(processor, max_batch_size=8, max_wait_ms=50)
+
+    results = await asyncio.gather(*(batcher.transcribe(str(i).encode()) for i in range(5)))
+
+    assert results == [f"text-{i}" for i in range(5)]
+    processor.transcribe_uncached.assert_called_once()
+    assert len(processor.transcribe_uncached.call_args.args[0]) == 5
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch_size():
+    processor = make_processor()
+    batcher = STTBatcher(processor, max_batch_size=2, max_wait_ms=50)
+
+    results = await asyncio.gather(*(batcher.transcribe(str(i).encode()) for i in range(5)))
+
+    assert results == [f"text-{i}" for i in range(5)]
+    sizes = [len(call.args[0]) for call in processor.transcribe_uncached.call_args_list]
+    assert sizes == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_propagates_to_every_caller():
+    processor = MagicMock()
+    processor.transcribe_uncached.side_effect = RuntimeError("model crashed")
+    batcher = STTBatcher(processor, max_batch_size=4, max_wait_ms=10)
+
+    results = await asyncio.gather(batcher.transcribe(b"a"), batcher.transcribe(b"b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_identical_audio_and_serves_repeats(tmp_path):
+    pcm = (np.arange(1600) % 100).astype(np.int16).tobytes()
+    wav = create_wav_header(16000, data_size=len(pcm)) + pcm
+
+    processor = MagicMock()
+    processor._to_signal.side_effect = load_pcm16k
+    processor.transcribe_uncached.side_effect = lambda audios: [f"len-{a.size}" for a in audios]
+    cache = TranscriptCache("test-model", directory=str(tmp_path))
+    batcher = STTBatcher(processor, max_batch_size=8, max_wait_ms=10, cache=cache)
+
+    # WAV and raw PCM of the same audio normalise to the same key
+    results = await asyncio.gather(batcher.transcribe(wav), batcher.transcribe(pcm), batcher.transcribe(wav))
+    assert results == ["len-1600"] * 3
+    assert sum(len(call.args[0]) for call in processor.transcribe_uncached.call_args_list) == 1
+
+    assert await batcher.transcribe(pcm) == "len-1600"
+    processor.transcribe_uncached.assert_called_once()
+
+    # The disk tier answers after a restart
+    restarted = TranscriptCache("test-model", directory=str(tmp_path))
+    signal = load_pcm16k(pcm)
+    assert restarted.get(restarted.key(signal)) == "len-1600"
+    assert TranscriptCache("other-model").key(signal) != restarted.key(signal)
+
+
+def make_caching_processor():
+    processor = MagicMock()
+    processor.cache = TranscriptCache("test-model", max_bytes=1024)
+    processor._to_signal.side_effect = load_pcm16k
+    processor.transcribe_uncached.side_effect = lambda audios: [f"len-{a.size}" for a in audios]
+    # Would look the audio up in the cache a second time
+    processor.transcribe_batch.side_effect = AssertionError("the batcher must not use the caching path")
+    return processor
+
+
+@pytest.mark.asyncio
+async def test_cold_request_looks_up_the_cache_once():
+    processor = make_caching_processor()
+    batcher = STTBatcher(processor, max_batch_size=8, max_wait_ms=0, cache=processor.cache)
+    pcm = np.ones(1600, dtype=np.int16).tobytes()
+    misses = STT_CACHE_MISSES._value.get()
+
+    assert await batcher.transcribe(pcm) == "len-1600"
+    assert STT_CACHE_MISSES._value.get() - misses == 1
+    assert len(processor.cache.memory) == 1
+
+    assert await batcher.transcribe(pcm) == "len-1600"
+    assert STT_CACHE_MISSES._value.get() - misses == 1
+
+
+@pytest.mark.asyncio
+async def test_uncached_requests_skip_the_cache():
+    processor = make_caching_processor()
+    batcher = STTBatcher(processor, max_batch_size=8, max_wait_ms=0, cache=processor.cache)
+    misses = STT_CACHE_MISSES._value.get()
+
+    assert await batcher.transcribe(np.ones(1600, dtype=np.float32), cache=False) == "len-1600"
+    assert STT_CACHE_MISSES._value.get() == misses
+    assert len(processor.cache.memory) == 0
+
+
+@pytest.mark.asyncio
+async def test_decoding_and_hashing_run_off_the_event_loop():
+    processor = make_caching_processor()
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def to_signal(audio):
+        threads.append(threading.get_ident())
+        return load_pcm16k(audio)
+
+    processor._to_signal.side_effect = to_signal
+    batcher = STTBatcher(processor, max_batch_size=8, max_wait_ms=0, cache=processor.cache)
+
+    assert await batcher.transcribe(np.ones(1600, dtype=np.int16).tobytes()) == "len-1600"
+    assert threads and loop_thread not in threads
@@ -0,0 +1,80 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.core.stt_longform import AudioWindow, LongFormTranscriber, SilenceSegmenter, decode_windows
+from src.utils.audio import create_wav_header
+
+SR = 16000
+
+
+def tone(seconds, amplitude=0.5):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+def test_segmenter_cuts_in_the_silence_and_bounds_windows():
+    segmenter = SilenceSegmenter(SR, max_window_s=4, search_s=2)
+    audio = np.concatenate([tone(3), silence(0.2), tone(3), silence(0.2), tone(1)])
+
+    windows = []
+    for chunk in np.array_split(audio, 37):
+        windows += segmenter.push(chunk)
+    windows += segmenter.finish()
+
+    assert all(w.samples.size <= 4 * SR for w in windows)
+    # Windows tile the input exactly
+    assert windows[0].start == 0
+    for prev, cur in zip(windows, windows[1:]):
+        assert cur.start == prev.start + prev.samples.size
+    np.testing.assert_array_equal(np.concatenate([w.samples for w in windows]), audio)
+    # The first cut lands inside the first pause
+    assert 3 * SR <= windows[1].start <= 3.2 * SR
+
+
+@pytest.mark.asyncio
+async def test_transcriber_runs_windows_in_parallel_and_keeps_order():
+    in_flight = 0
+    peak = 0
+
+    async def transcribe(samples):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later windows finish first
+        await asyncio.sleep(0.05 / (samples.size // SR))
+        in_flight -= 1
+        return f"w{samples.size // SR}" if samples.size != 3 * SR else ""
+
+    async def windows():
+        start = 0
+        for seconds in (1, 2, 3, 4, 5):
+            yield AudioWindow(start, silence(seconds))
+            start += seconds * SR
+
+    results = [r async for r in LongFormTranscriber(transcribe, SR, max_parallel=3).run(windows())]
+
+    assert [r["text"] for r in results] == ["w1", "w2", "w4", "w5"]  # empty window 3 is dropped
+    assert results[2]["start_timestamp"] == 6.0
+    assert results[2]["end_timestamp"] == 10.0
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_decode_windows_from_wav_chunks():
+    pcm = (tone(5, 0.3) * 32767).astype(np.int16).tobytes()
+    wav = create_wav_header(SR, data_size=len(pcm)) + pcm
+
+    async def chunks():
+        for offset in range(0, len(wav), 7001):  # odd size, splits header and samples
+            yield wav[offset : offset + 7001]
+
+    windows = [w async for w in decode_windows(chunks(), SR, SilenceSegmenter(SR, max_window_s=2, search_s=1))]
+
+    assert sum(w.samples.size for w in windows) == 5 * SR
+    assert max(w.samples.size for w in windows) <= 2 * SR
@@ -0,0 +1,145 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.core.stt_streaming import PCMRingBuffer, StreamingTranscriber
+
+SR = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.int16)
+
+
+def chunks(samples, chunk_ms=100):
+    step = SR * chunk_ms // 1000
+    data = samples.tobytes()
+    for i in range(0, len(data), step * 2):
+        yield data[i : i + step * 2]
+
+
+async def feed_all(transcriber, audio):
+    results = []
+    for chunk in chunks(audio):
+        results.extend(await transcriber.feed(chunk))
+        await asyncio.sleep(0)  # Like waiting for the next chunk: lets a partial decode run
+    return results + await transcriber.flush()
+
+
+def test_ring_buffer_keeps_last_capacity_samples():
+    ring = PCMRingBuffer(10)
+    ring.write(np.arange(7, dtype=np.float32))
+    ring.write(np.arange(7, 14, dtype=np.float32))
+
+    assert ring.total_written == 14
+    assert ring.oldest == 4
+    assert np.array_equal(ring.read(0, 14), np.arange(4, 14, dtype=np.float32))
+    assert np.array_equal(ring.read(8, 12), np.arange(8, 12, dtype=np.float32))
+
+
+def test_ring_buffer_counts_writes_longer_than_capacity():
+    ring = PCMRingBuffer(4)
+    ring.write(np.arange(3, dtype=np.float32))
+    ring.write(np.arange(3, 13, dtype=np.float32))
+
+    assert ring.total_written == 13
+    assert ring.oldest == 9
+    assert np.array_equal(ring.read(0, 13), np.arange(9, 13, dtype=np.float32))
+
+    ring.write(np.arange(13, 15, dtype=np.float32))
+    assert np.array_equal(ring.read(11, 15), np.arange(11, 15, dtype=np.float32))
+
+
+@pytest.mark.asyncio
+async def test_partials_then_final_on_endpoint():
+    decoded_lengths = []
+
+    async def decode(samples):
+        decoded_lengths.append(samples.size)
+        return f"speech-{len(decoded_lengths)}"
+
+    transcriber = StreamingTranscriber(decode, window_s=10, step_ms=500, endpoint_ms=400)
+    audio = np.concatenate((silence(0.5), tone(1.5), silence(1.0)))
+
+    results = await feed_all(transcriber, audio)
+
+    partials = [r for r in results if not r["is_final"]]
+    finals = [r for r in results if r["is_final"]]
+    assert partials
+    assert len(finals) == 1
+    # Speech starts at 0.5s (minus pre-roll) and ends at 2.0s
+    assert finals[0]["start_timestamp"] == pytest.approx(0.2, abs=0.05)
+    assert finals[0]["end_timestamp"] == pytest.approx(2.0, abs=0.05)
+    assert all(r["start_timestamp"] <= r["end_timestamp"] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_long_speech_is_finalized_at_window_size():
+    async def decode(samples):
+        assert samples.size <= 2 * SR
+        return "text"
+
+    transcriber = StreamingTranscriber(decode, window_s=2, step_ms=500, endpoint_ms=400)
+
+    results = await feed_all(transcriber, tone(5.0))
+
+    assert len([r for r in results if r["is_final"]]) == 3
+
+
+@pytest.mark.asyncio
+async def test_silence_produces_no_results():
+    async def decode(samples):
+        raise AssertionError("silence should not be decoded")
+
+    transcriber = StreamingTranscriber(decode)
+    for chunk in chunks(silence(3.0)):
+        assert await transcriber.feed(chunk) == []
+    assert await transcriber.flush() == []
+
+
+@pytest.mark.asyncio
+async def test_partials_decode_in_the_background_and_stale_ones_are_dropped():
+    finals, partials = [], []
+    release = asyncio.Event()
+
+    async def decode(samples):
+        finals.append(samples.size)
+        return "final"
+
+    async def decode_partial(samples):
+        partials.append(samples.size)
+        await release.wait()
+        return "partial"
+
+    transcriber = StreamingTranscriber(decode, decode_partial, window_s=10, step_ms=500, endpoint_ms=400)
+
+    # The first partial never finishes: feed keeps going, starts no second one, and the final drops it
+    results = await feed_all(transcriber, np.concatenate((tone(1.5), silence(1.0))))
+    assert [r["text"] for r in results] == ["final"]
+    assert len(partials) == 1 and len(finals) == 1
+
+    # Once a partial is ready, the next chunk returns it
+    release.set()
+    results = await feed_all(transcriber, np.concatenate((tone(1.0), silence(1.0))))
+    assert [r["text"] for r in results] == ["partial", "final"]
+    assert results[0]["end_timestamp"] <= results[1]["end_timestamp"]
+
+
+@pytest.mark.asyncio
+async def test_failed_partial_is_dropped_and_the_stream_continues():
+    async def decode(samples):
+        return "final"
+
+    async def decode_partial(samples):
+        raise RuntimeError("decoder crashed")
+
+    transcriber = StreamingTranscriber(decode, decode_partial, window_s=10, step_ms=500, endpoint_ms=400)
+
+    results = await feed_all(transcriber, np.concatenate((tone(1.5), silence(1.0))))
+    assert [r["text"] for r in results] == ["final"]
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.core import stt_workers
+from src.core.stt_batcher import STTBatcher
+from src.core.stt_workers import STTWorkerPool, _release, _share_signals, _transcribe_shared
+
+
+def test_shared_signals_are_read_back_in_place(monkeypatch):
+    signals = [np.arange(5, dtype=np.float32), np.zeros(0, dtype=np.float32), np.full(3, 0.5, dtype=np.float32)]
+    seen = []
+
+    processor = MagicMock()
+    processor.transcribe_batch.side_effect = lambda views: seen.extend(v.copy() for v in views) or ["a", "", "b"]
+    monkeypatch.setattr(stt_workers, "_processor", processor)
+    monkeypatch.setattr(stt_workers.resource_tracker, "unregister", lambda *args: None)
+
+    shm, offsets = _share_signals(signals)
+    try:
+        assert _transcribe_shared(shm.name, offsets) == ["a", "", "b"]
+    finally:
+        _release(shm)
+
+    assert offsets == [(0, 5), (5, 5), (5, 8)]
+    for expected, actual in zip(signals, seen):
+        np.testing.assert_array_equal(expected, actual)
+
+
+@pytest.mark.asyncio
+async def test_batcher_keeps_one_batch_in_flight_per_worker():
+    running = 0
+    peak = 0
+
+    class FakePool:
+        workers = 2
+
+        async def transcribe_batch(self, signals):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return [str(signal.size) for signal in signals]
+
+    decoded_on = set()
+
+    def to_signal(audio):
+        decoded_on.add(threading.get_ident())
+        return np.zeros(len(audio), dtype=np.float32)
+
+    processor = MagicMock()
+    processor._to_signal.side_effect = to_signal
+    batcher = STTBatcher(processor, max_batch_size=1, max_wait_ms=0, worker_pool=FakePool())
+
+    results = await asyncio.gather(*(batcher.transcribe(b"x" * i) for i in range(1, 6)))
+
+    assert results == ["1", "2", "3", "4", "5"]
+    assert peak == 2
+    processor.transcribe_uncached.assert_not_called()
+    assert threading.get_ident() not in decoded_on  # decoded in worker threads, not on the event loop
+
+
+@pytest.mark.asyncio
+async def test_warm_up_waits_until_every_worker_has_answered(monkeypatch):
+    # Worker 101 is up first and answers every ping until 102 and 103 have loaded
+    answers = iter([101, 101, 101, 101, 102, 101, 103])
+    submitted = []
+
+    def submit(fn):
+        submitted.append(fn)
+        future = Future()
+        future.set_result(next(answers))
+        return future
+
+    monkeypatch.setattr(stt_workers, "WARMUP_POLL_S", 0)
+    pool = object.__new__(STTWorkerPool)
+    pool.workers = 3
+    pool._executor = MagicMock(submit=submit)
+
+    await pool.warm_up()
+
+    assert submitted == [stt_workers._ping] * 7
+    assert next(answers, None) is None
@@ -0,0 +1,54 @@
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from src.api.v1.endpoints import stt
+from src.utils.audio import create_wav_header
+
+
+class CountingFile(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_is_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(stt, "MAX_FILE_SIZE_BYTES", 1000)
+    file = CountingFile(create_wav_header(16000, data_size=2000) + bytes(2000))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await stt.open_upload(UploadFile(file, size=2044))
+
+    assert "File size exceeds" in exc_info.value.detail
+    assert file.bytes_read == 0
+
+
+@pytest.mark.asyncio
+async def test_upload_is_read_in_chunks_and_size_enforced_incrementally(monkeypatch):
+    monkeypatch.setattr(stt, "MAX_FILE_SIZE_BYTES", 1000)
+    monkeypatch.setattr(stt, "UPLOAD_CHUNK_BYTES", 256)
+    file = CountingFile(create_wav_header(16000, data_size=2000) + bytes(2000))
+
+    chunks = await stt.open_upload(UploadFile(file))  # size unknown
+    received = []
+    with pytest.raises(HTTPException):
+        async for chunk in chunks:
+            received.append(len(chunk))
+
+    assert set(received) == {256}
+    assert file.bytes_read <= 1000 + 256
+
+
+@pytest.mark.asyncio
+async def test_non_audio_upload_is_rejected_from_first_chunk():
+    with pytest.raises(HTTPException) as exc_info:
+        await stt.open_upload(UploadFile(io.BytesIO(b"just some text"), headers={"content-type": "text/plain"}))
+
+    assert "Unsupported media type" in exc_info.value.detail
@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.core.vad import SPEECH_END, SPEECH_START, EnergyVAD
+
+SR = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16).tobytes()
+
+
+def silence(seconds):
+    return bytes(int(seconds * SR) * 2)
+
+
+def feed(vad, audio, chunk_bytes=640):
+    events = []
+    for i in range(0, len(audio), chunk_bytes):
+        events.extend(vad.process(audio[i : i + chunk_bytes]))
+    return events
+
+
+def test_detects_one_utterance_with_hangover():
+    vad = EnergyVAD(hangover_ms=300, preroll_ms=200, tail_ms=100)
+    events = feed(vad, silence(1.0) + tone(1.0) + silence(1.0))
+
+    assert [e.type for e in events] == [SPEECH_START, SPEECH_END]
+    # 200 ms pre-roll + 1 s of speech + 100 ms tail
+    assert events[1].audio.sample_rate == SR
+    assert events[1].audio.num_frames == int(1.3 * SR)
+
+
+def test_short_pause_within_hangover_keeps_one_utterance():
+    vad = EnergyVAD(hangover_ms=500)
+    events = feed(vad, tone(0.5) + silence(0.2) + tone(0.5) + silence(1.0))
+
+    assert [e.type for e in events] == [SPEECH_START, SPEECH_END]
+
+
+def test_click_shorter_than_min_speech_is_ignored():
+    vad = EnergyVAD(min_speech_ms=100)
+    events = feed(vad, silence(0.5) + tone(0.04) + silence(1.0))
+
+    assert events == []
+
+
+def test_odd_sized_chunks_are_carried_over():
+    vad = EnergyVAD(hangover_ms=300)
+    events = feed(vad, tone(0.5) + silence(0.5), chunk_bytes=333)
+
+    assert [e.type for e in events] == [SPEECH_START, SPEECH_END]
+
+
+def test_max_utterance_forces_end():
+    vad = EnergyVAD(max_utterance_s=1.0)
+    events = feed(vad, tone(2.5))
+
+    assert [e.type for e in events].count(SPEECH_END) == 2
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from src.core.warmup import ModelWarmup
+
+
+@pytest.mark.asyncio
+async def test_steps_run_concurrently_and_report_ready():
+    started = []
+
+    async def step(name):
+        started.append(name)
+        await asyncio.sleep(0.01)
+        # Both steps must have started before either finishes
+        assert len(started) == 2
+
+    warmup = ModelWarmup({"stt": lambda: step("stt"), "tts:voice": lambda: step("tts")})
+    assert not warmup.ready
+
+    await warmup.run()
+
+    assert warmup.ready
+    assert warmup.status() == {"status": "ready"}
+
+
+@pytest.mark.asyncio
+async def test_failed_step_keeps_service_not_ready():
+    async def ok():
+        pass
+
+    async def broken():
+        raise RuntimeError("weights missing")
+
+    warmup = ModelWarmup({"stt": ok, "tts:voice": broken})
+    await warmup.run()
+
+    assert warmup.done
+    assert not warmup.ready
+    assert warmup.status() == {"status": "failed", "errors": {"tts:voice": "weights missing"}}
@@ -0,0 +1,88 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from backend.src.core.tts.batcher import TTSBatcher
+from backend.src.core.tts.sbv2_backend import SBV2Voice
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.models.tts import TTSRequest
+
+
+def recording_runner(batches):
+    async def run_batch(texts):
+        batches.append(list(texts))
+        return [text.upper() for text in texts]
+    return run_batch
+
+
+@pytest.mark.asyncio
+async def test_concurrent_segments_share_a_batch_per_group():
+    batcher = TTSBatcher(max_batch_size=8, max_wait_ms=20)
+    batches = []
+    run_batch = recording_runner(batches)
+
+    results = await asyncio.gather(
+        batcher.infer("voice-a", "a", run_batch),
+        batcher.infer("voice-a", "b", run_batch),
+        batcher.infer("voice-b", "c", run_batch),
+    )
+
+    assert results == ["A", "B", "C"]
+    assert sorted(batches) == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_runs_without_waiting():
+    batcher = TTSBatcher(max_batch_size=2, max_wait_ms=10_000)
+    batches = []
+    run_batch = recording_runner(batches)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.infer("v", text, run_batch) for text in "abcd")), timeout=1
+    )
+
+    assert results == ["A", "B", "C", "D"]
+    assert batches == [["a", "b"], ["c", "d"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    batcher = TTSBatcher(max_batch_size=2, max_wait_ms=10)
+
+    async def run_batch(texts):
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        batcher.infer("v", "a", run_batch), batcher.infer("v", "b", run_batch), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_synthesizer_batches_concurrent_requests():
+    model = MagicMock(spec=["infer", "infer_batch"])
+    model.infer_batch.side_effect = lambda texts, **kwargs: (
+        44100, [np.full(2, len(text), dtype=np.int16) for text in texts]
+    )
+    manager = MagicMock()
+    manager.load_model.return_value = model
+    synth = Synthesizer(manager, cache=SegmentCache(max_bytes=0), batcher=TTSBatcher(max_batch_size=4))
+
+    texts = ["はい。", "承知しました。", "少々お待ちください。"]
+    results = await asyncio.gather(*(synth._infer_pcm(text, TTSRequest(text=text)) for text in texts))
+
+    model.infer_batch.assert_called_once()
+    assert model.infer_batch.call_args.args[0] == texts
+    assert [frame.samples[0] for frame in results] == [len(text) for text in texts]
+
+
+def test_sbv2_voice_maps_request_parameters():
+    model = MagicMock()
+    SBV2Voice(model).infer("こんにちは", style="Happy", style_weight=0.5, speed=2.0, pitch=1.1)
+
+    model.infer.assert_called_once_with(
+        text="こんにちは", style="Happy", style_weight=0.5, length=0.5, pitch_scale=1.1
+    )
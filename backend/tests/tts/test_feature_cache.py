@@ -0,0 +1,208 @@
+import inspect
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from backend.src.core.tts import feature_cache, sbv2_backend
+from backend.src.core.tts.feature_cache import BERT_DIM, FeatureCache
+from backend.src.core.tts.sbv2_backend import SBV2Voice
+
+
+class Tensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def element_size(self):
+        return self.array.itemsize
+
+    def nelement(self):
+        return self.array.size
+
+    def size(self, dim):
+        return self.array.shape[dim]
+
+    def new_zeros(self, shape):
+        return Tensor(np.zeros(shape, dtype=self.array.dtype))
+
+
+def hps(version="2.5.0-JP-Extra", add_blank=True):
+    return SimpleNamespace(version=version, data=SimpleNamespace(add_blank=add_blank))
+
+
+def fake_front_end(monkeypatch):
+    calls = []
+
+    def get_text(text, language, hps, device):
+        calls.append(text)
+        n = len(text)
+        zeros = Tensor(np.zeros((BERT_DIM, n), dtype=np.float32))
+        ja_bert = Tensor(np.ones((BERT_DIM, n), dtype=np.float32))
+        ids = Tensor(np.arange(n))
+        return zeros, ja_bert, zeros, ids, ids, ids
+
+    monkeypatch.setattr(feature_cache, "get_text", get_text, raising=False)
+    monkeypatch.setattr(feature_cache, "Languages", SimpleNamespace(JP="JP"), raising=False)
+    return calls
+
+
+def test_features_are_computed_once_per_normalised_text(monkeypatch):
+    calls = fake_front_end(monkeypatch)
+    cache = FeatureCache(max_bytes=10 * 1024 * 1024)
+
+    first = cache.get_text("こんにちは。", hps(), "cpu")
+    again = cache.get_text(" こんにちは。 ", hps(), "cpu")  # same after normalisation
+    cache.get_text("ｺﾝﾆﾁﾊ。", hps(), "cpu")  # half-width kana fold to full width
+
+    assert calls == ["こんにちは。", "コンニチハ。"]
+    assert again[1] is first[1]  # the cached Japanese BERT features
+    bert, ja_bert, en_bert, phones, _, _ = again
+    assert bert.array.shape == en_bert.array.shape == (BERT_DIM, 6) and not bert.array.any()
+
+    # Models trained differently get their own features
+    cache.get_text("こんにちは。", hps(add_blank=False), "cpu")
+    cache.get_text("こんにちは。", hps(version="2.5.0"), "cpu")
+    assert len(calls) == 4
+
+
+def test_cache_is_bounded_by_bytes(monkeypatch):
+    calls = fake_front_end(monkeypatch)
+    # Room for about two short sentences of BERT features (4 KiB per phone)
+    cache = FeatureCache(max_bytes=2 * 4 * BERT_DIM * 5)
+
+    for text in ("一二三。", "四五六。", "七八九。", "一二三。"):
+        cache.get_text(text, hps(), "cpu")
+
+    assert calls == ["一二三。", "四五六。", "七八九。", "一二三。"]
+    assert len(cache.memory) == 2 and cache.memory.nbytes <= cache.memory.max_bytes
+
+    disabled = FeatureCache(max_bytes=0)
+    disabled.get_text("一二三。", hps(), "cpu")
+    assert len(disabled.memory) == 0
+
+
+class FakeTTSModel:
+    """Records `infer` calls; exposes the private attributes of the real TTSModel if `internals`."""
+
+    def __init__(self, internals=True):
+        self.calls = []
+        if internals:
+            self._TTSModel__net_g = object()
+            self._TTSModel__get_style_vector = lambda style_id, weight: np.zeros(256, dtype=np.float32)
+
+    def load(self):
+        pass
+
+    def infer(self, text, **kwargs):
+        self.calls.append(text)
+        return 44100, np.zeros(10, dtype=np.int16)
+
+
+def test_voice_leaves_what_it_does_not_reimplement_to_tts_model(monkeypatch, caplog):
+    monkeypatch.setattr(sbv2_backend, "torch", object())
+    batched = []
+
+    def synthesize(texts, *args):
+        batched.extend(texts)
+        return 44100, [np.zeros(10, dtype=np.int16) for _ in texts]
+
+    def voice(model, features=FeatureCache(max_bytes=1024)):
+        voice = SBV2Voice(model, features=features)
+        voice._synthesize = synthesize
+        return voice
+
+    model = FakeTTSModel()
+    voice(model).infer("こんにちは。")
+    voice(model).infer("一行目。\n二行目。")  # TTSModel.infer splits lines and inserts silence
+    voice(model, features=None).infer("こんにちは。")
+    voice(model).infer_batch(["はい。", "一行目。\n二行目。"])  # one text per call, each routed as above
+    assert batched == ["こんにちは。", "はい。"]
+    assert model.calls == ["一行目。\n二行目。", "こんにちは。", "一行目。\n二行目。"]
+
+    # A library version without the private network or style vectors: noticed at load
+    renamed = FakeTTSModel(internals=False)
+    fallback = voice(renamed)
+    fallback.load()
+    assert "TTSModel internals not found" in caplog.text
+    fallback.infer("こんにちは。")
+    fallback.infer_batch(["はい。", "いいえ。"])
+    assert renamed.calls == ["こんにちは。", "はい。", "いいえ。"] and len(batched) == 2
+    assert not fallback.can_stream
+
+
+def test_tts_model_still_has_the_private_members_the_backend_uses():
+    pytest.importorskip("torch")
+    pytest.importorskip("style_bert_vits2")
+    from style_bert_vits2.tts_model import TTSModel
+
+    # Name-mangled members of TTSModel used outside it; renaming any of them silently disables
+    # batching, the feature cache, streaming, mapped weights and the ONNX export
+    tts_dir = Path(sbv2_backend.__file__).parent
+    used = set()
+    for path in tts_dir.glob("*.py"):
+        used.update(re.findall(r"_TTSModel__(\w+)", path.read_text(encoding="utf-8")))
+    assert used >= {"net_g", "get_style_vector"}
+
+    source = inspect.getsource(TTSModel)
+    for name in sorted(used):
+        assert callable(getattr(TTSModel, f"_TTSModel__{name}", None)) or f"self.__{name}" in source, name
+
+
+def test_cached_path_matches_tts_model_infer(monkeypatch, tmp_path):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("style_bert_vits2")
+    from safetensors.torch import save_file
+    from style_bert_vits2.models import infer as sbv2_infer
+    from style_bert_vits2.models.hyper_parameters import HyperParameters
+    from style_bert_vits2.tts_model import TTSModel
+
+    # A tiny randomly initialised JP-Extra network: the weights file holds no parameters
+    hps = HyperParameters.model_validate(
+        {
+            "version": "2.5.0-JP-Extra",
+            "data": {"hop_length": 16, "filter_length": 64, "win_length": 64},
+            "train": {"segment_size": 512},
+            "model": {
+                "inter_channels": 16,
+                "hidden_channels": 16,
+                "filter_channels": 32,
+                "n_layers": 1,
+                "gin_channels": 16,
+                "resblock_kernel_sizes": [3],
+                "resblock_dilation_sizes": [[1]],
+                "upsample_rates": [4, 4],
+                "upsample_kernel_sizes": [8, 8],
+                "upsample_initial_channel": 16,
+                "n_layers_q": 1,
+            },
+        }
+    )
+    weights = str(tmp_path / "tiny.safetensors")
+    save_file({"iteration": torch.tensor(0)}, weights)
+    style_vectors = np.random.default_rng(0).standard_normal((1, 256)).astype(np.float32)
+    torch.manual_seed(0)
+    model = TTSModel(model_path=weights, config_path=hps, style_vec_path=style_vectors, device="cpu")
+    model.load()
+
+    def get_text(text, language, hps, device, **kwargs):
+        n = 2 * len(text) + 1
+        ja_bert = torch.randn(BERT_DIM, n, generator=torch.Generator().manual_seed(n))
+        zeros = torch.zeros(BERT_DIM, n)
+        return zeros, ja_bert, zeros, torch.arange(n) % 40 + 1, torch.arange(n) % 2, torch.ones(n, dtype=torch.long)
+
+    monkeypatch.setattr(sbv2_infer, "get_text", get_text)
+    monkeypatch.setattr(feature_cache, "get_text", get_text)
+
+    def synthesize(voice):
+        torch.manual_seed(1)  # same sampling noise for both paths
+        return voice.infer("こんにちは。", style="Neutral", speed=1.25)
+
+    expected_sr, expected = synthesize(SBV2Voice(model))  # TTSModel.infer
+    cached = SBV2Voice(model, features=FeatureCache())
+    for _ in range(2):  # feature cache miss, then hit
+        sr, audio = synthesize(cached)
+        assert cached.has_internals  # otherwise both paths would be TTSModel.infer
+        assert sr == expected_sr
+        assert audio.dtype == np.int16 and audio.shape == expected.shape
+        np.testing.assert_allclose(audio, expected, atol=1)
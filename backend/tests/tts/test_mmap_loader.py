@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pytest
+from backend.src.core.tts.mmap_loader import load_style_vectors, mapped_memory
+
+SMAPS = """\
+7f0000000000-7f0000100000 r--p 00000000 08:01 1234                       {weights}
+Size:               1024 kB
+Rss:                 800 kB
+Pss:                 400 kB
+Shared_Clean:        800 kB
+Shared_Dirty:          0 kB
+Private_Clean:         0 kB
+Private_Dirty:         0 kB
+VmFlags: rd mr mw me sd
+7f0000100000-7f0000200000 rw-p 00000000 00:00 0
+Rss:                 999 kB
+Private_Dirty:       999 kB
+7f0000200000-7f0000300000 r--p 00100000 08:01 1234                       {weights}
+Rss:                 100 kB
+Pss:                 100 kB
+Shared_Clean:          0 kB
+Private_Clean:       100 kB
+"""
+
+
+def test_mapped_memory_sums_each_files_mappings(tmp_path):
+    weights = str(tmp_path / "voice.safetensors")
+    smaps = tmp_path / "smaps"
+    smaps.write_text(SMAPS.format(weights=weights))
+
+    report = mapped_memory([weights, "unmapped.npy"], smaps_path=str(smaps))
+
+    assert report[weights] == {"rss": 900 * 1024, "pss": 500 * 1024, "shared": 800 * 1024, "private": 100 * 1024}
+    assert report["unmapped.npy"] == {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    assert mapped_memory([weights], smaps_path=str(tmp_path / "missing"))[weights]["rss"] == 0
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps"), reason="needs /proc/self/smaps")
+def test_style_vectors_are_mapped_read_only(tmp_path):
+    path = str(tmp_path / "style_vectors.npy")
+    np.save(path, np.arange(16 * 1024, dtype=np.float32).reshape(64, 256))
+
+    vectors = load_style_vectors(path)
+    with pytest.raises(ValueError):
+        vectors[0, 0] = 1
+    assert vectors[1, 0] == 256
+    assert mapped_memory([path])[path]["rss"] > 0
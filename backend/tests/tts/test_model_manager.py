@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from backend.src.core.tts import model_manager as mm
+from backend.src.core.tts import sbv2_backend
+from backend.src.core.tts.model_manager import ModelManager
+
+
+class FakeTTSModel:
+    loads = 0
+    lock = threading.Lock()
+
+    def __init__(self, model_path, config_path, style_vec_path, device):
+        self.model_path = model_path
+        self.style_vectors = style_vec_path
+        self.loaded = False
+
+    def load(self):
+        time.sleep(0.05)
+        with FakeTTSModel.lock:
+            FakeTTSModel.loads += 1
+        self.loaded = True
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(mm, "TTSModel", FakeTTSModel)
+    monkeypatch.setattr(sbv2_backend, "load_mmap_weights", lambda model: model.load())
+    FakeTTSModel.loads = 0
+    for name in ("a", "b", "c"):
+        voice = tmp_path / name
+        voice.mkdir()
+        (voice / f"{name}.safetensors").write_bytes(b"\0" * 1024 * 1024)
+        np.save(voice / "style_vectors.npy", np.ones((4, 256), dtype=np.float32))
+    return str(tmp_path)
+
+
+def test_concurrent_loads_share_one_load(model_dir):
+    manager = ModelManager(model_dir)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: manager.load_model("a"), range(8)))
+
+    assert FakeTTSModel.loads == 1
+    assert all(model is models[0] for model in models)
+    assert models[0].model.loaded
+
+
+def test_lru_eviction_by_count(model_dir):
+    manager = ModelManager(model_dir, max_resident=2)
+    manager.load_model("a")
+    manager.load_model("b")
+    manager.load_model("a")  # "b" is now least recently used
+    manager.load_model("c")
+
+    assert manager.resident_models() == ["a", "c"]
+    # Evicted models are reloaded on demand
+    manager.load_model("b")
+    assert FakeTTSModel.loads == 4
+
+
+def test_eviction_by_memory_budget(model_dir):
+    # Each fake voice is ~1 MB, so only one fits
+    manager = ModelManager(model_dir, memory_budget_mb=1.5)
+    manager.load_model("a")
+    manager.load_model("b")
+
+    assert manager.resident_models() == ["b"]
+
+
+def test_failed_load_is_not_cached(model_dir):
+    manager = ModelManager(model_dir)
+    with pytest.raises(ValueError):
+        manager.load_model("missing")
+    with pytest.raises(ValueError):
+        manager.load_model("missing")
+    assert manager.resident_models() == []
+
+
+def test_style_vectors_are_mapped_and_reported(model_dir):
+    manager = ModelManager(model_dir, max_resident=1)
+    vectors = manager.load_model("a").model.style_vectors
+
+    assert isinstance(vectors, np.memmap) and not vectors.flags.writeable
+    assert float(vectors.sum()) == 4 * 256  # faults the pages in
+    report = manager.memory_report()
+    assert list(report) == ["a"]
+    if os.path.exists("/proc/self/smaps"):
+        assert report["a"]["rss"] >= vectors.nbytes
+
+    manager.load_model("b")
+    assert list(manager.memory_report()) == ["b"]
+
+    private = ModelManager(model_dir, mmap_weights=False)
+    assert not isinstance(private.load_model("a").model.style_vectors, np.ndarray)  # a path; TTSModel reads it
+    assert private.memory_report() == {"a": dict.fromkeys(("rss", "pss", "shared", "private"), 0)}
+
+
+def test_can_stream_is_known_before_loading(model_dir):
+    manager = ModelManager(model_dir, backends={"b": "onnx"})
+
+    assert manager.can_stream("a") and not manager.can_stream("b")
+    assert manager.resident_models() == []
+    # Once resident, the voice itself decides (the fake model has no PyTorch network)
+    manager.load_model("a")
+    assert not manager.can_stream("a")
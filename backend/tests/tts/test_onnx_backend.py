@@ -0,0 +1,110 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from backend.src.core.tts import model_manager as mm
+from backend.src.core.tts import onnx_backend, sbv2_backend
+from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.onnx_backend import ONNXVoice, parse_model_backends
+from backend.src.core.tts.sbv2_backend import SBV2Voice
+
+
+class FakeTTSModel:
+    def __init__(self, model_path, config_path, style_vec_path, device):
+        self.model_path = model_path
+        self.device = device
+        self.hyper_parameters = SimpleNamespace(data=SimpleNamespace(hop_length=4, sampling_rate=16000))
+        self._TTSModel__net_g = None
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+        self._TTSModel__net_g = "torch network"
+
+
+class FakeSession:
+    def __init__(self, path, options, providers):
+        self.path = path
+        self.options = options
+        self.feeds = None
+
+    def get_inputs(self):
+        names = ("x", "x_lengths", "sid", "tone", "language", "ja_bert", "style_vec", "length_scale", "sdp_ratio")
+        return [SimpleNamespace(name=name) for name in names]
+
+    def run(self, outputs, feeds):
+        self.feeds = feeds
+        y_mask = np.zeros((2, 1, 5), dtype=np.float32)
+        y_mask[0, 0, :5] = 1
+        y_mask[1, 0, :2] = 1
+        return np.ones((2, 1, 20), dtype=np.float32), y_mask
+
+
+class Tensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+@pytest.fixture
+def fake_ort(monkeypatch):
+    fake = SimpleNamespace(
+        SessionOptions=lambda: SimpleNamespace(),
+        ExecutionMode=SimpleNamespace(ORT_SEQUENTIAL="sequential"),
+        GraphOptimizationLevel=SimpleNamespace(ORT_ENABLE_ALL="all"),
+        InferenceSession=FakeSession,
+    )
+    monkeypatch.setattr(onnx_backend, "ort", fake)
+    return fake
+
+
+def test_parse_model_backends():
+    assert parse_model_backends("a=onnx-int8, b=torch,") == {"a": "onnx-int8", "b": "torch"}
+    with pytest.raises(ValueError):
+        parse_model_backends("a=tensorrt")
+
+
+def test_model_manager_selects_backend_per_model(tmp_path, monkeypatch, fake_ort):
+    monkeypatch.setattr(mm, "TTSModel", FakeTTSModel)
+    monkeypatch.setattr(sbv2_backend, "load_mmap_weights", lambda model: model.load())
+    for name in ("fast", "plain"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / f"{name}.safetensors").write_bytes(b"\0" * 100)
+    # Exported earlier and newer than the weights, so it is reused
+    (tmp_path / "fast" / "fast.int8.onnx").write_bytes(b"\0" * 10)
+    os.utime(tmp_path / "fast" / "fast.int8.onnx", ns=(0, 10**19))
+
+    manager = ModelManager(str(tmp_path), backends={"fast": "onnx-int8"})
+    voice = manager.load_model("fast")
+
+    assert isinstance(voice, ONNXVoice)
+    assert voice.session.path.endswith("fast.int8.onnx")
+    assert voice.session.options.intra_op_num_threads >= 1
+    assert not voice.model.loaded  # no PyTorch network needed for a fresh graph
+
+    plain = manager.load_model("plain")  # default backend
+    assert isinstance(plain, SBV2Voice) and not isinstance(plain, ONNXVoice)
+    assert plain.model.loaded
+
+
+def test_onnx_forward_feeds_graph_inputs_and_trims(fake_ort):
+    model = FakeTTSModel("w.safetensors", None, None, "cpu")
+    voice = ONNXVoice(model, "w.onnx", intra_op_threads=2)
+    voice.session = FakeSession("w.onnx", None, None)
+    voice._input_names = tuple(i.name for i in voice.session.get_inputs())
+    voice.sampling_params = lambda: {"sdp_ratio": 0.0, "noise_scale": 0.0, "noise_scale_w": 0.0}
+    names = ("x", "x_lengths", "sid", "tone", "language", "bert", "ja_bert", "en_bert", "style_vec")
+    inputs = {name: Tensor(np.zeros((2, 3))) for name in names}
+
+    audio, lengths = voice._forward(inputs, length_scale=0.5)
+
+    assert set(voice.session.feeds) == set(voice._input_names)  # unused BERT inputs are not fed
+    assert voice.session.feeds["length_scale"] == np.float32(0.5)
+    assert audio.shape == (2, 20)
+    assert lengths == [20, 8]  # decoder frames * hop length
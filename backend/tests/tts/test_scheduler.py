@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from backend.src.core.tts.scheduler import InferenceScheduler, Priority, parse_model_workers
+
+
+async def queue_jobs(scheduler, jobs, order):
+    """Queues (name, priority, session) jobs behind a held slot and records the service order."""
+
+    async def job(name, priority, session):
+        async with scheduler.slot("m", priority, session):
+            order.append(name)
+
+    tasks = []
+    for name, priority, session in jobs:
+        tasks.append(asyncio.create_task(job(name, priority, session)))
+        await asyncio.sleep(0)  # fix the arrival order
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_is_served_first():
+    scheduler = InferenceScheduler(workers=1)
+    order = []
+    await scheduler.acquire("m")
+    tasks = await queue_jobs(scheduler, [
+        ("batch", Priority.BATCH, "rest"),
+        ("later", Priority.INTERACTIVE, "s1"),
+        ("first", Priority.INTERACTIVE_FIRST, "s2"),
+    ], order)
+
+    scheduler.release("m")
+    await asyncio.gather(*tasks)
+
+    assert order == ["first", "later", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_sessions_within_a_class_take_turns():
+    scheduler = InferenceScheduler(workers=1)
+    order = []
+    await scheduler.acquire("m")
+    tasks = await queue_jobs(scheduler, [
+        ("a1", Priority.BATCH, "a"),
+        ("a2", Priority.BATCH, "a"),
+        ("a3", Priority.BATCH, "a"),
+        ("b1", Priority.BATCH, "b"),
+        ("b2", Priority.BATCH, "b"),
+    ], order)
+
+    scheduler.release("m")
+    await asyncio.gather(*tasks)
+
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+@pytest.mark.asyncio
+async def test_workers_are_per_model():
+    scheduler = InferenceScheduler(workers=1, model_workers={"big": 2})
+
+    await scheduler.acquire("big")
+    await scheduler.acquire("big")
+    await asyncio.wait_for(scheduler.acquire("small"), timeout=1)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(scheduler.acquire("big"), timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_the_slot():
+    scheduler = InferenceScheduler(workers=1)
+    await scheduler.acquire("m")
+    waiter = asyncio.create_task(scheduler.acquire("m"))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.release("m")
+
+    await asyncio.wait_for(scheduler.acquire("m"), timeout=1)
+
+
+def test_parse_model_workers():
+    assert parse_model_workers("jvnv-F1-jp=3, jvnv-M1-jp=1") == {"jvnv-F1-jp": 3, "jvnv-M1-jp": 1}
+    assert parse_model_workers("") == {}
+    with pytest.raises(ValueError):
+        parse_model_workers("jvnv-F1-jp")
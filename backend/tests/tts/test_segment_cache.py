@@ -0,0 +1,79 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.models.tts import TTSRequest
+
+
+def make_synthesizer(cache=None):
+    mock_manager = MagicMock()
+    mock_model = MagicMock()
+
+    def slow_infer(**kwargs):
+        time.sleep(0.02)
+        return 44100, np.arange(4, dtype=np.int16)
+
+    mock_model.infer = MagicMock(side_effect=slow_infer)
+    mock_manager.load_model.return_value = mock_model
+    return Synthesizer(mock_manager, cache=cache or SegmentCache(max_bytes=1024 * 1024)), mock_model
+
+
+@pytest.mark.asyncio
+async def test_repeated_segment_is_served_from_cache():
+    synth, mock_model = make_synthesizer()
+    req = TTSRequest(text="少々お待ちください。")
+
+    first = await synth._infer_pcm("少々お待ちください。", req)
+    # Full-width/half-width and whitespace variants normalise to the same entry
+    second = await synth._infer_pcm(" 少々お待ちください。 ", req)
+
+    assert first is second  # the cached frame itself, not a copy
+    assert first.sample_rate == 44100
+    assert first.samples.tolist() == [0, 1, 2, 3]
+    mock_model.infer.assert_called_once()
+
+    # Different voice parameters are a different entry
+    await synth._infer_pcm("少々お待ちください。", TTSRequest(text="x", speed=1.5))
+    assert mock_model.infer.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_segments_share_one_inference():
+    synth, mock_model = make_synthesizer()
+    req = TTSRequest(text="こんにちは")
+
+    results = await asyncio.gather(*(synth._infer_pcm("こんにちは", req) for _ in range(5)))
+
+    assert all(result is results[0] for result in results)
+    mock_model.infer.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_does_not_wait_for_an_inference_slot():
+    synth, _ = make_synthesizer()
+    req = TTSRequest(text="はい")
+    await synth._infer_pcm("はい", req)
+
+    # every inference slot is busy
+    async with synth.scheduler.slot("default"), synth.scheduler.slot("default"):
+        result = await asyncio.wait_for(synth._infer_pcm("はい", req), timeout=1)
+
+    assert result.sample_rate == 44100
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    synth, _ = make_synthesizer(SegmentCache(max_bytes=1024, directory=str(tmp_path)))
+    req = TTSRequest(text="ありがとうございます")
+    expected = await synth._infer_pcm("ありがとうございます", req)
+
+    restarted, mock_model = make_synthesizer(SegmentCache(max_bytes=1024, directory=str(tmp_path)))
+
+    restored = await restarted._infer_pcm("ありがとうございます", req)
+    assert restored.sample_rate == expected.sample_rate
+    assert restored.samples.tolist() == expected.samples.tolist()
+    mock_model.infer.assert_not_called()
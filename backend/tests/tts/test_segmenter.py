@@ -0,0 +1,44 @@
+from backend.src.core.tts.segmenter import TextSegmenter
+
+
+def test_short_sentences_are_merged():
+    segmenter = TextSegmenter(min_chars=8, max_chars=40, first_max_chars=16)
+
+    assert segmenter.split("はい。そうですね。承知いたしました。", short_first=False) == [
+        "はい。そうですね。",
+        "承知いたしました。",
+    ]
+
+
+def test_first_segment_is_short():
+    segmenter = TextSegmenter(min_chars=8, max_chars=40, first_max_chars=16)
+    text = "お客様のご注文について確認いたしましたところ、在庫の都合により発送が遅れております。"
+
+    assert segmenter.split(text) == ["お客様のご注文について確認いたしましたところ、", "在庫の都合により発送が遅れております。"]
+    # The first segment ends at a word boundary once past first_max_chars
+    text = "商品の発送予定日は明日の午前中となっておりますので配送業者からの連絡をお待ちください"
+    assert segmenter.split(text) == ["商品の発送予定日は明日の午前中となっておりますので", "配送業者からの連絡をお待ちください"]
+
+
+def test_long_sentence_is_cut_at_clause_boundaries():
+    segmenter = TextSegmenter(min_chars=4, max_chars=20, first_max_chars=16)
+    text = "在庫の都合により一部の商品の発送が遅れておりまして、大変ご迷惑をおかけしておりますが、来週には発送できます。"
+
+    segments = segmenter.split(text, short_first=False)
+
+    assert "".join(segments) == text
+    assert all(len(segment) <= 20 for segment in segments)
+    # No clause boundary within max_chars: cut at the last word boundary instead
+    assert segments[0] == "在庫の都合により一部の商品の発送が"
+    assert segments[2] == "大変ご迷惑をおかけしておりますが、"
+
+
+def test_stream_matches_split_and_waits_for_complete_punctuation():
+    segmenter = TextSegmenter(min_chars=4, max_chars=40, first_max_chars=16)
+    stream = segmenter.stream()
+
+    assert stream.feed("本当ですか！") == []  # "！" may be followed by "？" or a closing quote
+    assert stream.feed("？　それは") == ["本当ですか！？"]
+    assert stream.feed("良かったです。") == []
+    assert stream.flush() == ["　それは良かったです。"]
+    assert stream.flush() == []
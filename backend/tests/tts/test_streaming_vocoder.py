@@ -0,0 +1,222 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from backend.src.core.tts.sbv2_backend import STREAM_PEAK, SBV2Voice, overlap_add_chunks
+from backend.src.core.tts.scheduler import InferenceScheduler, Priority
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.synthesizer import Synthesizer
+from backend.src.models.tts import TTSRequest
+from backend.src.utils.audio import float_to_int16
+
+HOP = 4
+
+
+def test_overlap_add_chunks_reassemble_a_single_pass():
+    num_frames = 23
+    signal = np.sin(np.arange(num_frames * HOP, dtype=np.float32) * 0.3)
+    calls = []
+
+    def decode(start, end):
+        calls.append((start, end))
+        return signal[start * HOP : end * HOP].copy()
+
+    pieces = list(overlap_add_chunks(decode, num_frames, HOP, chunk_frames=5, context_frames=2, overlap_frames=2))
+
+    np.testing.assert_allclose(np.concatenate(pieces), signal, atol=1e-6)
+    assert [piece.size for piece in pieces] == [20, 20, 20, 20, 12]
+    # Each chunk is decoded with its overlap and context, never the whole latent
+    assert calls[:2] == [(0, 9), (3, 14)] and calls[-1] == (18, 23)
+
+
+def test_streamed_audio_keeps_headroom_and_never_wraps():
+    voice = SBV2Voice(MagicMock())
+
+    def stream(*peaks):
+        chunks = (np.array([peak, -peak / 2], dtype=np.float32) for peak in peaks)
+        return np.concatenate(list(voice._scale_stream(chunks)))
+
+    # Nothing observed yet: no gain, whatever the first chunk's level
+    np.testing.assert_allclose(stream(0.25, 0.5), [0.25 * STREAM_PEAK, -0.125 * STREAM_PEAK, 0.4, -0.2])
+    assert voice._peak == 0.5
+    # Later streams put the typical peak at STREAM_PEAK and clip louder pieces
+    audio = stream(0.5, 1.0)
+    np.testing.assert_allclose(audio[:2], [STREAM_PEAK, -STREAM_PEAK / 2])
+    assert audio[2] == 1.0
+
+
+class StreamingVoice(SBV2Voice):
+    def __init__(self, streams=True):
+        super().__init__(MagicMock())
+        self.streams = streams
+        self.release = threading.Event()
+        self.finished = threading.Event()
+        self.calls = 0
+
+    @property
+    def can_stream(self):
+        return self.streams
+
+    def infer(self, text, **kwargs):
+        self.calls += 1
+        return 16000, np.full(8, 3, dtype=np.int16)
+
+    def infer_stream(self, text, style="Neutral", style_weight=1.0, speed=1.0):
+        self.calls += 1
+        yield 16000, np.full(4, 1, dtype=np.int16)
+        self.release.wait(5)  # the rest of the vocoder is still running
+        yield 16000, np.full(4, 2, dtype=np.int16)
+        self.finished.set()
+
+
+class CountingScheduler(InferenceScheduler):
+    def __init__(self):
+        super().__init__(workers=1)
+        self.acquired = 0
+        self.busy = 0
+
+    async def acquire(self, model_id, priority=Priority.BATCH, session=None):
+        await super().acquire(model_id, priority, session)
+        self.acquired += 1
+        self.busy += 1
+
+    def release(self, model_id):
+        self.busy -= 1
+        super().release(model_id)
+
+
+def make_synth(voice, can_stream=True):
+    manager = MagicMock()
+    manager.load_model.return_value = voice
+    manager.can_stream.return_value = can_stream
+    scheduler = CountingScheduler()
+    return Synthesizer(manager, cache=SegmentCache(), scheduler=scheduler, incremental_min_chars=10), scheduler
+
+
+TEXT = "ご注文の商品は明日の午前中に発送される予定です。"
+
+
+@pytest.mark.asyncio
+async def test_long_first_segment_streams_before_its_synthesis_ends():
+    voice = StreamingVoice()
+    synth, _ = make_synth(voice)
+    cache = synth.cache
+    request = TTSRequest(text=TEXT, stream=True, output_format="pcm")
+
+    stream = synth.synthesize_stream(request, priority=Priority.INTERACTIVE_FIRST)
+    first = await stream.__anext__()
+    assert bytes(first) == np.full(4, 1, dtype=np.int16).tobytes() and not voice.finished.is_set()
+
+    voice.release.set()
+    rest = [bytes(chunk) async for chunk in stream]
+    assert rest == [np.full(4, 2, dtype=np.int16).tobytes()]
+    # The whole segment is cached as it was streamed, and served in one piece next time
+    cached = cache.get(cache.key("default", TEXT, request)).samples
+    assert cached.tolist() == [1] * 4 + [2] * 4
+    assert [bytes(chunk) async for chunk in synth.synthesize_stream(request)] == [cached.tobytes()]
+
+    # Later sentences of a voice turn are synthesized whole
+    assert not synth._streams_incrementally(TEXT, request, Priority.INTERACTIVE)
+    assert not synth._streams_incrementally(TEXT, TTSRequest(text=TEXT, pitch=1.2), Priority.BATCH)
+
+
+class ScaledStreamingVoice(SBV2Voice):
+    """Streams float chunks through the real headroom scaling, like `infer_stream`."""
+
+    def __init__(self):
+        super().__init__(MagicMock())
+        self._peak = 0.5
+        self.calls = 0
+
+    @property
+    def can_stream(self):
+        return True
+
+    def infer_stream(self, text, style="Neutral", style_weight=1.0, speed=1.0):
+        self.calls += 1
+        chunks = (np.array([0.25, -0.5, 0.125], dtype=np.float32) for _ in range(3))
+        for audio in self._scale_stream(chunks):
+            yield 16000, float_to_int16(audio)
+
+
+@pytest.mark.asyncio
+async def test_cached_segment_plays_at_the_streamed_level():
+    voice = ScaledStreamingVoice()
+    synth, _ = make_synth(voice)
+    request = TTSRequest(text=TEXT, stream=True, output_format="pcm")
+
+    first = b"".join([bytes(chunk) async for chunk in synth.synthesize_stream(request, Priority.INTERACTIVE_FIRST)])
+    again = b"".join([bytes(chunk) async for chunk in synth.synthesize_stream(request, Priority.INTERACTIVE_FIRST)])
+
+    streamed = np.frombuffer(first, dtype=np.int16)
+    assert np.abs(streamed).max() == int(STREAM_PEAK * 32767)
+    # The repeat is a cache hit, at the level the first request heard
+    assert voice.calls == 1
+    assert again == first
+
+
+@pytest.mark.asyncio
+async def test_voice_that_cannot_stream_takes_one_slot():
+    request = TTSRequest(text=TEXT, stream=True, output_format="pcm")
+    # Known before loading (e.g. an ONNX voice), or only once loaded
+    for can_stream in (False, True):
+        voice = StreamingVoice(streams=False)
+        synth, scheduler = make_synth(voice, can_stream=can_stream)
+
+        chunks = [bytes(chunk) async for chunk in synth.synthesize_stream(request, Priority.INTERACTIVE_FIRST)]
+
+        assert chunks == [np.full(8, 3, dtype=np.int16).tobytes()]
+        assert scheduler.acquired == 1 and voice.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_segments_share_one_stream():
+    voice = StreamingVoice()
+    voice.release.set()
+    synth, _ = make_synth(voice)
+    request = TTSRequest(text=TEXT, stream=True, output_format="pcm")
+
+    async def collect():
+        return b"".join([bytes(chunk) async for chunk in synth.synthesize_stream(request, Priority.INTERACTIVE_FIRST)])
+
+    first, second = await asyncio.gather(collect(), collect())
+
+    assert voice.calls == 1
+    assert len(first) == len(second) == 16
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_holds_its_slot_until_the_vocoder_stops():
+    voice = StreamingVoice()
+    synth, scheduler = make_synth(voice)
+    request = TTSRequest(text=TEXT, stream=True, output_format="pcm")
+
+    stream = synth.synthesize_stream(request, priority=Priority.INTERACTIVE_FIRST)
+    await stream.__anext__()
+    await stream.aclose()  # e.g. barge-in
+    await asyncio.sleep(0.01)
+    assert scheduler.busy == 1  # the vocoder thread is still running
+
+    voice.release.set()
+    for _ in range(500):
+        if not scheduler.busy:
+            break
+        await asyncio.sleep(0.01)
+    assert scheduler.busy == 0
+    # Nobody waits for the segment any more: the vocoder stopped after its current chunk
+    assert not voice.finished.is_set()
+    assert synth.cache.get(synth.cache.key("default", TEXT, request)) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_without_pieces_is_an_empty_segment():
+    voice = StreamingVoice()
+    voice.infer_stream = lambda *args, **kwargs: iter(())
+    voice.model.hyper_parameters.data.sampling_rate = 16000
+    synth, _ = make_synth(voice)
+    request = TTSRequest(text=TEXT, stream=True, output_format="pcm")
+
+    assert [bytes(chunk) async for chunk in synth.synthesize_stream(request, Priority.INTERACTIVE_FIRST)] == []
+    assert synth.cache.get(synth.cache.key("default", TEXT, request)).num_frames == 0
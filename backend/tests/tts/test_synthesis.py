@@ -1,7 +1,14 @@
+import asyncio
+import struct
+import threading
+import time
 from unittest.mock import MagicMock
 
 import numpy as np
 import pytest
+from backend.src.core.tts.scheduler import InferenceScheduler
+from backend.src.core.tts.segment_cache import SegmentCache
+from backend.src.core.tts.segmenter import TextSegmenter
 from backend.src.core.tts.synthesizer import Synthesizer
 from backend.src.models.tts import TTSRequest
 
@@ -38,3 +45,100 @@ async def test_synthesize_params():
     assert call_kwargs['style_weight'] == 0.5
     assert call_kwargs['speed'] == 1.2
     assert call_kwargs['pitch'] == 0.9 # Uncomment when supported
+
+
+@pytest.mark.asyncio
+async def test_stream_prefetches_ahead_and_keeps_order():
+    started = []
+
+    def infer(text, **kwargs):
+        started.append(text)
+        return 16000, np.full(2, len(started), dtype=np.int16)
+
+    mock_manager = MagicMock()
+    mock_manager.load_model.return_value.infer = MagicMock(side_effect=infer)
+    # One segment per sentence, however short
+    synth = Synthesizer(
+        mock_manager, cache=SegmentCache(max_bytes=0), lookahead=2, segmenter=TextSegmenter(min_chars=0)
+    )
+
+    stream = synth.synthesize_stream(TTSRequest(text="一。二。三。四。", stream=True))
+    header = await stream.__anext__()
+    first = await stream.__anext__()
+    await asyncio.sleep(0.05)  # the consumer is busy with the first segment
+
+    assert header.startswith(b"RIFF")
+    assert np.frombuffer(first, dtype=np.int16)[0] == 1
+    assert started[:3] == ["一。", "二。", "三。"]  # two segments synthesized ahead
+
+    rest = [chunk async for chunk in stream]
+    assert started == ["一。", "二。", "三。", "四。"]
+    assert len(rest) == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_close_cancels_prefetched_segments():
+    started = []
+    release = threading.Event()
+
+    def infer(text, **kwargs):
+        started.append(text)
+        if text == "二。":
+            release.wait(5)
+        return 16000, np.full(2, 100, dtype=np.int16)
+
+    mock_manager = MagicMock()
+    mock_manager.load_model.return_value.infer = MagicMock(side_effect=infer)
+    scheduler = InferenceScheduler(workers=1)
+    cache = SegmentCache(max_bytes=1024 * 1024)
+    synth = Synthesizer(
+        mock_manager, cache=cache, scheduler=scheduler, lookahead=2, segmenter=TextSegmenter(min_chars=0)
+    )
+
+    stream = synth.synthesize_stream(TTSRequest(text="一。二。三。", stream=True))
+    await stream.__anext__()  # header
+    await stream.__anext__()  # first segment
+    while "二。" not in started:  # the second segment holds the only slot, the third waits for it
+        await asyncio.sleep(0.01)
+    await stream.aclose()  # client disconnected
+    release.set()
+    await asyncio.sleep(0.1)
+
+    assert started == ["一。", "二。"]  # the queued inference never started
+    assert scheduler._queue("default").free == 1  # the slot came back once the running one ended
+    assert not synth._single_flight._calls
+    request = TTSRequest(text="三。")
+    assert cache.get(cache.key("default", "三。", request)) is None
+
+
+@pytest.mark.asyncio
+async def test_batch_synthesizes_segments_concurrently_and_joins_them():
+    running, peak, texts = 0, 0, []
+
+    def infer(text, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        time.sleep(0.02)
+        running -= 1
+        texts.append(text)
+        return 16000, np.full(1600, 100 * len(text), dtype=np.int16)
+
+    mock_manager = MagicMock()
+    mock_manager.load_model.return_value.infer = MagicMock(side_effect=infer)
+    synth = Synthesizer(
+        mock_manager,
+        cache=SegmentCache(max_bytes=0),
+        scheduler=InferenceScheduler(workers=2),
+        segmenter=TextSegmenter(min_chars=0),
+        crossfade_ms=5,
+    )
+
+    audio = await synth.synthesize(TTSRequest(text="一。二二。三三三。"))
+
+    assert sorted(texts, key=len) == ["一。", "二二。", "三三三。"]
+    assert peak == 2  # bounded by the scheduler's slots
+    data_size, = struct.unpack_from("<I", audio, 40)
+    samples = np.frombuffer(audio, dtype=np.int16, offset=44)
+    assert data_size == samples.nbytes and samples.size == 3 * 1600 - 2 * 80  # 5 ms overlaps at 16 kHz
+    assert samples[0] == 200 and samples[1600] == 300 and samples[-1] == 400  # segment order kept
@@ -0,0 +1,69 @@
+import json
+import os
+
+from backend.src.core.tts import voice_index
+from backend.src.core.tts.model_manager import ModelManager
+from backend.src.core.tts.voice_index import VoiceIndex
+
+
+def add_voice(model_dir, name, styles=("Neutral", "Happy"), sampling_rate=44100, weights=True):
+    voice = model_dir / name
+    voice.mkdir(exist_ok=True)
+    config = {"model_name": name, "data": {"sampling_rate": sampling_rate, "style2id": {s: i for i, s in enumerate(styles)}}}
+    (voice / "config.json").write_text(json.dumps(config))
+    if weights:
+        (voice / f"{name}.safetensors").write_bytes(b"\0")
+    return voice
+
+
+def test_lists_styles_and_rate_without_loading(tmp_path):
+    add_voice(tmp_path, "jvnv-F1-jp", styles=("Neutral", "Angry", "Sad"), sampling_rate=24000)
+    (tmp_path / "README.txt").write_text("not a voice")
+
+    models = ModelManager(str(tmp_path)).list_models()
+
+    assert [(m.id, m.styles, m.sample_rate) for m in models] == [("jvnv-F1-jp", ["Neutral", "Angry", "Sad"], 24000)]
+
+
+def test_configs_are_read_once_until_they_change(tmp_path, monkeypatch):
+    add_voice(tmp_path, "a")
+    add_voice(tmp_path, "b")
+    reads = []
+    read = voice_index.read_voice_config
+    monkeypatch.setattr(voice_index, "read_voice_config", lambda *args: reads.append(args[0]) or read(*args))
+    index = VoiceIndex(str(tmp_path))
+
+    for _ in range(3):
+        assert [m.id for m in index.list()] == ["a", "b"]
+    assert reads == ["a", "b"]
+
+    # A new voice changes the directory mtime; only its config is read
+    add_voice(tmp_path, "c")
+    os.utime(tmp_path, ns=(0, 10**18))
+    assert [m.id for m in index.list()] == ["a", "b", "c"]
+    assert reads == ["a", "b", "c"]
+
+    # In-place config edits are picked up after invalidate() (or the periodic re-check)
+    add_voice(tmp_path, "a", styles=("Neutral",))
+    os.utime(tmp_path / "a" / "config.json", ns=(0, 10**18))
+    index.invalidate()
+    assert index.get("a").styles == ["Neutral"]
+
+
+def test_voice_appears_once_its_files_are_complete(tmp_path):
+    index = VoiceIndex(str(tmp_path))
+    voice = add_voice(tmp_path, "a", weights=False)
+    assert index.list() == []
+
+    (voice / "a.safetensors").write_bytes(b"\0")
+    os.utime(voice, ns=(0, 10**18))
+    assert [m.id for m in index.list()] == ["a"]
+
+
+def test_invalid_config_is_skipped(tmp_path):
+    add_voice(tmp_path, "good")
+    broken = add_voice(tmp_path, "broken")
+    (broken / "config.json").write_text("{")
+
+    assert [m.id for m in VoiceIndex(str(tmp_path)).list()] == ["good"]
+    assert VoiceIndex(str(tmp_path / "missing")).list() == []